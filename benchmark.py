@@ -0,0 +1,401 @@
+"""
+Benchmarks the loader, the derived data structures, the analyses and the
+charts on synthetic data of configurable scale (see synthetic_data.py).
+Each benchmark records its wall-clock time over several repetitions and
+its peak memory allocation (measured by tracemalloc in a separate run).
+Results are written to JSON and can be compared with an earlier run to
+catch regressions.
+
+Usage:
+
+    python benchmark.py --issues 20000 --output bench_results.json
+    python benchmark.py --issues 20000 --compare bench_results.json
+    python benchmark.py --filter load --issues 100000 --events 20
+    python benchmark.py --filter startup
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+from datetime import datetime
+from typing import Callable, Dict, List
+
+import config
+import run as runner
+import synthetic_data
+
+# Registered benchmarks: name -> (setup, function). The setup runs before
+# every repetition and is not timed; its result is passed to the function.
+BENCHMARKS:Dict[str, tuple] = {}
+
+
+def benchmark(name:str, setup:Callable[[], any]=None):
+    """
+    Registers a benchmark function under the given name.
+    """
+    def register(function):
+        BENCHMARKS[name] = (setup, function)
+        return function
+    return register
+
+
+def _fresh_loader(use_cache:bool=False, clear_cache:bool=False, workers:int=1):
+    import data_loader
+    data_loader.reset()
+    config.set_parameter('ENPM611_PROJECT_CACHE', use_cache)
+    config.set_parameter('workers', workers)
+    loader = data_loader.DataLoader()
+    if clear_cache:
+        shutil.rmtree(loader.cache_dir, ignore_errors=True)
+    return loader
+
+
+def _loaded():
+    # Loads the full dataset (with events) and drops all derived structures
+    loader = _fresh_loader(use_cache=True)
+    for issue in loader.get_issues():
+        issue.events
+    return loader
+
+
+def _frames():
+    return _loaded().get_dataframes()
+
+
+def _reopened_lifecycles():
+    from lifecycle import extract_lifecycles, reopened_lifecycles
+    return reopened_lifecycles(extract_lifecycles(*_frames()))
+
+
+### LOADING
+
+@benchmark('load.json', setup=_fresh_loader)
+def _load_json(loader):
+    loader.get_issues()
+
+
+@benchmark('load.json_with_events', setup=_fresh_loader)
+def _load_json_with_events(loader):
+    for issue in loader.get_issues():
+        issue.events
+
+
+# Same work as load.json_with_events, split across one worker process per core
+@benchmark('load.json_parallel', setup=lambda: _fresh_loader(workers=max(2, os.cpu_count() or 1)))
+def _load_json_parallel(loader):
+    for issue in loader.get_issues():
+        issue.events
+
+
+@benchmark('load.cache_write', setup=lambda: _fresh_loader(use_cache=True, clear_cache=True))
+def _load_cache_write(loader):
+    loader.get_issues()
+
+
+@benchmark('load.cache_read', setup=lambda: (_loaded(), _fresh_loader(use_cache=True))[1])
+def _load_cache_read(loader):
+    loader.get_issues()
+
+
+### DERIVED DATA
+
+@benchmark('derive.dataframes', setup=_loaded)
+def _derive_dataframes(loader):
+    loader.get_dataframes()
+
+
+@benchmark('derive.index', setup=_loaded)
+def _derive_index(loader):
+    index = loader.get_index()
+    index.events_by_author('user0')
+
+
+@benchmark('derive.lifecycle_metrics', setup=_frames)
+def _derive_lifecycle_metrics(frames):
+    from lifecycle import compute_lifecycle_metrics
+    compute_lifecycle_metrics(*frames)
+
+
+@benchmark('derive.trend_cube', setup=_frames)
+def _derive_trend_cube(frames):
+    from trend_cube import build_trend_cube
+    build_trend_cube(*frames)
+
+
+@benchmark('derive.search_index', setup=_loaded)
+def _derive_search_index(loader):
+    from search_index import SearchIndex
+    SearchIndex.build(loader.get_issues())
+
+
+### ANALYSIS COMPUTATIONS
+
+@benchmark('compute.issue_states', setup=_frames)
+def _compute_issue_states(frames):
+    from issue_state_analysis import IssueStateAnalysis
+    IssueStateAnalysis().count_issue_states(frames[0])
+
+
+@benchmark('compute.unlabeling', setup=_frames)
+def _compute_unlabeling(frames):
+    from label_analysis import LabelAnalysis
+    LabelAnalysis().simpleUnlabelingAnalysis(*frames)
+
+
+@benchmark('compute.lifecycles', setup=_frames)
+def _compute_lifecycles(frames):
+    from lifecycle import extract_lifecycles, reopened_lifecycles
+    reopened_lifecycles(extract_lifecycles(*frames))
+
+
+@benchmark('compute.label_trends', setup=lambda: _loaded().get_trend_cube())
+def _compute_label_trends(cube):
+    # Monthly new issues of the 20 first labels, sliced from the cube
+    cube.trend(labels=cube.labels()[:20])
+
+
+@benchmark('compute.search', setup=lambda: _loaded().get_search_index())
+def _compute_search(index):
+    index.search('lock "dependency resolver"')
+
+
+### FEATURES (end to end on a loaded dataset, charts written to files)
+
+def _feature(number:int):
+    def run(loader):
+        runner.run_feature(number)
+    return run
+
+
+for _number in sorted(runner.FEATURES):
+    benchmark(f'feature.{_number}', setup=_frames)(_feature(_number))
+
+
+### STARTUP (python -X importtime in a fresh process)
+
+# Modules that must not be imported before an analysis actually needs them
+HEAVY_MODULES:List[str] = ['pandas', 'numpy', 'matplotlib', 'dateutil']
+
+
+def import_time(args:List[str]) -> dict:
+    """
+    Runs a Python command with -X importtime and returns the total time
+    spent importing modules and which of HEAVY_MODULES were imported.
+    """
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', *args],
+        cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True)
+    total_us = 0
+    imported:List[str] = []
+    for line in process.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        fields = line.split('|')
+        if not line.startswith('import time:') or len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        module = fields[2].rstrip()
+        # Nested imports are indented and already counted in the cumulative time of their parent
+        if not module.startswith('  '):
+            total_us += int(fields[1])
+        if module.strip() in HEAVY_MODULES:
+            imported.append(module.strip())
+    return {'import_s': total_us / 1e6, 'heavy_modules': sorted(imported)}
+
+
+def _startup(*args:str):
+    def run(_):
+        return import_time(list(args))
+    return run
+
+
+benchmark('startup.import_run')(_startup('-c', 'import run'))
+benchmark('startup.help')(_startup('run.py', '--help'))
+benchmark('startup.unknown_feature')(_startup('run.py', '--feature', '99'))
+
+
+### CHARTS
+
+@benchmark('plot.pie_chart')
+def _plot_pie_chart(_):
+    import plotting
+    plotting.pie_chart({'open': 10, 'closed': 20}, title='Issue States')
+
+
+@benchmark('plot.plotList', setup=lambda: [label for labels in _frames()[0]['labels'] for label in labels])
+def _plot_list(all_labels):
+    import plotting
+    plotting.plotList(all_labels, 'label', 20, 'Top 20 labels', 'Issue Labels', '# of Issues')
+
+
+@benchmark('plot.plotSeries', setup=lambda: _frames()[0]['labels'].map(len).tolist())
+def _plot_series(data):
+    import plotting
+    plotting.plotSeries(data, 'Distribution', 'x', 'y')
+
+
+@benchmark('plot.plotLabelOverTime', setup=lambda: _loaded().get_trend_cube().trend(labels=['label-0', 'label-1']))
+def _plot_label_over_time(data):
+    import plotting
+    plotting.plotLabelOverTime(data, 'Trends', 'Month', '# of Issues')
+
+
+@benchmark('plot.gantt_chart', setup=_reopened_lifecycles)
+def _plot_gantt_chart(lifecycles):
+    import plotting
+    plotting.plot_gantt_chart(lifecycles)
+
+
+@benchmark('plot.reopening_trend', setup=lambda: _loaded().get_trend_cube().trend('reopened')['*'])
+def _plot_reopening_trend(reopening_counts):
+    import plotting
+    plotting.plot_reopening_trend(reopening_counts)
+
+
+@benchmark('plot.reopened_issue_timing', setup=lambda: _loaded().get_lifecycle_metrics()['reopen_latency_bucket'].value_counts())
+def _plot_reopened_issue_timing(reopen_counts):
+    import plotting
+    plotting.plot_reopened_issue_timing(reopen_counts)
+
+
+def run_benchmarks(names:List[str], repeat:int) -> Dict[str, dict]:
+    """
+    Runs the given benchmarks and returns their timings and peak memory.
+    """
+    results:Dict[str, dict] = {}
+    for name in names:
+        setup, function = BENCHMARKS[name]
+        times:List[float] = []
+        # The progress messages of the loader and the charts are discarded
+        with contextlib.redirect_stdout(io.StringIO()), warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            for _ in range(repeat):
+                state = setup() if setup else None
+                start = time.perf_counter()
+                # Benchmarks can return further measurements, e.g. the import time of a subprocess
+                measurements = function(state) or {}
+                times.append(time.perf_counter() - start)
+
+            state = setup() if setup else None
+            tracemalloc.start()
+            function(state)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+        results[name] = {
+            'min_s': min(times),
+            'median_s': statistics.median(times),
+            'peak_mb': peak / 2**20,
+            **measurements,
+        }
+        output = f'{name:<32} {results[name]["median_s"]*1000:>10.1f} ms {results[name]["peak_mb"]:>10.1f} MB'
+        if 'import_s' in measurements:
+            output += f' {measurements["import_s"]*1000:>10.1f} ms importing'
+        if measurements.get('heavy_modules'):
+            output += f' ({", ".join(measurements["heavy_modules"])})'
+        print(output)
+    return results
+
+
+def compare(results:Dict[str, dict], baseline:Dict[str, dict], threshold:float) -> List[str]:
+    """
+    Returns the benchmarks whose median time or peak memory grew by more
+    than the threshold factor compared to the baseline.
+    """
+    regressions:List[str] = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        for metric in ('median_s', 'peak_mb', 'import_s'):
+            if metric not in result or metric not in baseline[name]:
+                continue
+            before, after = baseline[name][metric], result[metric]
+            if before > 0 and after / before > threshold:
+                regressions.append(f'{name} {metric}: {before:.4g} -> {after:.4g} ({after/before:.2f}x)')
+        # A heavy dependency that is now imported up front
+        for module in sorted(set(result.get('heavy_modules', [])) - set(baseline[name].get('heavy_modules', []))):
+            regressions.append(f'{name} imports {module}')
+    return regressions
+
+
+def parse_args():
+    """
+    Parses the command line arguments.
+    """
+    ap = argparse.ArgumentParser("benchmark.py")
+    ap.add_argument('--issues', '-n', type=int, default=5000, help='Number of synthetic issues')
+    ap.add_argument('--events', '-e', type=int, default=8, help='Average number of events per issue')
+    ap.add_argument('--labels', '-l', type=int, default=30, help='Number of distinct labels')
+    ap.add_argument('--comment-size', '-c', type=int, default=200, help='Average comment length in characters')
+    ap.add_argument('--repeat', '-r', type=int, default=3, help='Number of timed repetitions per benchmark')
+    ap.add_argument('--filter', '-f', type=str, required=False, help='Only run benchmarks whose name contains this')
+    ap.add_argument('--output', '-o', type=str, required=False, help='JSON file to write the results to')
+    ap.add_argument('--compare', type=str, required=False, help='JSON file of an earlier run to compare against')
+    ap.add_argument('--threshold', type=float, default=1.25,
+                    help='Slowdown factor reported as a regression when comparing (default 1.25)')
+    return ap.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    names = [name for name in BENCHMARKS if args.filter is None or args.filter in name]
+
+    workdir = tempfile.mkdtemp(prefix='enpm611-bench-')
+    try:
+        data_path = os.path.join(workdir, 'issues.json')
+        synthetic_data.write_issues(data_path, synthetic_data.generate_issues(
+            args.issues, args.events, args.labels, args.comment_size))
+        config.set_parameter('ENPM611_PROJECT_DATA_PATH', data_path)
+        # Cached analysis results would hide the computations being measured
+        config.set_parameter('ENPM611_PROJECT_RESULT_CACHE', False)
+        # Query of the search feature
+        config.set_parameter('query', 'lock "dependency resolver"')
+        # Charts are written to files with a non-interactive backend
+        config.set_parameter('output_dir', os.path.join(workdir, 'charts'))
+        import plotting
+        plotting.configure_backend()
+
+        results = run_benchmarks(names, args.repeat)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'parameters': {
+            'issues': args.issues, 'events': args.events,
+            'labels': args.labels, 'comment_size': args.comment_size, 'repeat': args.repeat,
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as fout:
+            json.dump(report, fout, indent=2)
+        print(f'Wrote results to {args.output}')
+
+    if args.compare:
+        with open(args.compare, 'r') as fin:
+            baseline = json.load(fin)
+        if baseline.get('parameters') != report['parameters']:
+            print('Warning: the baseline was run with different parameters')
+        regressions = compare(results, baseline['results'], args.threshold)
+        for regression in regressions:
+            print(f'REGRESSION {regression}')
+        if regressions:
+            return 1
+        print('No regressions')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
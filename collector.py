@@ -0,0 +1,337 @@
+"""
+Collects the issues of a GitHub repository through the REST API and
+writes them in the JSON format read by DataLoader.
+
+The issue list is paged through sequentially, while the timelines of the
+issues are fetched concurrently with asyncio over a pool of persistent
+HTTP connections. Responses are cached by ETag so that a refresh only
+transfers what changed (GitHub does not count 304 responses against the
+rate limit), and requests back off when the rate limit is exhausted or
+the server fails. The ETag cache (<output>.etags.json by default) stores
+the body of every response to answer 304s with, so it takes more disk
+space than the collected issues; --no-etag-cache turns it off.
+
+Usage:
+
+    python collector.py --repo python-poetry/poetry --output poetry_issues.json
+
+The API base URL can be pointed at a local server for testing, e.g. the
+stub in github_stub_server.py:
+
+    python collector.py --repo python-poetry/poetry --api-url http://localhost:8611 --output test.json
+"""
+
+import logging
+logger = logging.getLogger(__name__)
+
+import argparse
+import asyncio
+import http.client
+import json
+import os
+import queue
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+import config
+
+DEFAULT_API_URL:str = 'https://api.github.com'
+
+# Statuses that are retried with exponential backoff
+_RETRY_STATUSES = {500, 502, 503, 504}
+_NEXT_LINK = re.compile(r'<([^>]+)>;\s*rel="next"')
+
+
+class _Response:
+    """
+    Status, headers and body of an HTTP response.
+    """
+
+    def __init__(self, status:int, headers:Dict[str, str], body:bytes):
+        self.status:int = status
+        self.headers:Dict[str, str] = headers
+        self.body:bytes = body
+
+
+class _ConnectionPool:
+    """
+    A fixed-size pool of persistent connections to one host. Requests are
+    blocking and meant to be run in worker threads.
+    """
+
+    def __init__(self, scheme:str, netloc:str, size:int, timeout:float):
+        self.scheme:str = scheme
+        self.netloc:str = netloc
+        self.timeout:float = timeout
+        self._connections:queue.Queue = queue.Queue()
+        for _ in range(size):
+            self._connections.put(None)
+
+    def request(self, path:str, headers:Dict[str, str]) -> _Response:
+        connection = self._connections.get() or self._connect()
+        try:
+            try:
+                return self._send(connection, path, headers)
+            except (http.client.HTTPException, OSError):
+                # The server may have closed an idle keep-alive connection
+                connection.close()
+                connection = self._connect()
+                return self._send(connection, path, headers)
+        except BaseException:
+            connection.close()
+            connection = None
+            raise
+        finally:
+            self._connections.put(connection)
+
+    def close(self):
+        while not self._connections.empty():
+            connection = self._connections.get()
+            if connection is not None:
+                connection.close()
+
+    def _connect(self) -> http.client.HTTPConnection:
+        if self.scheme == 'https':
+            return http.client.HTTPSConnection(self.netloc, timeout=self.timeout)
+        return http.client.HTTPConnection(self.netloc, timeout=self.timeout)
+
+    def _send(self, connection:http.client.HTTPConnection, path:str, headers:Dict[str, str]) -> _Response:
+        connection.request('GET', path, headers=headers)
+        response = connection.getresponse()
+        body = response.read()
+        return _Response(response.status, {k.lower(): v for k, v in response.getheaders()}, body)
+
+
+class GitHubCollector:
+    """
+    Fetches the issues and their timelines of a repository.
+    """
+
+    def __init__(self, repo:str, api_url:str=DEFAULT_API_URL, token:str=None,
+                 concurrency:int=8, etag_cache_path:str=None, max_retries:int=5,
+                 max_rate_limit_wait:float=7200, timeout:float=30):
+        """
+        Constructor
+
+        Parameters:
+        - repo: Repository in owner/name form.
+        - api_url: Base URL of the GitHub REST API.
+        - token: Optional access token (strongly recommended for the rate limit).
+        - concurrency: Maximum number of requests in flight.
+        - etag_cache_path: Optional file in which responses are cached by ETag between
+          runs. It holds the body of every page fetched.
+        - max_retries: Number of retries for server and connection errors.
+        - max_rate_limit_wait: Seconds a request waits in total for the rate limit to
+          reset before giving up. Waiting does not count against max_retries.
+        - timeout: Socket timeout of a request in seconds.
+        """
+        self.repo:str = repo
+        self.api_url:str = api_url.rstrip('/')
+        self.token:str = token
+        self.concurrency:int = concurrency
+        self.etag_cache_path:str = etag_cache_path
+        self.max_retries:int = max_retries
+        self.max_rate_limit_wait:float = max_rate_limit_wait
+        self.timeout:float = timeout
+        self._etag_cache:Dict[str, Dict[str, str]] = {}
+        self._pools:Dict[Tuple[str, str], _ConnectionPool] = {}
+        self._executor:ThreadPoolExecutor = None
+        self._semaphore:asyncio.Semaphore = None
+        # Time until which all requests wait after the rate limit was exhausted
+        self._resume_at:float = 0
+
+    def collect(self) -> List[dict]:
+        """
+        Fetches all issues (excluding pull requests) with their events and
+        returns them in the format read by DataLoader.
+        """
+        return asyncio.run(self.collect_async())
+
+    async def collect_async(self) -> List[dict]:
+        self._load_etag_cache()
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        try:
+            items = await self._get_all_pages(
+                f'{self.api_url}/repos/{self.repo}/issues?' + urlencode({'state': 'all', 'per_page': 100})
+            )
+            items = [item for item in items if 'pull_request' not in item]
+            logger.info(f'Fetched {len(items)} issues, fetching timelines')
+            timelines = await asyncio.gather(*[
+                self._get_all_pages(f'{item["timeline_url"]}?per_page=100') for item in items
+            ])
+            return [_to_issue(item, timeline) for item, timeline in zip(items, timelines)]
+        finally:
+            self._executor.shutdown()
+            for pool in self._pools.values():
+                pool.close()
+            self._pools.clear()
+            self._save_etag_cache()
+
+    async def _get_all_pages(self, url:str) -> List[dict]:
+        results:List[dict] = []
+        while url is not None:
+            page, headers = await self._get(url)
+            results.extend(page)
+            match = _NEXT_LINK.search(headers.get('link', ''))
+            url = match.group(1) if match else None
+        return results
+
+    async def _get(self, url:str) -> Tuple[any, Dict[str, str]]:
+        """
+        Fetches a JSON document, using the ETag cache and retrying on
+        server errors and rate limiting.
+        """
+        headers = {'Accept': 'application/vnd.github+json', 'User-Agent': 'enpm611-collector'}
+        if self.token:
+            headers['Authorization'] = f'Bearer {self.token}'
+        cached = self._etag_cache.get(url)
+        if cached is not None:
+            headers['If-None-Match'] = cached['etag']
+
+        # Waiting for the rate limit to reset does not use up the retries,
+        # which are meant for failing servers
+        attempt = 0
+        rate_limit_wait = 0.0
+        while True:
+            delay = self._resume_at - time.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            async with self._semaphore:
+                try:
+                    response = await self._request(url, headers)
+                except (http.client.HTTPException, OSError) as e:
+                    if attempt == self.max_retries:
+                        raise
+                    logger.warning(f'Request to {url} failed ({e}), retrying')
+                    await asyncio.sleep(2 ** attempt)
+                    attempt += 1
+                    continue
+
+            self._track_rate_limit(response)
+            if response.status == 304 and cached is not None:
+                return json.loads(cached['body']), cached['headers']
+            if response.status == 200:
+                body = response.body.decode('utf-8')
+                if 'etag' in response.headers:
+                    self._etag_cache[url] = {'etag': response.headers['etag'], 'body': body, 'headers': response.headers}
+                return json.loads(body), response.headers
+            if response.status in (403, 429) and self._is_rate_limited(response):
+                # Counted as at least a second so a limit without a wait still ends
+                wait = max(self._resume_at - time.time(), 1)
+                rate_limit_wait += wait
+                if rate_limit_wait > self.max_rate_limit_wait:
+                    raise RuntimeError(f'GET {url} still rate limited after waiting {rate_limit_wait - wait:.0f}s')
+                logger.warning(f'Rate limit exceeded, waiting {wait:.0f}s')
+                continue
+            if response.status in _RETRY_STATUSES and attempt < self.max_retries:
+                await asyncio.sleep(2 ** attempt)
+                attempt += 1
+                continue
+            raise RuntimeError(f'GET {url} failed with status {response.status}: {response.body[:200]!r}')
+
+    async def _request(self, url:str, headers:Dict[str, str]) -> _Response:
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        if key not in self._pools:
+            self._pools[key] = _ConnectionPool(parts.scheme, parts.netloc, self.concurrency, self.timeout)
+        path = parts.path + (f'?{parts.query}' if parts.query else '')
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._pools[key].request, path, headers)
+
+    def _track_rate_limit(self, response:_Response):
+        # Pause all requests until the reset time once the quota is used up
+        if response.headers.get('x-ratelimit-remaining') == '0' and 'x-ratelimit-reset' in response.headers:
+            self._resume_at = max(self._resume_at, float(response.headers['x-ratelimit-reset']) + 1)
+
+    def _is_rate_limited(self, response:_Response) -> bool:
+        if 'retry-after' in response.headers:
+            self._resume_at = max(self._resume_at, time.time() + float(response.headers['retry-after']))
+            return True
+        if response.headers.get('x-ratelimit-remaining') == '0':
+            if 'x-ratelimit-reset' not in response.headers:
+                self._resume_at = max(self._resume_at, time.time() + 60)
+            return True
+        return False
+
+    def _load_etag_cache(self):
+        if self.etag_cache_path and os.path.isfile(self.etag_cache_path):
+            with open(self.etag_cache_path, 'r') as fin:
+                self._etag_cache = json.load(fin)
+
+    def _save_etag_cache(self):
+        if self.etag_cache_path:
+            with open(self.etag_cache_path, 'w') as fout:
+                json.dump(self._etag_cache, fout)
+
+
+def _login(user:Optional[dict]) -> Optional[str]:
+    return user.get('login') if user else None
+
+
+def _to_event(item:dict) -> dict:
+    # Timeline items differ by type in where the actor and date are stored
+    return {
+        'event_type': item.get('event'),
+        'author': _login(item.get('actor') or item.get('user') or item.get('author')),
+        'event_date': item.get('created_at') or item.get('submitted_at'),
+        'label': (item.get('label') or {}).get('name'),
+        'comment': item.get('body'),
+    }
+
+
+def _to_issue(item:dict, timeline:List[dict]) -> dict:
+    return {
+        'url': item.get('html_url'),
+        'creator': _login(item.get('user')),
+        'labels': [label['name'] for label in item.get('labels', [])],
+        'state': item.get('state'),
+        'assignees': [_login(assignee) for assignee in item.get('assignees', [])],
+        'title': item.get('title'),
+        'text': item.get('body'),
+        'number': item.get('number'),
+        'created_date': item.get('created_at'),
+        'updated_date': item.get('updated_at'),
+        'timeline_url': item.get('timeline_url'),
+        'events': [_to_event(event) for event in timeline],
+    }
+
+
+def parse_args():
+    """
+    Parses the command line arguments.
+    """
+    ap = argparse.ArgumentParser("collector.py")
+    ap.add_argument('--repo', '-r', type=str, default='python-poetry/poetry',
+                    help='Repository to collect the issues of (owner/name)')
+    ap.add_argument('--output', '-o', type=str, default=config.get_parameter('ENPM611_PROJECT_DATA_PATH'),
+                    help='File to write the issues to (defaults to ENPM611_PROJECT_DATA_PATH)')
+    ap.add_argument('--api-url', type=str, default=DEFAULT_API_URL,
+                    help='Base URL of the GitHub API, e.g. of a local stub server')
+    ap.add_argument('--concurrency', '-c', type=int, default=8,
+                    help='Maximum number of concurrent requests')
+    ap.add_argument('--etag-cache', type=str, required=False,
+                    help='File in which responses are cached between runs (defaults to <output>.etags.json). '
+                         'It holds every page fetched, so it is larger than the output')
+    ap.add_argument('--no-etag-cache', action='store_true',
+                    help='Do not cache responses, so every run fetches all pages in full')
+    return ap.parse_args()
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    args = parse_args()
+    collector = GitHubCollector(
+        args.repo,
+        api_url=args.api_url,
+        token=config.get_parameter('GITHUB_TOKEN'),
+        concurrency=args.concurrency,
+        etag_cache_path=None if args.no_etag_cache else args.etag_cache or f'{args.output}.etags.json',
+    )
+    issues = collector.collect()
+    with open(args.output, 'w') as fout:
+        json.dump(issues, fout, indent=2)
+    print(f'Wrote {len(issues)} issues to {args.output}.')
@@ -0,0 +1,168 @@
+from datetime import datetime, timezone
+from typing import Dict, List, Tuple
+import pandas as pd
+
+from pipeline import Analysis, Inputs
+from sketches import CountMinSketch, HyperLogLog, SpaceSaving, hash64
+import config
+import plotting
+import profiling
+
+# Number of contributors listed per ranking
+TOP_NUM:int = 20
+# Number of most active contributors whose activity over time is plotted (unless --user is given)
+TREND_NUM:int = 5
+# Counters per ranking; rankings are exact as long as there are at most this many contributors
+RANKING_CAPACITY:int = 1000
+# Number of (contributor, month) pairs counted exactly before the activity is sketched
+ACTIVITY_EXACT_LIMIT:int = 100000
+# Number of contributors per month counted exactly before they are estimated
+DISTINCT_EXACT_LIMIT:int = 1000
+
+class ContributorAnalysis(Analysis):
+    """
+    Analyzes who contributes to the issues:
+        - Top issue creators, commenters and labelers
+        - Monthly activity (issues created and events) of the user (--user)
+          or of the most active contributors
+        - Number of distinct active contributors per month
+    The issues are visited once, in bounded memory, using streaming sketches
+    (see sketches.py): Space-Saving for the rankings, Count-Min for the
+    monthly activity and HyperLogLog for the distinct contributors. On small
+    datasets the sketches count exactly; set ENPM611_PROJECT_CONTRIBUTOR_EXACT
+    to count exactly regardless of the size of the data.
+    """
+
+    # Visits the issues once instead of loading all of them
+    INPUTS = ['issue_stream']
+
+    def __init__(self):
+        """
+        Constructor
+        """
+        # Parameter is passed in via command line (--user)
+        self.USER:str = config.get_parameter('user')
+        # Counts exactly, with memory growing with the number of contributors
+        self.EXACT:bool = bool(config.get_parameter('ENPM611_PROJECT_CONTRIBUTOR_EXACT'))
+
+    def params(self):
+        return {'user': self.USER, 'exact': self.EXACT}
+
+    def compute(self, inputs:Inputs):
+        """
+        Counts the contributions in a single pass over the issues.
+
+        Returns:
+        - A dictionary with the number of issues, events and contributors,
+          the top creators, commenters and labelers as (user, count, error)
+          tuples, the monthly activity of the plotted contributors (a DataFrame
+          with one row per month and one column per contributor), the number
+          of active contributors per month and whether all counts are exact.
+        """
+        capacity = None if self.EXACT else RANKING_CAPACITY
+        creators = SpaceSaving(capacity)
+        commenters = SpaceSaving(capacity)
+        labelers = SpaceSaving(capacity)
+        contributors = SpaceSaving(capacity)
+        activity = CountMinSketch(exact_limit=None if self.EXACT else ACTIVITY_EXACT_LIMIT)
+        distinct_limit = None if self.EXACT else DISTINCT_EXACT_LIMIT
+        all_contributors = HyperLogLog(exact_limit=distinct_limit)
+        contributors_per_month:Dict[str, HyperLogLog] = {}
+        num_issues:int = 0
+        num_events:int = 0
+
+        def contribution(user:str, date:datetime):
+            contributors.add(user)
+            user_hash = hash64(user)
+            all_contributors.add_hash(user_hash)
+            if date is not None:
+                month = _month(date)
+                activity.add(f'{user}\t{month}')
+                if month not in contributors_per_month:
+                    contributors_per_month[month] = HyperLogLog(exact_limit=distinct_limit)
+                contributors_per_month[month].add_hash(user_hash)
+
+        with profiling.stage('count_contributions'):
+            for issue in inputs['issue_stream']():
+                num_issues += 1
+                if issue.creator is not None:
+                    creators.add(issue.creator)
+                    contribution(issue.creator, issue.created_date)
+                for event in issue.events:
+                    num_events += 1
+                    if event.author is None:
+                        continue
+                    if event.event_type == 'commented':
+                        commenters.add(event.author)
+                    elif event.event_type == 'labeled':
+                        labelers.add(event.author)
+                    contribution(event.author, event.event_date)
+
+        # Activity of the user, or of the most active contributors, per month
+        users = [self.USER] if self.USER is not None else [user for user, _, _ in contributors.top(TREND_NUM)]
+        months = sorted(contributors_per_month)
+        activity_trend = pd.DataFrame(
+            {user: [activity.estimate(f'{user}\t{month}') for month in months] for user in users},
+            index=pd.PeriodIndex(months, freq='M'), dtype='int64')
+        active_per_month = pd.Series(
+            [contributors_per_month[month].count() for month in months],
+            index=pd.PeriodIndex(months, freq='M'), dtype='int64')
+
+        sketches = [creators, commenters, labelers, contributors, activity, all_contributors, *contributors_per_month.values()]
+        return {
+            'numIssues': num_issues,
+            'numEvents': num_events,
+            'numContributors': all_contributors.count(),
+            'topCreators': creators.top(TOP_NUM),
+            'topCommenters': commenters.top(TOP_NUM),
+            'topLabelers': labelers.top(TOP_NUM),
+            'activityTrend': activity_trend,
+            'activePerMonth': active_per_month,
+            'exact': all(sketch.exact for sketch in sketches),
+        }
+
+    def render(self, results):
+        """
+        Outputs the results of the contributor analysis
+        """
+        approximately:str = '' if results['exact'] else 'about '
+        output:str = f'\nFound {approximately}{results["numContributors"]} contributors across '
+        output += f'{results["numIssues"]} issues and {results["numEvents"]} events.\n'
+        if not results['exact']:
+            output += 'Counts are estimated from streaming sketches; rankings show how much a count may be too high.\n'
+        print(output)
+
+        for key, name in (('topCreators', 'issue creators'), ('topCommenters', 'commenters'), ('topLabelers', 'labelers')):
+            ranking:List[Tuple[str, int, int]] = results[key]
+            if not ranking:
+                continue
+            print(f'Top {len(ranking)} {name}:')
+            for user, count, error in ranking:
+                print(f'  {user:<30} {count:>8}' + (f' (overestimated by up to {error})' if error else ''))
+            print()
+            title:str  = f"Top {len(ranking)} {name}"
+            xlabel:str = "Contributor"
+            ylabel:str = "# of Contributions"
+            plotting.plotCounts({user: count for user, count, _ in ranking}, title, xlabel, ylabel)
+
+        if results['activityTrend'].empty:
+            return
+        if self.USER is not None:
+            print(f'{self.USER} created issues or events {approximately}{int(results["activityTrend"][self.USER].sum())} times.\n')
+            title:str = f"Monthly Activity of {self.USER}"
+        else:
+            title:str = f"Monthly Activity of the Top {len(results['activityTrend'].columns)} Contributors"
+        plotting.plotLabelOverTime(results['activityTrend'], title, "Month", "# of Issues and Events")
+
+        title:str  = "Active Contributors per Month"
+        plotting.plotLabelOverTime(results['activePerMonth'].to_frame('Contributors'), title, "Month", "# of Contributors")
+
+def _month(date:datetime) -> str:
+    # Months are in UTC, as in the trend cube
+    if date.tzinfo is not None:
+        date = date.astimezone(timezone.utc)
+    return f'{date.year:04d}-{date.month:02d}'
+
+if __name__ == '__main__':
+    # Invoke run method when running this module directly
+    ContributorAnalysis().run()
@@ -1,12 +1,78 @@
+import logging
+logger = logging.getLogger(__name__)
 
+import atexit
+import gzip
+import hashlib
+import io
+import itertools
 import json
-from typing import List
+import lzma
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Dict, Iterator, List, Optional, TextIO, Tuple
+
+import numpy as np
+import pandas as pd
 
 import config
+import issue_cache
+import model
+import profiling
+from issue_index import IssueIndex
+from lifecycle import compute_lifecycle_metrics, dataset_as_of, update_lifecycle_metrics
 from model import Issue
+from search_index import SearchIndex, index_path
+from trend_cube import TrendCube, build_trend_cube
 
 # Store issues as singleton to avoid reloads
 _ISSUES:List[Issue] = None
+# Normalized (issues, events) DataFrames built from _ISSUES on demand
+_FRAMES:Tuple[pd.DataFrame, pd.DataFrame] = None
+# Secondary indexes over _ISSUES built on demand
+_INDEX:IssueIndex = None
+# Per-issue lifecycle metrics (see lifecycle.compute_lifecycle_metrics)
+_METRICS:pd.DataFrame = None
+# Counts per (month, label, state, event type) built from _FRAMES on demand
+_CUBE:TrendCube = None
+# Full-text index over _ISSUES built or read from the cache on demand
+_SEARCH:SearchIndex = None
+# Whether the on-disk cache matches the loaded issues
+_CACHE_CURRENT:bool = False
+# Content hashes of the delta files applied to the loaded issues
+_DELTAS:List[str] = []
+# Number of dates that needed the slow parser and were already reported
+_REPORTED_DATE_FALLBACKS:int = 0
+
+# Number of characters read from the data file at a time while streaming
+_CHUNK_SIZE:int = 1 << 16
+
+# Bytes of the data file parsed by a worker process at a time in parallel mode
+_PARALLEL_CHUNK_BYTES:int = 1 << 23
+# Start of a record in newline-delimited JSON (the group marks the record).
+# Strings cannot hold a raw newline, so this never matches inside a record.
+_NDJSON_RECORD_START = re.compile(rb'\n\s*(\{)')
+
+_WHITESPACE = ' \t\n\r'
+
+
+def reset():
+    """
+    Drops the loaded issues and everything derived from them so that the
+    next access reloads the data file (e.g. after it changed).
+    """
+    global _ISSUES, _FRAMES, _INDEX, _METRICS, _CUBE, _SEARCH, _CACHE_CURRENT, _DELTAS
+    _ISSUES = None
+    _FRAMES = None
+    _INDEX = None
+    _METRICS = None
+    _CUBE = None
+    _SEARCH = None
+    _CACHE_CURRENT = False
+    _DELTAS = []
+
 
 class DataLoader:
     """
@@ -18,6 +84,13 @@ class DataLoader:
         Constructor
         """
         self.data_path:str = config.get_parameter('ENPM611_PROJECT_DATA_PATH')
+        # On-disk cache of the parsed issues (see issue_cache.py)
+        self.use_cache:bool = config.get_parameter('ENPM611_PROJECT_CACHE', default=True)
+        self.cache_dir:str = config.get_parameter('ENPM611_PROJECT_CACHE_DIR') or issue_cache.default_cache_dir(self.data_path)
+        # Set to false to skip the events of every issue (see Issue.events)
+        self.load_events:bool = config.get_parameter('ENPM611_PROJECT_LOAD_EVENTS', default=True)
+        # Number of processes used to build the model (--workers overrides the config)
+        self.workers:int = int(config.get_parameter('workers') or config.get_parameter('ENPM611_PROJECT_LOAD_WORKERS', default=1))
         
     def get_issues(self):
         """
@@ -26,18 +99,536 @@ class DataLoader:
         """
         global _ISSUES # to access it within the function
         if _ISSUES is None:
-            _ISSUES = self._load()
+            with profiling.stage('load'):
+                _ISSUES = self._load()
             print(f'Loaded {len(_ISSUES)} issues from {self.data_path}.')
+            _report_date_fallbacks()
         return _ISSUES
     
+    def is_loaded(self) -> bool:
+        """
+        Returns whether the issues are in memory, i.e. get_issues() returns
+        them without loading the data file or the cache.
+        """
+        return _ISSUES is not None
+    
+    def get_dataframes(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Returns the issues as two normalized DataFrames so analyses can use
+        vectorized operations instead of looping over the issue objects:
+        
+        - issues: one row per issue with the columns number, url, creator,
+          state, title, created_date, updated_date, labels and assignees
+          (labels and assignees hold lists).
+        - events: one row per event with the columns issue_number (foreign
+          key into issues.number), event_type, author, event_date and label.
+          Comments are left out to keep the frame small.
+        """
+        global _FRAMES
+        if _FRAMES is None:
+            issues = self.get_issues()
+            with profiling.stage('dataframes'):
+                _FRAMES = _build_dataframes(issues)
+            # Building the frames decodes the events and parses their dates
+            _report_date_fallbacks()
+        return _FRAMES
+    
+    def get_index(self) -> IssueIndex:
+        """
+        Returns the secondary indexes (creator, label, state, event type
+        and event author) over the issues returned by get_issues().
+        """
+        global _INDEX
+        if _INDEX is None:
+            issues = self.get_issues()
+            with profiling.stage('index'):
+                _INDEX = IssueIndex(issues)
+        return _INDEX
+    
+    def get_lifecycle_metrics(self) -> pd.DataFrame:
+        """
+        Returns the per-issue lifecycle metrics (time to first close, reopen
+        count, total open time, reopen latency). They are computed once per
+        dataset and stored alongside the on-disk cache.
+        """
+        global _METRICS
+        if _METRICS is None:
+            self.get_issues()
+            if self.use_cache and _CACHE_CURRENT:
+                with profiling.stage('lifecycle_metrics_cache_read'):
+                    _METRICS = issue_cache.load_table(self.cache_dir, 'lifecycle_metrics')
+            if _METRICS is None:
+                frames = self.get_dataframes()
+                with profiling.stage('lifecycle_metrics'):
+                    _METRICS = compute_lifecycle_metrics(*frames)
+                if self.use_cache and _CACHE_CURRENT:
+                    try:
+                        issue_cache.save_table(self.cache_dir, 'lifecycle_metrics', _METRICS)
+                    except OSError as e:
+                        logger.warning(f'Could not write lifecycle metrics to {self.cache_dir}: {e}')
+        return _METRICS
+    
+    def get_trend_cube(self) -> TrendCube:
+        """
+        Returns the counts of events (and issue creations) per month, label,
+        state and event type, from which trends of any label or event type
+        are sliced (see trend_cube.py).
+        """
+        global _CUBE
+        if _CUBE is None:
+            frames = self.get_dataframes()
+            with profiling.stage('trend_cube'):
+                _CUBE = build_trend_cube(*frames)
+        return _CUBE
+    
+    def get_search_index(self) -> SearchIndex:
+        """
+        Returns the full-text index over the titles, texts and event comments
+        of the issues (see search_index.py). It is stored in the cache
+        directory and rebuilt when the dataset changes.
+        """
+        global _SEARCH
+        if _SEARCH is None:
+            issues = self.get_issues()
+            path = index_path(self.cache_dir)
+            if self.use_cache:
+                with profiling.stage('search_index_cache_read'):
+                    _SEARCH = SearchIndex.load(path, self.get_fingerprint())
+            if _SEARCH is None:
+                with profiling.stage('search_index'):
+                    _SEARCH = SearchIndex.build(issues)
+                if self.use_cache:
+                    try:
+                        os.makedirs(self.cache_dir, exist_ok=True)
+                        _SEARCH.save(path, self.get_fingerprint())
+                    except OSError as e:
+                        logger.warning(f'Could not write search index to {self.cache_dir}: {e}')
+        return _SEARCH
+    
+    def get_fingerprint(self) -> str:
+        """
+        Returns a hash identifying the dataset: the content of the data file,
+        the delta files applied to it and whether events are loaded. It is
+        computed without loading the issues, and without reading the data
+        file if the cache is up to date (see result_cache.py).
+        """
+        document = json.dumps({
+            'source': issue_cache.source_digest(self.data_path, self.cache_dir if self.use_cache else None),
+            'deltas': _DELTAS,
+            'events': bool(self.load_events),
+        })
+        return hashlib.sha256(document.encode('utf-8')).hexdigest()
+    
+    @profiling.profiled('apply_delta')
+    def apply_delta(self, delta_path:str) -> int:
+        """
+        Merges new or updated issues from a delta file (same format as the
+        data file) into the loaded dataset without reloading it. Issues are
+        matched by number; an issue is only replaced if the delta's copy is
+        not older (by updated_date) than the loaded one. The indexes and the
+        derived DataFrames and metrics that were already built are updated
+        for the changed issues only.
+        
+        Returns:
+        - The number of issues that were inserted or updated.
+        """
+        global _FRAMES, _METRICS, _CUBE, _SEARCH, _CACHE_CURRENT
+        issues = self.get_issues()
+        index = self.get_index()
+        
+        # Positions of the changed issues in insertion order (a dict removes duplicates)
+        changed = {}
+        with _open_data_file(delta_path) as fin:
+            for jobj in _iter_json_records(fin):
+                issue = Issue(jobj, self.load_events)
+                position = index.by_number.get(issue.number)
+                if position is None:
+                    issues.append(issue)
+                    position = len(issues) - 1
+                else:
+                    current = issues[position]
+                    if current.updated_date is not None and issue.updated_date is not None \
+                            and issue.updated_date < current.updated_date:
+                        continue
+                    index.remove(position)
+                    issues[position] = issue
+                index.add(position)
+                changed[position] = None
+        
+        positions = list(changed)
+        if positions:
+            # The dataset no longer matches the data file the cache was built from
+            _CACHE_CURRENT = False
+            _DELTAS.append(issue_cache.source_fingerprint(delta_path)['sha256'])
+            # The search index is rebuilt on its next use
+            _SEARCH = None
+            if _FRAMES is not None:
+                previous_as_of = dataset_as_of(*_FRAMES)
+                numbers = [issues[p].number for p in positions]
+                removed = _select_issues(_FRAMES, numbers)
+                _FRAMES = _update_dataframes(_FRAMES, issues, positions)
+                if _METRICS is not None:
+                    _METRICS = update_lifecycle_metrics(_METRICS, *_FRAMES, positions, previous_as_of)
+                if _CUBE is not None:
+                    # The counts are additive, so only the changed issues are recounted
+                    _CUBE = _CUBE.update(build_trend_cube(*removed), build_trend_cube(*_select_issues(_FRAMES, numbers)))
+            else:
+                _METRICS = None
+                _CUBE = None
+        print(f'Applied {len(positions)} new or updated issues from {delta_path}.')
+        return len(positions)
+    
+    def iter_issues(self) -> Iterator[Issue]:
+        """
+        Streams the issues one at a time without keeping the whole
+        document in memory: from the on-disk cache if it is still valid
+        and from the data file otherwise. Use this instead of get_issues()
+        when the issues only need to be visited once.
+        """
+        if self.use_cache:
+            issues = issue_cache.iter_issues(self.data_path, self.cache_dir, self.load_events)
+            if issues is not None:
+                logger.info(f'Streaming issues from cache {self.cache_dir}')
+                yield from issues
+                return
+        yield from self._iter_issues_parsed()
+    
+    def _iter_issues_parsed(self) -> Iterator[Issue]:
+        """
+        Streams the issues from the data file.
+        """
+        if self.workers > 1:
+            yield from self._iter_issues_parallel()
+            return
+        with _open_data_file(self.data_path) as fin:
+            # When profiling, the time spent decoding JSON is reported separately
+            # from the time spent building the model (e.g. parsing dates)
+            for jobj in profiling.timed_iter('json_decode', _iter_json_records(fin)):
+                yield Issue(jobj, self.load_events)
+    
+    def _iter_issues_parallel(self) -> Iterator[Issue]:
+        """
+        Streams the issues while parsing the data file in a pool of worker
+        processes. The file is split into byte ranges at record boundaries,
+        and each worker reads and decodes its own range, builds the issues
+        and hands them back as compact columns (see issue_cache.encode_columns),
+        so the main process neither decodes JSON nor unpickles Issue objects.
+        At most two ranges per worker are in flight, and issues are yielded
+        in file order.
+        """
+        ranges = _split_records(self.data_path, self.workers)
+        if ranges is None:
+            # The file cannot be split, so it is parsed serially
+            with _open_data_file(self.data_path) as fin:
+                for jobj in _iter_json_records(fin):
+                    yield Issue(jobj, self.load_events)
+            return
+        
+        yielded:int = 0
+        try:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                pending = deque()
+                for start, end, delimited in ranges:
+                    pending.append(executor.submit(_parse_range, self.data_path, start, end, delimited, self.load_events))
+                    if len(pending) >= 2 * self.workers:
+                        for issue in _collect(pending.popleft(), self.load_events):
+                            yielded += 1
+                            yield issue
+                while pending:
+                    for issue in _collect(pending.popleft(), self.load_events):
+                        yielded += 1
+                        yield issue
+        except ValueError:
+            # A range did not start at a record after all (e.g. the records
+            # of an array are indented inconsistently), so the rest of the
+            # file is parsed serially
+            logger.info(f'Could not split {self.data_path} at record boundaries, parsing it serially')
+            with _open_data_file(self.data_path) as fin:
+                for jobj in itertools.islice(_iter_json_records(fin), yielded, None):
+                    yield Issue(jobj, self.load_events)
+    
     def _load(self):
         """
-        Loads the issues into memory.
+        Loads the issues into memory, from the on-disk cache if it is
+        still valid and from the data file otherwise.
         """
-        with open(self.data_path,'r') as fin:
-            return [Issue(i) for i in json.load(fin)]
+        if not self.use_cache:
+            with profiling.stage('parse'):
+                return list(self._iter_issues_parsed())
+        
+        global _CACHE_CURRENT
+        with profiling.stage('cache_read'):
+            issues = issue_cache.load(self.data_path, self.cache_dir, self.load_events)
+        if issues is not None:
+            logger.info(f'Loaded issues from cache {self.cache_dir}')
+            _CACHE_CURRENT = True
+            return issues
+        
+        with profiling.stage('parse'):
+            issues = list(self._iter_issues_parsed())
+        if not self.load_events:
+            # Without events the cache would be incomplete
+            return issues
+        try:
+            with profiling.stage('cache_write'):
+                issue_cache.save(self.data_path, self.cache_dir, issues)
+            _CACHE_CURRENT = True
+        except OSError as e:
+            # The cache is an optimization only, so failing to write it is not fatal
+            logger.warning(f'Could not write issue cache to {self.cache_dir}: {e}')
+        return issues
+
+
+def _report_date_fallbacks():
+    # Warns about the dates parsed with the slow parser since the last
+    # report. Event dates are only parsed once the events are decoded, which
+    # may happen long after loading, so this also runs when the DataFrames
+    # are built and at exit.
+    global _REPORTED_DATE_FALLBACKS
+    count = model.date_fallback_count() - _REPORTED_DATE_FALLBACKS
+    if count > 0:
+        logger.warning(f'{count} dates were not in ISO-8601 format and needed the slow parser')
+        _REPORTED_DATE_FALLBACKS += count
+
+
+atexit.register(_report_date_fallbacks)
+
+
+def _split_records(path:str, workers:int) -> Optional[List[Tuple[int, int, bool]]]:
+    """
+    Splits an uncompressed data file into byte ranges that each hold whole
+    records, as (start, end, delimited) tuples where delimited tells whether
+    the file is newline-delimited JSON. Records are found without decoding
+    the file: in newline-delimited JSON they start after a newline, and in a
+    JSON array with one record per line (as written by synthetic_data.py)
+    or pretty-printed (as written by collector.py) after a comma, a newline
+    and the indentation of the first record. Returns None for compressed
+    files and arrays written on a single line, which cannot be split.
+    """
+    if path.endswith(('.gz', '.xz', '.zst')):
+        return None
+    size = os.path.getsize(path)
+    # At least four ranges per worker so that the work is spread evenly
+    chunk_bytes = max(_CHUNK_SIZE, min(_PARALLEL_CHUNK_BYTES, size // (4 * workers)))
+    with open(path, 'rb') as fin:
+        head = fin.read(_CHUNK_SIZE)
+        delimited = head.lstrip()[:1] == b'{'
+        if delimited:
+            pattern = _NDJSON_RECORD_START
+        else:
+            first = re.match(rb'\s*\[[ \t\r]*\n([ \t]*)\{', head)
+            if first is None:
+                return None
+            # Nested objects are indented further, so they do not match
+            pattern = re.compile(rb',[ \t\r]*\n' + re.escape(first.group(1)) + rb'(\{)')
+        boundaries:List[int] = [0]
+        while boundaries[-1] + chunk_bytes < size:
+            start = _next_record_start(fin, boundaries[-1] + chunk_bytes, pattern)
+            if start is None:
+                break
+            boundaries.append(start)
+    boundaries.append(size)
+    return [(start, end, delimited) for start, end in zip(boundaries, boundaries[1:])]
+
+
+def _next_record_start(fin:BinaryIO, pos:int, pattern:re.Pattern) -> Optional[int]:
+    # Returns the offset of the first record starting after pos, recognized
+    # by the separator in front of it (the first group of the pattern)
+    fin.seek(pos)
+    tail = b''
+    while block := fin.read(_CHUNK_SIZE):
+        data = tail + block
+        match = pattern.search(data)
+        if match:
+            return pos - len(tail) + match.start(1)
+        # Keep the end of the block in case a separator spans two blocks
+        pos += len(block)
+        tail = data[-256:]
+    return None
+
+
+def _parse_range(path:str, start:int, end:int, delimited:bool, load_events:bool) -> Tuple[Dict[str, np.ndarray], int]:
+    # Runs in a worker process: decodes the records in bytes [start, end) of
+    # the data file and returns the issues as columns, along with the number
+    # of dates that needed the slow parser. Events are decoded here since
+    # that is the expensive part the worker is meant to take off the main
+    # process. Raises ValueError if the range does not hold whole records.
+    with open(path, 'rb') as fin:
+        fin.seek(start)
+        text = fin.read(end - start).decode('utf-8').strip()
+    if delimited:
+        records = list(_iter_json_records(io.StringIO(text)))
+    else:
+        # A range of a JSON array is made an array of its own by removing
+        # the brackets and the separator after its last record
+        if text.startswith('['):
+            text = text[1:]
+        if text.endswith(']'):
+            text = text[:-1]
+        text = text.rstrip()
+        if text.endswith(','):
+            text = text[:-1]
+        records = json.loads(f'[{text}]')
+    fallbacks = model.date_fallback_count()
+    issues = [Issue(jobj, load_events) for jobj in records]
+    columns = issue_cache.encode_columns(issues)
+    return columns, model.date_fallback_count() - fallbacks
+
+
+def _collect(future, load_events:bool) -> List[Issue]:
+    columns, fallbacks = future.result()
+    model.record_date_fallbacks(fallbacks)
+    return issue_cache.decode_columns(columns, load_events)
+
+
+def _build_dataframes(issues:List[Issue]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    issues_df = pd.DataFrame({
+        'number': [issue.number for issue in issues],
+        'url': [issue.url for issue in issues],
+        'creator': [issue.creator for issue in issues],
+        'state': [issue.state.value if issue.state is not None else None for issue in issues],
+        'title': [issue.title for issue in issues],
+        'created_date': pd.to_datetime([issue.created_date for issue in issues], utc=True),
+        'updated_date': pd.to_datetime([issue.updated_date for issue in issues], utc=True),
+        'labels': [issue.labels for issue in issues],
+        'assignees': [issue.assignees for issue in issues],
+    })
+    
+    columns = {'issue_number': [], 'event_type': [], 'author': [], 'event_date': [], 'label': []}
+    for issue in issues:
+        for event in issue.events:
+            columns['issue_number'].append(issue.number)
+            columns['event_type'].append(event.event_type)
+            columns['author'].append(event.author)
+            columns['event_date'].append(event.event_date)
+            columns['label'].append(event.label)
+    columns['event_date'] = pd.to_datetime(columns['event_date'], utc=True)
+    events_df = pd.DataFrame(columns)
+    return issues_df, events_df
+
+
+def _update_dataframes(frames:Tuple[pd.DataFrame, pd.DataFrame], issues:List[Issue], positions:List[int]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    # Replaces the rows of the issues at the given positions (appending new
+    # ones) and their events, building frames for the changed issues only
+    issues_df, events_df = frames
+    changed_issues_df, changed_events_df = _build_dataframes([issues[p] for p in positions])
+    changed_issues_df.index = positions
+    
+    replaced = [p for p in positions if p < len(issues_df)]
+    replaced_numbers = issues_df['number'].iloc[replaced]
+    issues_df = pd.concat([issues_df.drop(index=replaced), changed_issues_df]).sort_index()
+    events_df = pd.concat([
+        events_df[~events_df['issue_number'].isin(replaced_numbers)],
+        changed_events_df,
+    ], ignore_index=True)
+    return issues_df, events_df
+
+
+def _open_data_file(path:str) -> TextIO:
+    """
+    Opens a data file for reading as text. Files ending in .gz, .xz or
+    .zst are decompressed on the fly while they are read, so compressed
+    dumps never need to be unpacked to disk. Reading .zst files requires
+    the optional zstandard package (or Python 3.14's compression.zstd).
+    """
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    if path.endswith('.xz'):
+        return lzma.open(path, 'rt', encoding='utf-8')
+    if path.endswith('.zst'):
+        try:
+            from compression import zstd
+            return zstd.open(path, 'rt', encoding='utf-8')
+        except ImportError:
+            pass
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError(f'Reading {path} requires the zstandard package (pip install zstandard)')
+        return zstandard.open(path, 'rt', encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+
+def _select_issues(frames:Tuple[pd.DataFrame, pd.DataFrame], numbers:List[int]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    # Returns the rows of the issues with the given numbers and their events
+    issues_df, events_df = frames
+    return issues_df[issues_df['number'].isin(numbers)], events_df[events_df['issue_number'].isin(numbers)]
+
+
+def _iter_json_records(fin:TextIO, chunk_size:int=_CHUNK_SIZE) -> Iterator[any]:
+    """
+    Incrementally decodes the records of a data file from a text stream
+    and yields them one by one. The file is either a top-level JSON array
+    or newline-delimited JSON (one record per line), which is detected
+    from its first character. Only the record currently being decoded and
+    the unread remainder of the buffer are held in memory.
+    """
+    decoder = json.JSONDecoder()
+    buf:str = ''
+    pos:int = 0
+    eof:bool = False
+    
+    def read_more():
+        # Drop the consumed part of the buffer and append the next chunk.
+        # The read size grows with the buffer so that very large records
+        # are not re-decoded once per chunk.
+        nonlocal buf, pos, eof
+        chunk = fin.read(max(chunk_size, len(buf) - pos))
+        buf = buf[pos:] + chunk
+        pos = 0
+        eof = not chunk
+        
+    def next_token() -> str:
+        # Skips whitespace and returns the next character ('' at end of file)
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in _WHITESPACE:
+                pos += 1
+            if pos < len(buf) or eof:
+                return buf[pos:pos+1]
+            read_more()
+    
+    token = next_token()
+    if token == '{':
+        # Newline-delimited JSON: a sequence of objects separated by whitespace
+        delimited = True
+    elif token == '[':
+        delimited = False
+        pos += 1
+        if next_token() == ']':
+            return
+    elif token == '':
+        return
+    else:
+        raise ValueError(f'Expected a JSON array or newline-delimited JSON in {getattr(fin, "name", "the data file")}')
+    
+    while True:
+        next_token()
+        try:
+            element, end = decoder.raw_decode(buf, pos)
+            # A value ending exactly at the buffer boundary may be truncated
+            if end == len(buf) and not eof:
+                raise json.JSONDecodeError('Truncated value', buf, end)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            read_more()
+            continue
+        pos = end
+        yield element
+        
+        token = next_token()
+        if delimited:
+            if token == '':
+                return
+        elif token == ',':
+            pos += 1
+        elif token == ']':
+            return
+        else:
+            raise ValueError(f'Malformed JSON array: unexpected {token!r} at offset {pos}')
     
 
 if __name__ == '__main__':
     # Run the loader for testing
-    DataLoader().get_issues()
\ No newline at end of file
+    DataLoader().get_issues()
@@ -1,42 +1,42 @@
 
-from typing import List
-import matplotlib.pyplot as plt
-import numpy as np
-import pandas as pd
-
-from data_loader import DataLoader
-from model import Issue,Event
+from pipeline import Analysis, Inputs
 import config
+import plotting
+import profiling
+
+# Number of issue creators shown in the bar chart
+TOP_N:int = 50
 
-class ExampleAnalysis:
+class ExampleAnalysis(Analysis):
     """
     Implements an example analysis of GitHub
     issues and outputs the result of that analysis.
     """
     
+    INPUTS = ['issues_df', 'events_df']
+    
     def __init__(self):
         """
         Constructor
         """
         # Parameter is passed in via command line (--user)
         self.USER:str = config.get_parameter('user')
+        if self.USER is not None:
+            # The events of the user are looked up in the index
+            self.INPUTS = ExampleAnalysis.INPUTS + ['index']
     
-    def run(self):
+    def params(self):
+        return {'user': self.USER}
+    
+    def render(self, results):
         """
-        Starting point for this analysis.
+        Outputs the results of this analysis.
         
         Note: this is just an example analysis. You should replace the code here
         with your own implementation and then implement two more such analyses.
         """
-        issues:List[Issue] = DataLoader().get_issues()
-        
         ### BASIC STATISTICS
-        # Calculate the total number of events for a specific user (if specified in command line args)
-        total_events:int = 0
-        for issue in issues:
-            total_events += len([e for e in issue.events if self.USER is None or e.author == self.USER])
-        
-        output:str = f'Found {total_events} events across {len(issues)} issues'
+        output:str = f'Found {results["total_events"]} events across {results["num_issues"]} issues'
         if self.USER is not None:
             output += f' for {self.USER}.'
         else:
@@ -46,16 +46,33 @@ class ExampleAnalysis:
 
         ### BAR CHART
         # Display a graph of the top 50 creators of issues
-        top_n:int = 50
-        # Create a dataframe (with only the creator's name) to make statistics a lot easier
-        df = pd.DataFrame.from_records([{'creator':issue.creator} for issue in issues])
-        # Determine the number of issues for each creator and generate a bar chart of the top N
-        df_hist = df.groupby(df["creator"]).value_counts().nlargest(top_n).plot(kind="bar", figsize=(14,8), title=f"Top {top_n} issue creators")
-        # Set axes labels
-        df_hist.set_xlabel("Creator Names")
-        df_hist.set_ylabel("# of issues created")
-        # Plot the chart
-        plt.show() 
+        plotting.plotCounts(results['top_creators'], f"Top {TOP_N} issue creators", "Creator Names", "# of issues created")
+    
+    def compute(self, inputs:Inputs):
+        """
+        Computes the statistics shown by the analysis.
+        
+        Returns:
+        - A dictionary with the total number of events (of the user, if
+          specified), the number of issues and the number of issues created
+          by each of the top creators.
+        """
+        issues, events = inputs['issues_df'], inputs['events_df']
+        
+        # Calculate the total number of events for a specific user (if specified in command line args)
+        with profiling.stage('count_events'):
+            if self.USER is None:
+                total_events:int = len(events)
+            else:
+                total_events:int = len(inputs['index'].events_by_author(self.USER))
+        
+        # Determine the number of issues for each creator
+        top_creators = issues['creator'].value_counts().nlargest(TOP_N)
+        return {
+            'total_events': total_events,
+            'num_issues': len(issues),
+            'top_creators': {creator: int(count) for creator, count in top_creators.items()},
+        }
                         
     
 
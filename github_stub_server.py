@@ -0,0 +1,175 @@
+"""
+A minimal local stand-in for the parts of the GitHub REST API used by
+collector.py, serving the issues of an existing data file. It supports
+pagination through Link headers, ETag/If-None-Match and an optional
+request quota, so the collector can be exercised without network
+access or rate limits.
+
+Usage:
+
+    python github_stub_server.py --port 8611 --data poetry_issues.json
+    python collector.py --api-url http://localhost:8611 --output test.json
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+from urllib.parse import parse_qs, urlsplit
+
+import config
+
+_ISSUES_PATH = re.compile(r'^/repos/([^/]+/[^/]+)/issues$')
+_TIMELINE_PATH = re.compile(r'^/repos/([^/]+/[^/]+)/issues/(\d+)/timeline$')
+
+
+class StubGitHubServer(ThreadingHTTPServer):
+    """
+    Serves the issues in the data file format as GitHub API responses.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, issues:List[dict], port:int=0, quota:int=None):
+        """
+        Constructor
+
+        Parameters:
+        - issues: Issues in the format read by DataLoader.
+        - port: Port to listen on (0 picks a free port).
+        - quota: Optional number of requests allowed per second before
+          rate-limit errors are returned.
+        """
+        super().__init__(('localhost', port), _Handler)
+        self.issues:List[dict] = issues
+        self.by_number = {issue['number']: issue for issue in issues}
+        self.quota:int = quota
+        self.request_count:int = 0
+        self._window_start:float = time.time()
+        self._window_count:int = 0
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f'http://localhost:{self.server_address[1]}'
+
+    def start(self) -> threading.Thread:
+        """
+        Serves requests in a background thread.
+        """
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+    def take_quota(self) -> float:
+        """
+        Counts a request and returns 0 if it is within the quota, or the
+        reset time of the current window otherwise.
+        """
+        with self._lock:
+            self.request_count += 1
+            now = time.time()
+            if now - self._window_start >= 1:
+                self._window_start, self._window_count = now, 0
+            self._window_count += 1
+            if self.quota is not None and self._window_count > self.quota:
+                return self._window_start + 1
+            return 0
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server:StubGitHubServer = self.server
+        reset = server.take_quota()
+        if reset:
+            self._send(403, b'{"message": "API rate limit exceeded"}',
+                       {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': str(int(reset + 0.999))})
+            return
+
+        parts = urlsplit(self.path)
+        query = parse_qs(parts.query)
+        issues_match = _ISSUES_PATH.match(parts.path)
+        timeline_match = _TIMELINE_PATH.match(parts.path)
+        if issues_match:
+            repo = issues_match.group(1)
+            items = [_to_api_issue(server.url, repo, issue) for issue in server.issues]
+        elif timeline_match and int(timeline_match.group(2)) in server.by_number:
+            items = [_to_api_event(event) for event in server.by_number[int(timeline_match.group(2))].get('events', [])]
+        else:
+            self._send(404, b'{"message": "Not Found"}')
+            return
+
+        per_page = int(query.get('per_page', ['30'])[0])
+        page = int(query.get('page', ['1'])[0])
+        body = json.dumps(items[(page - 1) * per_page:page * per_page]).encode('utf-8')
+        headers = {'ETag': '"' + hashlib.sha1(body).hexdigest() + '"'}
+        if page * per_page < len(items):
+            next_query = dict((key, values[0]) for key, values in query.items())
+            next_query['page'] = str(page + 1)
+            next_url = server.url + parts.path + '?' + '&'.join(f'{k}={v}' for k, v in next_query.items())
+            headers['Link'] = f'<{next_url}>; rel="next"'
+        if self.headers.get('If-None-Match') == headers['ETag']:
+            self._send(304, b'', headers)
+        else:
+            self._send(200, body, headers)
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status:int, body:bytes, headers:dict=None):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def _to_api_issue(base_url:str, repo:str, issue:dict) -> dict:
+    return {
+        'html_url': issue.get('url'),
+        'user': {'login': issue.get('creator')},
+        'labels': [{'name': label} for label in issue.get('labels', [])],
+        'state': issue.get('state'),
+        'assignees': [{'login': assignee} for assignee in issue.get('assignees', [])],
+        'title': issue.get('title'),
+        'body': issue.get('text'),
+        'number': issue.get('number'),
+        'created_at': issue.get('created_date'),
+        'updated_at': issue.get('updated_date'),
+        'timeline_url': f'{base_url}/repos/{repo}/issues/{issue.get("number")}/timeline',
+    }
+
+
+def _to_api_event(event:dict) -> dict:
+    item = {
+        'event': event.get('event_type'),
+        'actor': {'login': event.get('author')},
+        'created_at': event.get('event_date'),
+    }
+    if event.get('label') is not None:
+        item['label'] = {'name': event['label']}
+    if event.get('comment') is not None:
+        item['body'] = event['comment']
+    return item
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser("github_stub_server.py")
+    ap.add_argument('--port', '-p', type=int, default=8611, help='Port to listen on')
+    ap.add_argument('--data', type=str, default=config.get_parameter('ENPM611_PROJECT_DATA_PATH'),
+                    help='Data file with the issues to serve (defaults to ENPM611_PROJECT_DATA_PATH)')
+    ap.add_argument('--quota', type=int, required=False, help='Optional number of requests allowed per second')
+    args = ap.parse_args()
+    with open(args.data, 'r') as fin:
+        server = StubGitHubServer(json.load(fin), args.port, args.quota)
+    print(f'Serving {len(server.issues)} issues on {server.url}')
+    server.serve_forever()
@@ -0,0 +1,517 @@
+"""
+Implements an on-disk columnar cache of the parsed issues so that
+later runs can skip decoding the JSON data file and parsing its dates.
+
+The cache is a directory of NumPy ``.npy`` files that are memory-mapped
+when read. Every rebuild writes its columns into a new subdirectory and
+then switches ``meta.json`` over to it, so files that another process
+(or issues loaded earlier in this process) still map are never
+overwritten. Strings are stored Arrow-style as one UTF-8 byte buffer per
+column plus an offsets array, list-valued fields (labels, assignees,
+events) as offsets into a flat child column, and dates as int64
+microseconds since the epoch (UTC). A ``meta.json`` file records the
+size, modification time and SHA-256 hash of the source data file and the
+subdirectory holding the columns; the cache is ignored as soon as any of
+them changes.
+"""
+
+import logging
+logger = logging.getLogger(__name__)
+
+import functools
+import hashlib
+import itertools
+import json
+import os
+import shutil
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from model import Issue, Event, State
+
+# Bump whenever the on-disk layout changes so stale caches are rebuilt
+CACHE_VERSION:int = 3
+
+_META_FILE:str = 'meta.json'
+# Prefix of the subdirectories holding the columns of one version of the data file
+_COLUMNS_PREFIX:str = 'issues-'
+# Fingerprints known in this process by (path, size, mtime, inode), so that
+# a file is hashed at most once per run
+_FINGERPRINTS:Dict[tuple, Dict[str, any]] = {}
+# Number of issues decoded at a time when the issues are streamed (see iter_issues)
+_STREAM_BATCH:int = 10000
+_NULL_DATE:int = np.iinfo(np.int64).min
+_EPOCH:datetime = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Column names of the issue and event tables
+_ISSUE_STRINGS = ['url', 'creator', 'state', 'title', 'text', 'timeline_url']
+_ISSUE_DATES = ['created_date', 'updated_date']
+_ISSUE_LISTS = ['labels', 'assignees']
+_EVENT_STRINGS = ['event_type', 'author', 'label', 'comment']
+# Low-cardinality columns whose values are interned when read back
+_INTERNED = {'creator', 'labels.items', 'assignees.items', 'events.event_type', 'events.author', 'events.label'}
+
+
+def default_cache_dir(data_path:str) -> str:
+    """
+    Returns the cache directory used for a data file when none is configured.
+    """
+    return f'{data_path}.cache'
+
+
+def source_fingerprint(data_path:str) -> Dict[str, any]:
+    """
+    Computes the size, modification time, inode and content hash of the data file.
+    """
+    stat = os.stat(data_path)
+    memo_key = _memo_key(data_path, stat)
+    if memo_key not in _FINGERPRINTS:
+        sha = hashlib.sha256()
+        with open(data_path, 'rb') as fin:
+            for block in iter(lambda: fin.read(1 << 20), b''):
+                sha.update(block)
+        _FINGERPRINTS[memo_key] = {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'inode': stat.st_ino,
+            'sha256': sha.hexdigest(),
+        }
+    return dict(_FINGERPRINTS[memo_key])
+
+
+def source_digest(data_path:str, cache_dir:str=None) -> str:
+    """
+    Returns the content hash of the data file. If the cache directory holds
+    an up-to-date copy of the file, the hash stored with it is returned
+    without reading the file.
+    """
+    meta = _valid_meta(data_path, cache_dir) if cache_dir is not None else None
+    if meta is not None:
+        return meta['source']['sha256']
+    return source_fingerprint(data_path)['sha256']
+
+
+def is_valid(data_path:str, cache_dir:str) -> bool:
+    """
+    Checks whether the cache directory holds an up-to-date copy of the data file.
+    """
+    return _valid_meta(data_path, cache_dir) is not None
+
+
+def load(data_path:str, cache_dir:str, load_events:bool=True) -> Optional[List[Issue]]:
+    """
+    Loads the issues from the cache, or returns None if the cache is
+    missing or no longer matches the data file. Events are decoded
+    lazily and skipped entirely if load_events is False.
+    """
+    meta = _valid_meta(data_path, cache_dir)
+    if meta is None:
+        return None
+    try:
+        columns = _map_columns(os.path.join(cache_dir, meta['columns']))
+    except (OSError, ValueError):
+        # E.g. the columns were removed by a concurrent rebuild
+        return None
+    return decode_columns(columns, load_events)
+
+
+def iter_issues(data_path:str, cache_dir:str, load_events:bool=True) -> Optional[Iterator[Issue]]:
+    """
+    Streams the issues from the cache a batch at a time, so that only the
+    issues of the current batch are kept in memory, or returns None if the
+    cache is missing or no longer matches the data file. Events are decoded
+    lazily per batch and skipped entirely if load_events is False.
+    """
+    meta = _valid_meta(data_path, cache_dir)
+    if meta is None:
+        return None
+    try:
+        columns = _map_columns(os.path.join(cache_dir, meta['columns']))
+    except (OSError, ValueError):
+        # E.g. the columns were removed by a concurrent rebuild
+        return None
+    return _iter_batches(columns, load_events)
+
+
+def save(data_path:str, cache_dir:str, issues:List[Issue]):
+    """
+    Writes the issues into a new subdirectory of the cache directory and
+    then atomically replaces the metadata file to point to it, so an
+    interrupted write leaves the previous cache in place and files mapped
+    by readers of the previous cache are left untouched. The columns of
+    earlier versions are removed afterwards.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    columns = encode_columns(issues)
+    columns_dir = tempfile.mkdtemp(prefix=_COLUMNS_PREFIX, dir=cache_dir)
+    try:
+        for name, array in columns.items():
+            _write_array(columns_dir, name, array)
+    except BaseException:
+        shutil.rmtree(columns_dir, ignore_errors=True)
+        raise
+
+    meta = {
+        'version': CACHE_VERSION,
+        'source': source_fingerprint(data_path),
+        'columns': os.path.basename(columns_dir),
+        'num_issues': len(issues),
+        'num_events': len(columns['events.event_date']),
+    }
+    _write_meta(cache_dir, meta)
+    _remove_stale_columns(cache_dir, meta['columns'])
+
+
+def encode_columns(issues:List[Issue]) -> Dict[str, np.ndarray]:
+    """
+    Encodes the issues and their events as the arrays stored in the cache
+    (see the module docstring), e.g. to hand them from one process to
+    another in a much more compact form than the Issue objects.
+    """
+    columns:Dict[str, np.ndarray] = {}
+    for name in _ISSUE_STRINGS:
+        columns.update(_encode_strings(name, [_to_str(getattr(issue, name)) for issue in issues]))
+    for name in _ISSUE_DATES:
+        columns[name] = _encode_dates(getattr(issue, name) for issue in issues)
+    for name in _ISSUE_LISTS:
+        values = [getattr(issue, name) or [] for issue in issues]
+        columns[f'{name}.offsets'] = _offsets(values)
+        columns.update(_encode_strings(f'{name}.items', list(itertools.chain.from_iterable(values))))
+    columns['number'] = np.fromiter((issue.number for issue in issues), dtype=np.int64, count=len(issues))
+
+    events = [issue.events for issue in issues]
+    columns['events.offsets'] = _offsets(events)
+    all_events = list(itertools.chain.from_iterable(events))
+    for name in _EVENT_STRINGS:
+        columns.update(_encode_strings(f'events.{name}', [getattr(event, name) for event in all_events]))
+    columns['events.event_date'] = _encode_dates(event.event_date for event in all_events)
+    return columns
+
+
+def decode_columns(columns:Dict[str, np.ndarray], load_events:bool=True) -> List[Issue]:
+    """
+    Builds the issues from arrays returned by encode_columns. Events are
+    decoded lazily and skipped entirely if load_events is False.
+    """
+    return _Columns(columns).issues(load_events)
+
+
+def save_table(cache_dir:str, name:str, table:pd.DataFrame):
+    """
+    Stores a table derived from the cached issues (e.g. the lifecycle
+    metrics) next to their columns, so it is dropped along with them once
+    the data file changes. Numeric, datetime and categorical columns are
+    supported.
+    """
+    columns_dir = _columns_dir(cache_dir)
+    if columns_dir is None:
+        raise FileNotFoundError(f'No issue cache in {cache_dir}')
+    # Written into a temporary directory that is renamed once complete, so
+    # readers never see a partially written table
+    table_dir = tempfile.mkdtemp(prefix=f'{name}-', dir=columns_dir)
+    columns = []
+    for column in table.columns:
+        values = table[column]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            columns.append({'name': column, 'kind': 'category', 'categories': values.cat.categories.tolist()})
+            array = values.cat.codes.to_numpy()
+        elif pd.api.types.is_datetime64_any_dtype(values):
+            columns.append({'name': column, 'kind': 'datetime'})
+            if values.dt.tz is not None:
+                values = values.dt.tz_convert('UTC').dt.tz_localize(None)
+            array = values.to_numpy('datetime64[us]')
+        else:
+            columns.append({'name': column, 'kind': 'numeric'})
+            array = values.to_numpy()
+        _write_array(table_dir, column, array)
+    with open(os.path.join(table_dir, _META_FILE), 'w') as fout:
+        json.dump({'version': CACHE_VERSION, 'columns': columns}, fout, indent=2)
+    try:
+        os.rename(table_dir, os.path.join(columns_dir, name))
+    except OSError:
+        # Another process stored the table first
+        shutil.rmtree(table_dir, ignore_errors=True)
+
+
+def load_table(cache_dir:str, name:str) -> Optional[pd.DataFrame]:
+    """
+    Loads a table stored with save_table, or returns None if it is missing
+    or was computed from a different version of the data file.
+    """
+    columns_dir = _columns_dir(cache_dir)
+    if columns_dir is None:
+        return None
+    table_dir = os.path.join(columns_dir, name)
+    meta = _read_meta(table_dir)
+    if meta is None or meta.get('version') != CACHE_VERSION:
+        return None
+    table = pd.DataFrame()
+    for column in meta['columns']:
+        array = np.load(os.path.join(table_dir, f'{column["name"]}.npy'))
+        if column['kind'] == 'category':
+            values = pd.Categorical.from_codes(array, categories=column['categories'], ordered=True)
+        elif column['kind'] == 'datetime':
+            values = pd.Series(array).dt.tz_localize('UTC')
+        else:
+            values = array
+        table[column['name']] = values
+    return table
+
+
+class _Columns:
+    """
+    Decodes issues from their columns, e.g. memory-mapped from a cache directory.
+    """
+
+    def __init__(self, arrays:Dict[str, np.ndarray]):
+        self._arrays:Dict[str, np.ndarray] = arrays
+        # Events of all issues, decoded on first access (see events)
+        self._events:Optional[List[Event]] = None
+
+    def issues(self, load_events:bool=True) -> List[Issue]:
+        strings = {name: self._strings(name) for name in _ISSUE_STRINGS}
+        dates = {name: self._dates(name) for name in _ISSUE_DATES}
+        lists = {name: self._lists(name) for name in _ISSUE_LISTS}
+        numbers = self._array('number').tolist()
+        event_offsets = self._array('events.offsets').tolist()
+
+        issues:List[Issue] = []
+        for i, number in enumerate(numbers):
+            issue = Issue()
+            issue.url = strings['url'][i]
+            issue.creator = strings['creator'][i]
+            issue.state = State[strings['state'][i]] if strings['state'][i] is not None else None
+            issue.title = strings['title'][i]
+            issue.text = strings['text'][i]
+            issue.timeline_url = strings['timeline_url'][i]
+            issue.number = number
+            issue.created_date = dates['created_date'][i]
+            issue.updated_date = dates['updated_date'][i]
+            issue.labels = lists['labels'][i]
+            issue.assignees = lists['assignees'][i]
+            if load_events:
+                # Events are decoded from their columns on first access
+                issue.set_lazy_events(functools.partial(self.events, event_offsets[i], event_offsets[i+1]))
+            issues.append(issue)
+        return issues
+
+    def events(self, start:int, stop:int) -> List[Event]:
+        """
+        Returns the events in rows [start, stop) of the event columns. The
+        first call decodes the events of all issues at once, which is much
+        cheaper than slicing and decoding every column once per issue.
+        """
+        if self._events is None:
+            strings = [self._strings(f'events.{name}') for name in _EVENT_STRINGS]
+            dates = self._dates('events.event_date')
+            self._events = [_event(*values) for values in zip(*strings, dates)]
+        return self._events[start:stop]
+
+    def _array(self, name:str) -> np.ndarray:
+        return self._arrays[name]
+
+    def _strings(self, name:str) -> List[Optional[str]]:
+        data = self._array(f'{name}.data').tobytes()
+        offsets = self._array(f'{name}.offsets').tolist()
+        if data.isascii():
+            # Byte offsets are character offsets, so the column is decoded at once
+            text = data.decode('ascii')
+            values = [text[offsets[i]:offsets[i+1]] for i in range(len(offsets) - 1)]
+        else:
+            values = [str(data[offsets[i]:offsets[i+1]], 'utf-8') for i in range(len(offsets) - 1)]
+        if name in _INTERNED:
+            # All values are strings until the nulls are filled in below
+            values = list(map(sys.intern, values))
+        for i in np.flatnonzero(self._array(f'{name}.null')).tolist():
+            values[i] = None
+        return values
+
+    def _dates(self, name:str) -> List[Optional[datetime]]:
+        array = self._array(name)
+        nulls = array == _NULL_DATE
+        # timedelta(0, 0, value) and the addition are mapped in C
+        micros = np.where(nulls, 0, array).tolist()
+        values = list(map(_EPOCH.__add__, map(timedelta, itertools.repeat(0), itertools.repeat(0), micros)))
+        for i in np.flatnonzero(nulls).tolist():
+            values[i] = None
+        return values
+
+    def _lists(self, name:str) -> List[List[str]]:
+        offsets = self._array(f'{name}.offsets').tolist()
+        values = self._strings(f'{name}.items')
+        return [values[offsets[i]:offsets[i+1]] for i in range(len(offsets) - 1)]
+
+
+def _iter_batches(columns:Dict[str, np.ndarray], load_events:bool) -> Iterator[Issue]:
+    num_issues = len(columns['number'])
+    for start in range(0, num_issues, _STREAM_BATCH):
+        yield from decode_columns(_slice_rows(columns, start, min(start + _STREAM_BATCH, num_issues)), load_events)
+
+
+def _slice_rows(columns:Dict[str, np.ndarray], start:int, stop:int) -> Dict[str, np.ndarray]:
+    # Returns the columns of issues [start, stop) along with their list
+    # items and events, with the offsets rebased to the slice
+    rows:Dict[str, np.ndarray] = {'number': columns['number'][start:stop]}
+    for name in _ISSUE_STRINGS:
+        rows.update(_slice_strings(columns, name, start, stop))
+    for name in _ISSUE_DATES:
+        rows[name] = columns[name][start:stop]
+    for name in [*_ISSUE_LISTS, 'events']:
+        offsets = columns[f'{name}.offsets'][start:stop+1]
+        rows[f'{name}.offsets'] = offsets - offsets[0]
+        first, last = int(offsets[0]), int(offsets[-1])
+        if name == 'events':
+            for event_name in _EVENT_STRINGS:
+                rows.update(_slice_strings(columns, f'events.{event_name}', first, last))
+            rows['events.event_date'] = columns['events.event_date'][first:last]
+        else:
+            rows.update(_slice_strings(columns, f'{name}.items', first, last))
+    return rows
+
+
+def _slice_strings(columns:Dict[str, np.ndarray], name:str, start:int, stop:int) -> Dict[str, np.ndarray]:
+    offsets = columns[f'{name}.offsets'][start:stop+1]
+    return {
+        f'{name}.data': columns[f'{name}.data'][offsets[0]:offsets[-1]],
+        f'{name}.offsets': offsets - offsets[0],
+        f'{name}.null': columns[f'{name}.null'][start:stop],
+    }
+
+
+def _valid_meta(data_path:str, cache_dir:str) -> Optional[Dict[str, any]]:
+    # Returns the metadata of the cache if it matches the data file
+    meta = _read_meta(cache_dir)
+    if meta is None or meta.get('version') != CACHE_VERSION:
+        return None
+    source = meta.get('source', {})
+    stat = os.stat(data_path)
+    if source.get('size') != stat.st_size:
+        return None
+    memo_key = _memo_key(data_path, stat)
+    if (source.get('mtime_ns'), source.get('inode')) == (stat.st_mtime_ns, stat.st_ino):
+        # The file was not touched since the cache was written, so the stored
+        # hash is trusted and the file is not read
+        _FINGERPRINTS.setdefault(memo_key, dict(source))
+        return meta
+    # The file may have been touched or copied without changing its content
+    current = source_fingerprint(data_path)
+    if source.get('sha256') != current['sha256']:
+        return None
+    # Record the new attributes so the next run does not hash the file again
+    meta['source'] = current
+    try:
+        _write_meta(cache_dir, meta)
+    except OSError:
+        pass
+    return meta
+
+
+def _memo_key(data_path:str, stat:os.stat_result) -> tuple:
+    return (os.path.abspath(data_path), stat.st_size, stat.st_mtime_ns, stat.st_ino)
+
+
+def _columns_dir(cache_dir:str) -> Optional[str]:
+    # Returns the directory of the current columns, if any
+    meta = _read_meta(cache_dir)
+    if meta is None or meta.get('version') != CACHE_VERSION:
+        return None
+    return os.path.join(cache_dir, meta['columns'])
+
+
+def _event(event_type:str, author:str, label:str, comment:str, event_date:datetime) -> Event:
+    # Bypasses __init__, as every attribute is assigned below
+    event = Event.__new__(Event)
+    event.event_type = event_type
+    event.author = author
+    event.event_date = event_date
+    event.label = label
+    event.comment = comment
+    return event
+
+
+def _read_meta(cache_dir:str) -> Optional[Dict[str, any]]:
+    try:
+        with open(os.path.join(cache_dir, _META_FILE), 'r') as fin:
+            return json.load(fin)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_meta(cache_dir:str, meta:Dict[str, any]):
+    # Replaces the metadata file atomically
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as fout:
+            json.dump(meta, fout, indent=2)
+        os.replace(tmp_path, os.path.join(cache_dir, _META_FILE))
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def _remove_stale_columns(cache_dir:str, current:str):
+    # Removes the columns of earlier versions (and the files of the flat
+    # layout used before version 3). On POSIX, processes that still map
+    # them keep reading the removed files; elsewhere removing a mapped file
+    # fails and it is retried after the next rebuild.
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        if name.startswith(_COLUMNS_PREFIX) and name != current:
+            shutil.rmtree(path, ignore_errors=True)
+        elif name.endswith('.npy'):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def _map_columns(columns_dir:str) -> Dict[str, np.ndarray]:
+    # All columns are mapped up front: the mappings keep the files readable
+    # even after a rebuild removed them
+    return {
+        name[:-len('.npy')]: np.load(os.path.join(columns_dir, name), mmap_mode='r')
+        for name in os.listdir(columns_dir) if name.endswith('.npy')
+    }
+
+
+def _write_array(cache_dir:str, name:str, array:np.ndarray):
+    np.save(os.path.join(cache_dir, f'{name}.npy'), array)
+
+
+def _encode_strings(name:str, values:List[Optional[str]]) -> Dict[str, np.ndarray]:
+    encoded = [b'' if value is None else value.encode('utf-8') for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.fromiter((len(value) for value in encoded), dtype=np.int64, count=len(encoded))
+    np.cumsum(offsets, out=offsets)
+    return {
+        f'{name}.data': np.frombuffer(b''.join(encoded), dtype=np.uint8),
+        f'{name}.offsets': offsets,
+        f'{name}.null': np.array([value is None for value in values], dtype=bool),
+    }
+
+
+def _offsets(lists:List[list]) -> np.ndarray:
+    offsets = np.zeros(len(lists) + 1, dtype=np.int64)
+    offsets[1:] = np.fromiter((len(values) for values in lists), dtype=np.int64, count=len(lists))
+    return np.cumsum(offsets)
+
+
+def _encode_dates(dates) -> np.ndarray:
+    # Naive datetimes are interpreted as UTC
+    def encode(date:Optional[datetime]) -> int:
+        if date is None:
+            return _NULL_DATE
+        if date.tzinfo is None:
+            date = date.replace(tzinfo=timezone.utc)
+        return (date - _EPOCH) // timedelta(microseconds=1)
+    return np.fromiter((encode(date) for date in dates), dtype=np.int64)
+
+
+def _to_str(value) -> Optional[str]:
+    # Enum-valued fields such as the issue state are stored by value
+    return getattr(value, 'value', value)
@@ -0,0 +1,138 @@
+"""
+Secondary indexes over the loaded issues so that filtered queries
+(e.g. --user X --label Y) become set intersections instead of scans
+over the whole issue list. The indexes can be updated in place when
+issues are added or replaced (see DataLoader.apply_delta).
+
+Issues are identified by their position in the list returned by
+DataLoader.get_issues(), which is also their row in the issues
+DataFrame. Events are identified by (issue id, position in issue.events).
+"""
+
+from collections import defaultdict
+from typing import Dict, List, Set, Tuple
+
+from model import Issue
+
+EventId = Tuple[int, int]
+
+
+class IssueIndex:
+    """
+    Maps creator, label, state and number to issue ids, and event type and
+    event author to event ids. The event indexes are only built the first time
+    they are queried so that lazily loaded events stay undecoded for
+    analyses that never look at them.
+    """
+
+    def __init__(self, issues:List[Issue]):
+        """
+        Constructor
+        """
+        self.issues:List[Issue] = issues
+        self.by_creator:Dict[str, Set[int]] = defaultdict(set)
+        self.by_label:Dict[str, Set[int]] = defaultdict(set)
+        self.by_state:Dict[str, Set[int]] = defaultdict(set)
+        self.by_number:Dict[int, int] = {}
+        self._by_event_type:Dict[str, Set[EventId]] = None
+        self._by_event_author:Dict[str, Set[EventId]] = None
+
+        for issue_id in range(len(issues)):
+            self._add_issue(issue_id)
+
+    def add(self, issue_id:int):
+        """
+        Indexes the issue at the given position, e.g. after it was appended
+        to or replaced in the issue list.
+        """
+        self._add_issue(issue_id)
+        if self._by_event_type is not None:
+            self._add_events(issue_id)
+
+    def remove(self, issue_id:int):
+        """
+        Removes the issue at the given position from the index. Must be
+        called before the issue is replaced in the issue list.
+        """
+        issue = self.issues[issue_id]
+        self.by_creator[issue.creator].discard(issue_id)
+        for label in issue.labels:
+            self.by_label[label].discard(issue_id)
+        if issue.state is not None:
+            self.by_state[issue.state.value].discard(issue_id)
+        self.by_number.pop(issue.number, None)
+        if self._by_event_type is not None:
+            for position, event in enumerate(issue.events):
+                self._by_event_type[event.event_type].discard((issue_id, position))
+                self._by_event_author[event.author].discard((issue_id, position))
+
+    def issue_ids(self, creator:str=None, label:str=None, state:str=None) -> Set[int]:
+        """
+        Returns the ids of the issues matching all of the given criteria.
+        Criteria that are None are ignored.
+        """
+        selected:List[Set[int]] = []
+        if creator is not None:
+            selected.append(self.by_creator.get(creator, set()))
+        if label is not None:
+            selected.append(self.by_label.get(label, set()))
+        if state is not None:
+            selected.append(self.by_state.get(state, set()))
+        if not selected:
+            return set(range(len(self.issues)))
+        # Intersect starting from the smallest set
+        selected.sort(key=len)
+        return set.intersection(*selected)
+
+    def filter(self, creator:str=None, label:str=None, state:str=None) -> List[Issue]:
+        """
+        Returns the issues matching all of the given criteria in their original order.
+        """
+        return [self.issues[i] for i in sorted(self.issue_ids(creator, label, state))]
+
+    def events_by_type(self, event_type:str) -> Set[EventId]:
+        """
+        Returns the ids of all events of the given type.
+        """
+        self.build_event_indexes()
+        return self._by_event_type.get(event_type, set())
+
+    def events_by_author(self, author:str) -> Set[EventId]:
+        """
+        Returns the ids of all events authored by the given user.
+        """
+        self.build_event_indexes()
+        return self._by_event_author.get(author, set())
+
+    def build_event_indexes(self):
+        """
+        Builds the event indexes now instead of on first use, e.g. before
+        the index is shared with request threads.
+        """
+        if self._by_event_type is not None:
+            return
+        self._by_event_type = defaultdict(set)
+        self._by_event_author = defaultdict(set)
+        for issue_id in range(len(self.issues)):
+            self._add_events(issue_id)
+
+    def event(self, event_id:EventId):
+        """
+        Resolves an event id to the Event object.
+        """
+        issue_id, position = event_id
+        return self.issues[issue_id].events[position]
+
+    def _add_issue(self, issue_id:int):
+        issue = self.issues[issue_id]
+        self.by_creator[issue.creator].add(issue_id)
+        for label in issue.labels:
+            self.by_label[label].add(issue_id)
+        if issue.state is not None:
+            self.by_state[issue.state.value].add(issue_id)
+        self.by_number[issue.number] = issue_id
+
+    def _add_events(self, issue_id:int):
+        for position, event in enumerate(self.issues[issue_id].events):
+            self._by_event_type[event.event_type].add((issue_id, position))
+            self._by_event_author[event.author].add((issue_id, position))
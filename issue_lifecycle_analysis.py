@@ -1,50 +1,41 @@
+import pandas as pd
+
 import config
-from data_loader import DataLoader
-from model import Issue
-from typing import List
+import profiling
+from lifecycle import reopened_lifecycles
+from pipeline import Analysis, Inputs
+from trend_cube import ALL_LABELS
 from plotting import plot_gantt_chart, plot_reopening_trend, plot_reopened_issue_timing
 
-class IssueLifecycleAnalysis:
+class IssueLifecycleAnalysis(Analysis):
+    # The lifecycles are extracted once and fed to all charts
+    INPUTS = ['lifecycles', 'lifecycle_metrics', 'trend_cube']
+    VERSION = 3
+    
     def __init__(self):
         self.USER:str = config.get_parameter('user')
         self.FEATURE:str = config.get_parameter('feature')
     
-    def run(self):
-        IssueLifecycleAnalysis.plot_lifecycle()
-    
-    def plot_lifecycle():
-        issues_list:List[Issue] = DataLoader().get_issues()
-        reopened_issues_list: List[Issue] = []
-        gantt_data = []
-        
-        for i in issues_list:
-            for e in i.events:
-                if e.event_type == 'reopened':
-                    reopened_issues_list.append(i)
-        
-        j=1            
-        for i in reopened_issues_list:
-            lifecycle = {
-                "issue_number": j,
-                "issue_id": i.number,
-                "created_date": i.created_date,
-                "updated_date": i.updated_date,
-                "closed_dates": [],
-                "reopened_dates": [],
-            }
-            
-            for e in i.events:
-                if e.event_type == "reopened":
-                    lifecycle["reopened_dates"].append(e.event_date)
-                if e.event_type == "closed":
-                    lifecycle["closed_dates"].append(e.event_date)
-                    
-            gantt_data.append(lifecycle)
-            j+=1
+    def render(self, results):
+        gantt_data = results['lifecycles']
         
         plot_gantt_chart(gantt_data)
-        plot_reopening_trend(reopened_issues_list)
-        plot_reopened_issue_timing(reopened_issues_list)
+        plot_reopening_trend(results['reopenings_per_month'])
+        plot_reopened_issue_timing(results['reopen_latency_counts'])
+    
+    def compute(self, inputs:Inputs):
+        # Each reopened issue is listed once, in the order of the issue list
+        with profiling.stage('reopened_lifecycles'):
+            gantt_data = reopened_lifecycles(inputs['lifecycles'])
+        # The monthly reopen counts of all issues are a slice of the trend cube
+        reopenings = inputs['trend_cube'].trend('reopened')
+        # The reopen timing of each issue is a column of the stored lifecycle metrics
+        reopen_latency_counts = inputs['lifecycle_metrics']['reopen_latency_bucket'].value_counts()
+        return {
+            'lifecycles': gantt_data,
+            'reopenings_per_month': reopenings[ALL_LABELS] if ALL_LABELS in reopenings else pd.Series(dtype='int64'),
+            'reopen_latency_counts': reopen_latency_counts,
+        }
 
 if __name__ == '__main__':
     IssueLifecycleAnalysis().run()
\ No newline at end of file
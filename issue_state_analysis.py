@@ -1,16 +1,18 @@
-from typing import List
 import pandas as pd
 
-from data_loader import DataLoader
-from model import Issue
+from pipeline import Analysis, Inputs
 import config
 import plotting
+import profiling
 
-class IssueStateAnalysis:
+class IssueStateAnalysis(Analysis):
     """
     Analyzes issue activity by state (open vs. closed).
     """
     
+    # Issues of the user and/or with the label
+    INPUTS = ['selected_issues_df']
+    
     def __init__(self):
         """
         Constructor
@@ -20,42 +22,40 @@ class IssueStateAnalysis:
         # Parameter is passed in via command line (--label)
         self.LABEL:str = config.get_parameter('label')
         
-    def run(self):
+    def params(self):
+        return {'user': self.USER, 'label': self.LABEL}
+        
+    def render(self, state_counts):
         """
-        Runs the analysis.
+        Prints and plots the number of issues per state.
         """
-        issues:List[Issue] = DataLoader().get_issues()
-        
-        # Optionally filter issues by user and/or label
-        if self.USER:
-            issues = [issue for issue in issues if issue.creator == self.USER]
-        if self.LABEL:
-            issues = [issue for issue in issues if self.LABEL in issue.labels]
-        
-        # Count issues by state
-        state_counts = self.count_issue_states(issues)
-        
         # Print the counts
         print(f'\nIssue counts by state: {state_counts}\n')
         
         # Plot the issue states using the generic pie_chart function
         plotting.pie_chart(state_counts, title='Issue States')
     
-    def count_issue_states(self, issues: List[Issue]):
+    def compute(self, inputs:Inputs):
+        """
+        Counts the issues, filtered by user and/or label, by state.
+        
+        Returns:
+        - A dictionary with states as keys and counts as values.
+        """
+        return self.count_issue_states(inputs['selected_issues_df'])
+    
+    @profiling.profiled('count_issue_states')
+    def count_issue_states(self, issues: pd.DataFrame):
         """
         Counts the number of issues per state.
         
         Parameters:
-        - issues: List of Issue objects.
+        - issues: DataFrame of issues (see DataLoader.get_dataframes).
         
         Returns:
         - A dictionary with states as keys and counts as values.
         """
-        state_counts = {}
-        for issue in issues:
-            state = issue.state.value  # Assuming issue.state is an Enum
-            state_counts[state] = state_counts.get(state, 0) + 1
-        return state_counts
+        return {state: int(count) for state, count in issues['state'].value_counts(sort=False).items()}
 
 if __name__ == '__main__':
     IssueStateAnalysis().run()
@@ -1,11 +1,18 @@
 from typing import List
-from plotting import plotList, plotSeries, plotLabelOverTime
+import pandas as pd
+from plotting import plotCounts, plotLabelOverTime
 
-from data_loader import DataLoader
+from issue_index import IssueIndex
 from model import Issue
+from pipeline import Analysis, Inputs
+from trend_cube import CREATED, TrendCube
 import config
+import profiling
 
-class LabelAnalysis:
+# Number of labels shown in the top labels chart
+TOP_NUM:int = 20
+
+class LabelAnalysis(Analysis):
     """
     Implements a label analysis of the Github issues
     Performs the following subroutines:
@@ -21,67 +28,106 @@ class LabelAnalysis:
             - Plots the number of new issues created with a user input label by time (does nothing if no label is input)
     """
     
+    INPUTS = ['issues', 'issues_df', 'events_df', 'index']
+    VERSION = 2
+    
     def __init__(self):
         """
         Constructor
         """
         # Parameter is passed in via command line (--label)
         self.LABEL:str = config.get_parameter('label')
+        if self.LABEL is not None:
+            # The trend of the label is sliced from the trend cube
+            self.INPUTS = LabelAnalysis.INPUTS + ['trend_cube']
+        
+    def params(self):
+        return {'label': self.LABEL}
         
-    def run(self):
+    def render(self, results):
         """
-        Run the label analysis
+        Outputs the results of the label analysis
         """
-        issues:List[Issue] = DataLoader().get_issues()
-        numIssues:int = len(issues)
+        numIssues:int = results['numIssues']
         
-        # Store the labels in a list, run subroutines
-        all_labels = [label for issue in issues for label in issue.labels]
-        
-        # Calculate number of unique labels, total number of issues with an input label (all by default)
-        numUniqueLabels, numIssuesWithLabel = self.simpleLabelAnalysis(issues, all_labels, self.LABEL)
         # Create output string
-        output:str = f'\nNumber of unique labels: {numUniqueLabels}\n'
-        output += f'\nFound {numIssuesWithLabel} issues across {numIssues} issues'
+        output:str = f'\nNumber of unique labels: {results["numUniqueLabels"]}\n'
+        output += f'\nFound {results["numIssuesWithLabel"]} issues across {numIssues} issues'
         if self.LABEL is not None:
             output += f' with label {self.LABEL}'
         output += f'.\n'
         print(output)
         
         # Display a graph of the top 20 labels
-        top_num:int = 20
-        column:str = "label"
-        title:str  = f"Top {top_num} labels"
+        title:str  = f"Top {TOP_NUM} labels"
         xlabel:str = "Issue Labels"
         ylabel:str = "# of Issues"
-        plotList(all_labels, column, top_num, title, xlabel, ylabel)
+        plotCounts(results['topLabels'], title, xlabel, ylabel)
         
-        # Get the average number of unlabeling events per issue, plot distribution of unlabeling events per issue
-        unlabeling_counts, numUnlabelEvents = self.simpleUnlabelingAnalysis(issues)
-        output:str = f'Average number of unlabeling events per issue: {numUnlabelEvents/numIssues:.3f}\n'
+        # Print the average number of unlabeling events per issue, plot distribution of unlabeling events per issue
+        output:str = f'Average number of unlabeling events per issue: {results["numUnlabelEvents"]/numIssues:.3f}\n'
         print(output)
         title:str  = "Distribution of Issues by Number of Unlabeling Events"
         xlabel:str = "# of Unlabeling Events per Issue"
         ylabel:str = "# of Issues"
-        plotSeries(unlabeling_counts, title, xlabel, ylabel)
+        plotCounts(results['unlabelingDistribution'], title, xlabel, ylabel)
         
         # Stop here if there was no user inputted label
         if self.LABEL is None:
-            exit()
+            return
         
         # Show creation trends over time for user inputted parameter label
-        newIssueDatesWithLabel = self.getNewIssueDatesWithLabel(issues, self.LABEL)
+        if results['labelTrend'].empty:
+            print(f'No issues with label {self.LABEL}.\n')
+            return
         title:str  = f"Trends Over Time For Label: {self.LABEL}"
         xlabel:str = "Month"
         ylabel:str = "# of Issues"
-        plotLabelOverTime(newIssueDatesWithLabel, title, xlabel, ylabel)
+        plotLabelOverTime(results['labelTrend'], title, xlabel, ylabel)
+    
+    def compute(self, inputs:Inputs):
+        """
+        Computes the aggregates shown by the analysis.
+        
+        Returns:
+        - A dictionary with the number of issues, the number of unique labels,
+          the number of issues with the input label, the counts of the top
+          labels, the number of issues by number of unlabeling events, the
+          total number of unlabeling events and, if a label was input, the
+          number of new issues with that label per month.
+        """
+        issues:List[Issue] = inputs['issues']
+        issues_df, events_df = inputs['issues_df'], inputs['events_df']
         
-    def simpleLabelAnalysis(self, issues:List[Issue], all_labels:List[str], label:str=None):
+        # Store the labels in a list, run subroutines
+        with profiling.stage('collect_labels'):
+            all_labels = [label for issue in issues for label in issue.labels]
+        
+        # Calculate number of unique labels, total number of issues with an input label (all by default)
+        numUniqueLabels, numIssuesWithLabel = self.simpleLabelAnalysis(inputs['index'], all_labels, self.LABEL)
+        topLabels = pd.Series(all_labels, dtype=object).value_counts().nlargest(TOP_NUM)
+        
+        # Get the number of unlabeling events per issue
+        unlabeling_counts, numUnlabelEvents = self.simpleUnlabelingAnalysis(issues_df, events_df)
+        unlabelingDistribution = pd.Series(unlabeling_counts, dtype='int64').value_counts().sort_index()
+        
+        return {
+            'numIssues': len(issues),
+            'numUniqueLabels': numUniqueLabels,
+            'numIssuesWithLabel': numIssuesWithLabel,
+            'topLabels': {label: int(count) for label, count in topLabels.items()},
+            'unlabelingDistribution': {int(k): int(count) for k, count in unlabelingDistribution.items()},
+            'numUnlabelEvents': int(numUnlabelEvents),
+            'labelTrend': self.getLabelTrend(inputs['trend_cube'], [self.LABEL]) if self.LABEL is not None else None,
+        }
+        
+    @profiling.profiled('simpleLabelAnalysis')
+    def simpleLabelAnalysis(self, index:IssueIndex, all_labels:List[str], label:str=None):
         """
         Performs simple label analysis of issues.
         
         Parameters:
-        - issues: List of Issue objects.
+        - index: Index over the issues (see DataLoader.get_index).
         - all_labels: List labels from each issue.
         - label: Label with which to search for issues.
         
@@ -89,36 +135,40 @@ class LabelAnalysis:
         - The number of unique labels amongst all of the issues.
         - The number of issues that contain the label (all issues if label is None).
         """
-        return len(set(all_labels)), len([issue for issue in issues if label is None or label in issue.labels])
+        return len(set(all_labels)), len(index.issue_ids(label=label))
         
-    def simpleUnlabelingAnalysis(self, issues:List[Issue]):
+    @profiling.profiled('simpleUnlabelingAnalysis')
+    def simpleUnlabelingAnalysis(self, issues:pd.DataFrame, events:pd.DataFrame):
         """
         Performs simple unlabeling analysis of issues.
         
         Parameters:
-        - issues: List of Issue objects.
+        - issues: DataFrame of issues (see DataLoader.get_dataframes).
+        - events: DataFrame of events (see DataLoader.get_dataframes).
         
         Returns:
         - A list of the number of unlabeling events per issue.
         - The total number of unlabeling events amongst all of the issues.
         """
-        # Count the number of unlabeling events per issue
-        unlabeling_counts = [sum(1 for event in issue.events if event.event_type == "unlabeled") for issue in issues]
+        # Count the number of unlabeling events per issue, including issues without any
+        unlabeled = events.loc[events['event_type'] == "unlabeled", 'issue_number']
+        unlabeling_counts = unlabeled.value_counts().reindex(issues['number'], fill_value=0).tolist()
         return unlabeling_counts, sum(unlabeling_counts)
         
-    def getNewIssueDatesWithLabel(self, issues:List[Issue], labelIn:str):
+    @profiling.profiled('getLabelTrend')
+    def getLabelTrend(self, cube:TrendCube, labels:List[str]):
         """
-        Gets creation dates of issues with the input label.
+        Gets the number of new issues per month with each of the given labels.
         
         Parameters:
-        - issues: List of Issue objects.
-        - labelIn: Label with which to search for issues.
+        - cube: Trend cube of the issues (see DataLoader.get_trend_cube).
+        - labels: Labels to count the new issues of.
         
         Returns:
-        - A list of dictionaries with label & created_date values.
+        - A DataFrame with one row per month and one column per label.
         """
-        # Create a list of dictionaries with label & created_date values
-        return [{"date": issue.created_date, "label": label} for issue in issues for label in issue.labels if label == labelIn]
+        # Sliced from the trend cube, so any number of labels takes a single lookup
+        return cube.trend(CREATED, labels=labels)
         
 if __name__ == '__main__':
     # Invoke run method when running this module directly
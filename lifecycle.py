@@ -0,0 +1,180 @@
+"""
+Extracts the lifecycle (created -> closed -> reopened) of every issue
+in a single pass over the events so that the lifecycle charts do not
+each have to rescan the events of the same issues, and derives
+per-issue lifecycle metrics from it.
+"""
+
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+# Buckets of the time between closing and reopening an issue, and their
+# inclusive upper bounds in whole days
+REOPEN_LATENCY_BUCKETS = [
+    "within a day", "within a week", "7-14 days",
+    "14 days to a month", "1-6 months", "6-12 months", "after one year"
+]
+_LATENCY_BINS = [-np.inf, 1, 6, 13, 29, 181, 364, np.inf]
+
+
+def extract_lifecycles(issues:pd.DataFrame, events:pd.DataFrame) -> pd.DataFrame:
+    """
+    Builds one lifecycle row per issue from the DataFrames returned by
+    DataLoader.get_dataframes().
+
+    Parameters:
+    - issues: DataFrame of issues.
+    - events: DataFrame of events.
+
+    Returns:
+    - A DataFrame in the order of the issues with the columns issue_id
+      (the issue number), created_date, updated_date, closed_dates and
+      reopened_dates. The last two hold the dates of the closed and
+      reopened events of the issue in event order.
+    """
+    # One scan over all events keeps only the lifecycle transitions...
+    transitions = events[events['event_type'].isin(['closed', 'reopened'])]
+    # ...which are then grouped into one list of dates per issue and event type
+    dates = transitions.groupby(['issue_number', 'event_type'], sort=False)['event_date'].agg(list).unstack('event_type')
+
+    lifecycles = issues[['number', 'created_date', 'updated_date']].rename(columns={'number': 'issue_id'}).reset_index(drop=True)
+    for event_type, column in (('closed', 'closed_dates'), ('reopened', 'reopened_dates')):
+        per_issue = dates[event_type] if event_type in dates else pd.Series(dtype=object)
+        lifecycles[column] = [
+            value if isinstance(value, list) else []
+            for value in per_issue.reindex(lifecycles['issue_id']).tolist()
+        ]
+    return lifecycles
+
+
+def reopened_lifecycles(lifecycles:pd.DataFrame) -> List[dict]:
+    """
+    Returns the lifecycles of the issues that were reopened at least once,
+    each issue exactly once, as a list of dicts numbered from 1 in the
+    order of the issues (the format expected by the lifecycle charts).
+    """
+    reopened = lifecycles[lifecycles['reopened_dates'].map(len) > 0]
+    records = reopened.to_dict('records')
+    for j, record in enumerate(records, start=1):
+        record['issue_number'] = j
+    return records
+
+
+def latency_bucket(days:int) -> str:
+    """
+    Returns the reopen latency bucket (see REOPEN_LATENCY_BUCKETS) of a
+    number of whole days between closing and reopening an issue.
+    """
+    for upper_bound, bucket in zip(_LATENCY_BINS[1:], REOPEN_LATENCY_BUCKETS):
+        if days <= upper_bound:
+            return bucket
+
+
+def dataset_as_of(issues:pd.DataFrame, events:pd.DataFrame) -> pd.Timestamp:
+    """
+    Returns the latest date in the dataset, which is the end of the open
+    interval of issues that are still open.
+    """
+    return max(issues['updated_date'].max(), events['event_date'].max()) if len(events) else issues['updated_date'].max()
+
+
+def compute_lifecycle_metrics(issues:pd.DataFrame, events:pd.DataFrame, as_of:pd.Timestamp=None) -> pd.DataFrame:
+    """
+    Computes per-issue lifecycle durations from the DataFrames returned by
+    DataLoader.get_dataframes(), so that lifecycle queries and histograms
+    are column lookups instead of event replays.
+
+    Parameters:
+    - issues: DataFrame of issues.
+    - events: DataFrame of events.
+    - as_of: End of the open interval of issues that are still open
+      (the latest date in the dataset by default).
+
+    Returns:
+    - A DataFrame in the order of the issues with the columns
+        - issue_id: the issue number
+        - created_date, first_closed_date
+        - time_to_first_close_days: days from creation to the first close (NaN if never closed)
+        - reopen_count: number of reopened events
+        - total_open_days: days spent open across all reopen cycles; issues that are
+          still open count until as_of
+        - currently_open: whether the last transition of the issue left it open
+        - first_reopen_latency_days: days from the close preceding the first reopen to
+          that reopen (NaN if never reopened)
+        - reopen_latency_bucket: first_reopen_latency_days in the buckets of
+          REOPEN_LATENCY_BUCKETS
+    """
+    # All state transitions per issue in time order, with the creation as the first one
+    transitions = pd.concat([
+        pd.DataFrame({'issue_number': issues['number'], 'event_type': 'created', 'event_date': issues['created_date']}),
+        events.loc[events['event_type'].isin(['closed', 'reopened']), ['issue_number', 'event_type', 'event_date']],
+    ], ignore_index=True).sort_values(['issue_number', 'event_date'], kind='stable')
+    by_issue = transitions.groupby('issue_number', sort=False)
+    transitions['next_date'] = by_issue['event_date'].shift(-1)
+    transitions['previous_type'] = by_issue['event_type'].shift(1)
+    transitions['previous_date'] = by_issue['event_date'].shift(1)
+
+    # Every creation/reopening starts an open interval lasting until the next transition
+    if as_of is None:
+        as_of = dataset_as_of(issues, events)
+    opens = transitions[transitions['event_type'] != 'closed']
+    open_days = _days(opens['next_date'].fillna(as_of) - opens['event_date'])
+    total_open_days = open_days.groupby(opens['issue_number']).sum()
+    currently_open = opens.loc[opens['next_date'].isna(), 'issue_number'].unique()
+
+    closes = transitions[transitions['event_type'] == 'closed']
+    first_closed_date = closes.groupby('issue_number')['event_date'].min()
+
+    reopens = transitions[transitions['event_type'] == 'reopened']
+    reopen_count = reopens.groupby('issue_number').size()
+    first_reopen = reopens.groupby('issue_number').first()
+    first_reopen_latency = _days(first_reopen['event_date'] - first_reopen['previous_date']) \
+        .where(first_reopen['previous_type'] == 'closed')
+
+    numbers = issues['number']
+    metrics = pd.DataFrame({
+        'issue_id': numbers.array,
+        'created_date': issues['created_date'].array,
+        'first_closed_date': first_closed_date.reindex(numbers).array,
+        'reopen_count': reopen_count.reindex(numbers, fill_value=0).array,
+        'total_open_days': total_open_days.reindex(numbers).array,
+        'currently_open': numbers.isin(currently_open).array,
+        'first_reopen_latency_days': first_reopen_latency.reindex(numbers).array,
+    })
+    metrics.insert(3, 'time_to_first_close_days', _days(metrics['first_closed_date'] - metrics['created_date']))
+    metrics['reopen_latency_bucket'] = pd.cut(
+        np.floor(metrics['first_reopen_latency_days']), bins=_LATENCY_BINS, labels=REOPEN_LATENCY_BUCKETS
+    )
+    return metrics
+
+
+def _days(durations:pd.Series) -> pd.Series:
+    return durations.dt.total_seconds() / 86400
+
+
+def update_lifecycle_metrics(metrics:pd.DataFrame, issues:pd.DataFrame, events:pd.DataFrame,
+                             positions:List[int], previous_as_of:pd.Timestamp) -> pd.DataFrame:
+    """
+    Updates the metrics after the issues at the given positions were added
+    or replaced. Only the changed issues are recomputed; issues that are
+    still open just have their open time extended to the new end of the dataset.
+
+    Parameters:
+    - metrics: Metrics computed before the change.
+    - issues: DataFrame of issues after the change.
+    - events: DataFrame of events after the change.
+    - positions: Rows of the issues that were added or replaced.
+    - previous_as_of: Latest date in the dataset before the change.
+    """
+    as_of = dataset_as_of(issues, events)
+    metrics = metrics.copy()
+    extension = _days(pd.Series([as_of - previous_as_of])).iloc[0]
+    metrics.loc[metrics['currently_open'], 'total_open_days'] += extension
+
+    changed_issues = issues.iloc[positions]
+    changed_events = events[events['issue_number'].isin(changed_issues['number'])]
+    changed = compute_lifecycle_metrics(changed_issues, changed_events, as_of)
+    changed.index = positions
+    return pd.concat([metrics.drop(index=[p for p in positions if p in metrics.index]), changed]).sort_index()
@@ -3,10 +3,57 @@ Implements a runtime data model that can be used to access
 the properties contained in the issues JSON.
 """
 
-from typing import List, Dict, Set, Tuple
+from typing import Callable, List, Dict, Set, Tuple, Union
 from enum import Enum
 from datetime import datetime
-from dateutil import parser
+import sys
+
+# Number of dates that did not match the fixed ISO-8601 format and had
+# to be parsed by dateutil. A growing count means the data format drifted.
+_date_fallbacks:int = 0
+
+
+def parse_date(value:str) -> datetime:
+    """
+    Parses a timestamp from the issues JSON. GitHub timestamps use the
+    fixed ISO-8601 format (e.g. 2024-01-31T12:00:00Z), which is decoded
+    directly; anything else falls back to the much slower dateutil parser.
+    """
+    global _date_fallbacks
+    if value is None:
+        return None
+    try:
+        # fromisoformat only accepts the 'Z' suffix from Python 3.11 on
+        return datetime.fromisoformat(value[:-1] + '+00:00' if value.endswith('Z') else value)
+    except (AttributeError, TypeError, ValueError):
+        pass
+    _date_fallbacks += 1
+    # Imported here as it is rarely needed and slow to import
+    from dateutil import parser
+    return parser.parse(value)
+
+
+def date_fallback_count() -> int:
+    """
+    Returns how many dates had to be parsed with dateutil so far.
+    """
+    return _date_fallbacks
+
+
+def record_date_fallbacks(count:int):
+    """
+    Adds fallbacks that happened elsewhere, e.g. in a worker process.
+    """
+    global _date_fallbacks
+    _date_fallbacks += count
+
+
+def intern(value:str) -> str:
+    """
+    Interns strings that repeat across many records (event types, user
+    names, labels) so that all records share a single copy.
+    """
+    return sys.intern(value) if type(value) is str else value
 
 
 class State(str, Enum):
@@ -19,6 +66,9 @@ class State(str, Enum):
 
 class Event:
     
+    # Events are by far the most numerous objects, so avoid a per-instance __dict__
+    __slots__ = ('event_type', 'author', 'event_date', 'label', 'comment')
+    
     def __init__(self, jobj:any):
         self.event_type:str = None
         self.author:str = None
@@ -30,19 +80,23 @@ class Event:
             self.from_json(jobj)
     
     def from_json(self, jobj:any):
-        self.event_type = jobj.get('event_type')
-        self.author = jobj.get('author')
+        self.event_type = intern(jobj.get('event_type'))
+        self.author = intern(jobj.get('author'))
         try:
-            self.event_date = parser.parse(jobj.get('event_date'))
+            self.event_date = parse_date(jobj.get('event_date'))
         except:
             pass
-        self.label = jobj.get('label')
+        self.label = intern(jobj.get('label'))
         self.comment = jobj.get('comment')
         
         
 class Issue:
     
-    def __init__(self, jobj:any=None):
+    __slots__ = ('url', 'creator', 'labels', 'state', 'assignees', 'title', 'text',
+                 'number', 'created_date', 'updated_date', 'timeline_url',
+                 '_events', '_events_source')
+    
+    def __init__(self, jobj:any=None, load_events:bool=True):
         self.url:str = None
         self.creator:str = None
         self.labels:List[str] = []
@@ -54,17 +108,46 @@ class Issue:
         self.created_date:datetime = None
         self.updated_date:datetime = None
         self.timeline_url:str = None
-        self.events:List[Event] = []
+        self._events:List[Event] = []
+        # Raw events (list of JSON objects or a callable returning Event objects)
+        # that have not been decoded yet
+        self._events_source:Union[List[any], Callable[[], List[Event]]] = None
         
         if jobj is not None:
-            self.from_json(jobj)
+            self.from_json(jobj, load_events)
     
-    def from_json(self, jobj:any):
+    @property
+    def events(self) -> List[Event]:
+        """
+        The events of the issue. They are only decoded on first access so that
+        analyses which never look at events do not pay for parsing them.
+        """
+        if self._events is None:
+            source, self._events_source = self._events_source, None
+            if callable(source):
+                self._events = source()
+            else:
+                self._events = [Event(jevent) for jevent in source or []]
+        return self._events
+    
+    @events.setter
+    def events(self, events:List[Event]):
+        self._events = events
+        self._events_source = None
+    
+    def set_lazy_events(self, source:Union[List[any], Callable[[], List[Event]]]):
+        """
+        Defers decoding of the events until they are first accessed.
+        """
+        self._events = None
+        self._events_source = source
+    
+    def from_json(self, jobj:any, load_events:bool=True):
         self.url = jobj.get('url')
-        self.creator = jobj.get('creator')
-        self.labels = jobj.get('labels',[])
+        self.creator = intern(jobj.get('creator'))
+        self.labels = [intern(label) for label in jobj.get('labels',[])]
         self.state = State[jobj.get('state')]
-        self.assignees = jobj.get('assignees',[])
+        self.assignees = [intern(assignee) for assignee in jobj.get('assignees',[])]
         self.title = jobj.get('title')
         self.text = jobj.get('text')
         try:
@@ -72,12 +155,15 @@ class Issue:
         except:
             pass
         try:
-            self.created_date = parser.parse(jobj.get('created_date'))
+            self.created_date = parse_date(jobj.get('created_date'))
         except:
             pass
         try:
-            self.updated_date = parser.parse(jobj.get('updated_date'))
+            self.updated_date = parse_date(jobj.get('updated_date'))
         except:
             pass
         self.timeline_url = jobj.get('timeline_url')
-        self.events = [Event(jevent) for jevent in jobj.get('events',[])]
\ No newline at end of file
+        if load_events:
+            self.set_lazy_events(jobj.get('events',[]))
+        else:
+            self.events = []
\ No newline at end of file
@@ -0,0 +1,272 @@
+"""
+Runs analyses over inputs derived from the dataset once and shared by
+all of them, e.g. the issue DataFrame, the issues selected by --user and
+--label or the issue lifecycles.
+
+An analysis subclasses Analysis, lists the inputs it uses in INPUTS and
+splits its work into compute(inputs), which derives its results from
+the inputs, and render(results), which prints and plots them. Inputs are
+registered with the input_provider decorator, naming the inputs they are
+derived from. Running several analyses (see run_analyses) then:
+
+1. reuses the cached results of earlier runs on the same data
+   (see result_cache.py),
+2. derives every input the remaining analyses need once, dependencies
+   first,
+3. computes the remaining analyses, concurrently in forked processes
+   that share the derived inputs if jobs > 1, and
+4. renders the results one analysis at a time in the given order.
+"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+import pandas as pd
+
+import config
+import profiling
+import result_cache
+from data_loader import DataLoader
+from model import Issue
+
+# Registered inputs: name -> (names of the inputs it is derived from, function)
+INPUTS:Dict[str, Tuple[List[str], Callable[['Inputs'], any]]] = {}
+
+
+def input_provider(name:str, requires:List[str]=()):
+    """
+    Registers a function deriving the named input. The function is passed
+    the Inputs, from which it can get the inputs listed in requires.
+    """
+    def register(function):
+        INPUTS[name] = (list(requires), function)
+        return function
+    return register
+
+
+class Inputs:
+    """
+    The inputs of the analyses of a run. Each input is derived on first
+    use and then kept, so analyses sharing an input derive it once.
+    """
+
+    def __init__(self):
+        """
+        Constructor
+        """
+        # Parameters are passed in via command line (--user, --label)
+        self.user:str = config.get_parameter('user') or None
+        self.label:str = config.get_parameter('label') or None
+        self._values:Dict[str, any] = {}
+
+    def __getitem__(self, name:str):
+        if name not in self._values:
+            if name not in INPUTS:
+                raise KeyError(f'Unknown input {name!r}')
+            requires, function = INPUTS[name]
+            for dependency in requires:
+                self[dependency]
+            with profiling.stage(f'input {name}'):
+                self._values[name] = function(self)
+        return self._values[name]
+
+    def build(self, names:List[str]):
+        """
+        Derives the given inputs and those they are derived from.
+        """
+        for name in names:
+            self[name]
+
+
+class Analysis:
+    """
+    Base class of the analyses. Subclasses set INPUTS and implement
+    compute() and render().
+    """
+
+    # Names of the inputs compute() uses (see INPUTS)
+    INPUTS:List[str] = []
+    # Bump whenever compute() changes so that cached results are ignored
+    VERSION:int = 1
+
+    def params(self) -> Dict[str, any]:
+        """
+        Returns the parameters the results depend on, e.g. {'user': ...}.
+        Results are cached per dataset and parameters.
+        """
+        return {}
+
+    def compute(self, inputs:Inputs):
+        """
+        Computes the results of the analysis from its inputs. Runs in a
+        worker process when analyses run concurrently, so the results must
+        be picklable.
+        """
+        raise NotImplementedError
+
+    def render(self, results):
+        """
+        Prints and plots the results computed by compute().
+        """
+        raise NotImplementedError
+
+    def run(self):
+        """
+        Runs the analysis on its own.
+        """
+        run_analyses([self])
+
+
+def run_analyses(analyses:List[Analysis], jobs:int=1):
+    """
+    Computes the results of the analyses over shared inputs and renders
+    them in order.
+
+    Parameters:
+    - analyses: The analyses to run.
+    - jobs: Number of analyses computed concurrently in separate processes.
+    """
+    global _inputs
+    results:Dict[int, any] = {}
+    for position, analysis in enumerate(analyses):
+        hit, value = result_cache.lookup(_name(analysis), analysis.params(), analysis.VERSION)
+        if hit:
+            results[position] = value
+    pending = [position for position in range(len(analyses)) if position not in results]
+
+    if pending:
+        inputs = Inputs()
+        with profiling.stage('inputs'):
+            inputs.build(required_inputs([analyses[position] for position in pending]))
+        if jobs <= 1 or len(pending) <= 1:
+            for position in pending:
+                results[position] = _compute(analyses[position], inputs)
+        else:
+            # Forked workers inherit the derived inputs. Where fork is not
+            # available (e.g. Windows) each worker derives its inputs again.
+            _inputs = inputs
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+            try:
+                with ProcessPoolExecutor(max_workers=jobs, mp_context=context) as executor:
+                    futures = {position: executor.submit(_compute_in_worker, analyses[position]) for position in pending}
+                    for position, future in futures.items():
+                        results[position] = future.result()
+            finally:
+                _inputs = None
+        for position in pending:
+            analysis = analyses[position]
+            result_cache.store(_name(analysis), analysis.params(), results[position], analysis.VERSION)
+
+    for position, analysis in enumerate(analyses):
+        with profiling.stage(f'render {_name(analysis)}'):
+            analysis.render(results[position])
+
+
+def required_inputs(analyses:List[Analysis]) -> List[str]:
+    """
+    Returns the inputs the analyses use and those they are derived from,
+    each once and after the inputs it is derived from.
+    """
+    ordered:List[str] = []
+    visited:Set[str] = set()
+
+    def visit(name:str):
+        if name in visited:
+            return
+        if name not in INPUTS:
+            raise KeyError(f'Unknown input {name!r}')
+        visited.add(name)
+        for dependency in INPUTS[name][0]:
+            visit(dependency)
+        ordered.append(name)
+
+    for analysis in analyses:
+        for name in analysis.INPUTS:
+            visit(name)
+    return ordered
+
+
+# Inputs shared with forked worker processes
+_inputs:Inputs = None
+
+
+def _compute(analysis:Analysis, inputs:Inputs):
+    with profiling.stage(f'compute {_name(analysis)}'):
+        return analysis.compute(inputs)
+
+
+def _compute_in_worker(analysis:Analysis):
+    return _compute(analysis, _inputs if _inputs is not None else Inputs())
+
+
+def _name(analysis:Analysis) -> str:
+    return type(analysis).__name__
+
+
+### INPUTS
+
+@input_provider('issues')
+def _issues(inputs:Inputs):
+    return DataLoader().get_issues()
+
+
+@input_provider('issue_stream')
+def _issue_stream(inputs:Inputs) -> Callable[[], Iterator[Issue]]:
+    # A function returning the issues one at a time, for analyses that visit
+    # them once: the loaded issues if another analysis already needed them,
+    # and otherwise the issue cache or the data file read incrementally
+    # (see DataLoader.iter_issues)
+    loader = DataLoader()
+    return loader.get_issues if loader.is_loaded() else loader.iter_issues
+
+
+@input_provider('issues_df')
+def _issues_df(inputs:Inputs) -> pd.DataFrame:
+    return DataLoader().get_dataframes()[0]
+
+
+@input_provider('events_df')
+def _events_df(inputs:Inputs) -> pd.DataFrame:
+    return DataLoader().get_dataframes()[1]
+
+
+@input_provider('index', requires=['issues'])
+def _index(inputs:Inputs):
+    return DataLoader().get_index()
+
+
+@input_provider('selected_issue_ids', requires=['index'])
+def _selected_issue_ids(inputs:Inputs) -> Optional[List[int]]:
+    # Positions of the issues of --user and/or with --label, or None if neither is given
+    if inputs.user is None and inputs.label is None:
+        return None
+    return sorted(inputs['index'].issue_ids(creator=inputs.user, label=inputs.label))
+
+
+@input_provider('selected_issues_df', requires=['issues_df', 'selected_issue_ids'])
+def _selected_issues_df(inputs:Inputs) -> pd.DataFrame:
+    issue_ids = inputs['selected_issue_ids']
+    return inputs['issues_df'] if issue_ids is None else inputs['issues_df'].iloc[issue_ids]
+
+
+@input_provider('lifecycles', requires=['issues_df', 'events_df'])
+def _lifecycles(inputs:Inputs) -> pd.DataFrame:
+    from lifecycle import extract_lifecycles
+    return extract_lifecycles(inputs['issues_df'], inputs['events_df'])
+
+
+@input_provider('lifecycle_metrics', requires=['issues_df', 'events_df'])
+def _lifecycle_metrics(inputs:Inputs) -> pd.DataFrame:
+    return DataLoader().get_lifecycle_metrics()
+
+
+@input_provider('trend_cube', requires=['issues_df', 'events_df'])
+def _trend_cube(inputs:Inputs):
+    return DataLoader().get_trend_cube()
+
+
+@input_provider('search_index', requires=['issues'])
+def _search_index(inputs:Inputs):
+    return DataLoader().get_search_index()
@@ -1,8 +1,81 @@
-import matplotlib.dates as mdates
-import matplotlib.pyplot as plt
+import os
+import re
+import numpy as np
 import pandas as pd
-from datetime import datetime
 
+import config
+import profiling
+from lifecycle import REOPEN_LATENCY_BUCKETS
+
+# Names of the chart files written so far, used to avoid overwriting
+# a chart with another one of the same name within a run
+_written_charts = set()
+
+def get_output_dir():
+    """
+    Returns the directory charts are written to, or None if charts
+    should be shown interactively. Set it with --output-dir or the
+    ENPM611_PROJECT_PLOT_DIR config parameter.
+    """
+    return config.get_parameter('output_dir') or config.get_parameter('ENPM611_PROJECT_PLOT_DIR')
+
+def configure_backend():
+    """
+    Switches matplotlib to the non-interactive Agg backend when charts are
+    written to files. Called when the first chart is drawn; call it again
+    if the output directory changes afterwards.
+    """
+    if get_output_dir() is not None:
+        import matplotlib
+        matplotlib.use('agg')
+
+# matplotlib.pyplot once a chart has been drawn
+_plt = None
+
+def pyplot():
+    """
+    Returns matplotlib.pyplot, importing it on first use. Importing it takes
+    a large part of the startup time, so runs that draw no charts skip it.
+    """
+    global _plt
+    if _plt is None:
+        configure_backend()
+        import matplotlib.pyplot
+        _plt = matplotlib.pyplot
+    return _plt
+
+@profiling.profiled('render')
+def show(name):
+    """
+    Shows the current figure, or in headless mode saves it to the output
+    directory as <name>.<format> and closes it to free its memory.
+    
+    Parameters:
+    - name: Name of the chart, used for the file name.
+    """
+    plt = pyplot()
+    output_dir = get_output_dir()
+    if output_dir is None:
+        plt.show()
+        return
+    
+    file_format = config.get_parameter('format') or config.get_parameter('ENPM611_PROJECT_PLOT_FORMAT', default='png')
+    filename = re.sub(r'[^a-z0-9]+', '_', str(name).lower()).strip('_') or 'chart'
+    suffix = 2
+    unique_filename = filename
+    while unique_filename in _written_charts:
+        unique_filename = f'{filename}_{suffix}'
+        suffix += 1
+    _written_charts.add(unique_filename)
+    
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, f'{unique_filename}.{file_format}')
+    fig = plt.gcf()
+    fig.savefig(path, format=file_format, bbox_inches='tight')
+    plt.close(fig)
+    print(f'Saved chart to {path}')
+
+@profiling.profiled('pie_chart')
 def pie_chart(data, title='Pie Chart', labels=None):
     """
     Plots a pie chart.
@@ -12,6 +85,7 @@ def pie_chart(data, title='Pie Chart', labels=None):
     - title: Title of the chart.
     - labels: Labels for the pie slices.
     """
+    plt = pyplot()
     if isinstance(data, dict):
         labels = list(data.keys()) if labels is None else labels
         sizes = list(data.values())
@@ -24,8 +98,9 @@ def pie_chart(data, title='Pie Chart', labels=None):
     plt.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=140)
     plt.title(title)
     plt.axis('equal')
-    plt.show()
+    show(title)
 
+@profiling.profiled('plotList')
 def plotList(list, column, top_num, title, xlabel, ylabel):
     """
     Plots a bar chart of the top `top_num` entries in a list.
@@ -38,16 +113,11 @@ def plotList(list, column, top_num, title, xlabel, ylabel):
     - xlabel: X label of the chart
     - ylabel: Y label of the chart
     """
-    # Create a dataframe to make statistics a lot easier
-    df = pd.DataFrame(list, columns=[column])
-    df_hist = df.groupby(df[column]).value_counts().nlargest(top_num).plot(kind="bar", figsize=(14,8), title=title)
-    # Set axes labels
-    df_hist.set_xlabel(xlabel)
-    df_hist.set_ylabel(ylabel)
-    # Plot the chart
-    plt.grid(axis='y', linestyle='--')
-    plt.show()
+    # Create a series to make statistics a lot easier
+    counts = pd.Series(list, name=column).value_counts().nlargest(top_num)
+    plotCounts(counts.to_dict(), title, xlabel, ylabel)
 
+@profiling.profiled('plotSeries')
 def plotSeries(data, title, xlabel, ylabel):
     """
     Creates a series from the data, plots a bar chart of the series.
@@ -60,41 +130,59 @@ def plotSeries(data, title, xlabel, ylabel):
     """
     # Create a series to make data easier to plot
     series = pd.Series(data)
-    df_hist = series.value_counts().sort_index().plot(kind="bar", figsize=(14,8), title=title)
+    plotCounts(series.value_counts().sort_index().to_dict(), title, xlabel, ylabel)
+
+@profiling.profiled('plotCounts')
+def plotCounts(counts, title, xlabel, ylabel):
+    """
+    Plots a bar chart of precomputed counts, e.g. cached aggregates.
+    
+    Parameters:
+    - counts: A dictionary of values and their counts, in the order they are plotted
+    - title: The title of the chart
+    - xlabel: X label of the chart
+    - ylabel: Y label of the chart
+    """
+    plt = pyplot()
+    df_hist = pd.Series(counts, dtype='int64').plot(kind="bar", figsize=(14,8), title=title)
     # Set axes labels
     df_hist.set_xlabel(xlabel)
     df_hist.set_ylabel(ylabel)
     # Plot the chart
     plt.grid(axis='y', linestyle='--')
-    plt.show()
+    show(title)
     
+@profiling.profiled('plotLabelOverTime')
 def plotLabelOverTime(data, title, xlabel, ylabel):
     """
     Plots new issues with labels over time.
     
     Parameters:
-    - data: A list of dictionaries with label & created_date values
+    - data: A DataFrame of the number of new issues per month (rows) and
+      label (columns), e.g. sliced from the trend cube (see TrendCube.trend)
     - title: The title of the chart
     - xlabel: X label of the chart
     - ylabel: Y label of the chart
     """
-    # Create a dataframe to make statistics a lot easier
-    df = pd.DataFrame(data)
-    df["month"] = df["date"].dt.to_period("M")
-    # Determine the number of new issues per month with the desired label and generate a graph
-    df_hist = df.groupby(["month", "label"]).size().unstack(fill_value=0).plot(figsize=(14,8), title=title)
+    plt = pyplot()
+    # Generate a graph with one line per label
+    df_hist = data.plot(figsize=(14,8), title=title)
     # Set axes labels
     df_hist.set_xlabel(xlabel)
     df_hist.set_ylabel(ylabel)
     # Plot trends
     plt.grid()
     plt.tight_layout()
-    plt.show()
+    show(title)
 
-def plot_gantt_chart(gantt_data: list):
+@profiling.profiled('plot_gantt_chart')
+def plot_gantt_chart(gantt_data: list, rows_per_page: int = 50):
     """
     Plots an enhanced Gantt chart showing created, closed, reopened dates and issue timelines.
     :param gantt_data: List of dict containing lifecycle details
+    :param rows_per_page: Maximum number of issues per chart when charts are written to files;
+        larger inputs are split into several files. Shown interactively, all issues go into
+        one window, labelled with at most this many issues at a time
     """
     for item in gantt_data:
         if item["issue_id"] == 454:
@@ -108,74 +196,92 @@ def plot_gantt_chart(gantt_data: list):
             print(f"Reopened date: {reopened_dates}")
     
     gantt_data = [item for item in gantt_data if item["issue_id"] != 454]
+    if not gantt_data:
+        return
 
-    fig, ax = plt.subplots(figsize=(14, 10))
-
-    # Collecting all dates for setting axis limits
+    # Axis limits are shared by all pages
     all_dates = [item["created_date"] for item in gantt_data] + \
                 [date for item in gantt_data for date in item["closed_dates"] + item["reopened_dates"]]
+    date_min, date_max = min(all_dates), max(all_dates)
 
-    for i, lifecycle in enumerate(gantt_data):
-        created_date = lifecycle["created_date"]
-        closed_dates = lifecycle["closed_dates"]
-        reopened_dates = lifecycle["reopened_dates"]
-
-        timeline_start = created_date
-        timeline_end = max(closed_dates + reopened_dates) if closed_dates or reopened_dates else created_date
-
-        # Plotting the Gantt timeline
-        ax.hlines(i, timeline_start, timeline_end, color="gray", linestyle="-", linewidth=2, alpha=0.6, label="Timeline" if i == 0 else "")
-
-        # Plotting created, closed, and reopened dates
-        ax.scatter(created_date, i, color="blue", label="Created" if i == 0 else "")
-        for closed_date in closed_dates:
-            ax.scatter(closed_date, i, color="red", label="Closed" if i == 0 else "")
-        for reopened_date in reopened_dates:
-            ax.scatter(reopened_date, i, color="green", label="Reopened" if i == 0 else "")
-
-        ax.hlines(i, min(all_dates), max(all_dates), color="gray", linestyle="--", alpha=0.3)
-
-    ax.set_yticks(range(len(gantt_data)))
-    ax.set_yticklabels([f"Issue {item['issue_id']}" for item in gantt_data])
+    if get_output_dir() is None:
+        # A single window that can be zoomed into, as every window blocks until it is closed
+        pages = [gantt_data]
+    else:
+        # Large inputs are split into pages so each file stays readable
+        pages = [gantt_data[start:start + rows_per_page] for start in range(0, len(gantt_data), rows_per_page)]
+    for page_number, page in enumerate(pages, start=1):
+        title = "Gantt Chart of Issue Lifecycles"
+        if len(pages) > 1:
+            title += f" ({page_number}/{len(pages)})"
+        _plot_gantt_page(page, date_min, date_max, title, rows_per_page)
+        show("gantt_chart")
+
+def _plot_gantt_page(gantt_data: list, date_min, date_max, title: str, max_labels: int):
+    """
+    Draws one page of the Gantt chart. All rows are drawn with a constant
+    number of artists (one line collection per line style and one scatter
+    per marker type), independent of the number of issues. At most
+    max_labels rows are labelled with their issue.
+    """
+    plt = pyplot()
+    import matplotlib.dates as mdates
+    fig, ax = plt.subplots(figsize=(14, 10))
+    rows = np.arange(len(gantt_data))
+
+    # Timeline of each issue from its creation to its last close/reopen
+    starts = mdates.date2num([lifecycle["created_date"] for lifecycle in gantt_data])
+    ends = mdates.date2num([
+        max(lifecycle["closed_dates"] + lifecycle["reopened_dates"], default=lifecycle["created_date"])
+        for lifecycle in gantt_data
+    ])
+    ax.hlines(rows, mdates.date2num(date_min), mdates.date2num(date_max), color="gray", linestyle="--", alpha=0.3)
+    ax.hlines(rows, starts, ends, color="gray", linestyle="-", linewidth=2, alpha=0.6, label="Timeline")
+
+    # Created, closed, and reopened dates
+    ax.scatter(starts, rows, color="blue", label="Created")
+    for key, color, label in (("closed_dates", "red", "Closed"), ("reopened_dates", "green", "Reopened")):
+        dates = [date for lifecycle in gantt_data for date in lifecycle[key]]
+        date_rows = [row for row, lifecycle in enumerate(gantt_data) for _ in lifecycle[key]]
+        ax.scatter(mdates.date2num(dates) if dates else [], date_rows, color=color, label=label)
+
+    issue_ids = [item['issue_id'] for item in gantt_data]
+    if len(issue_ids) <= max_labels:
+        ax.set_yticks(rows)
+        ax.set_yticklabels([f"Issue {issue_id}" for issue_id in issue_ids])
+    else:
+        # Only some rows are labelled, more of them as the chart is zoomed into
+        from matplotlib.ticker import FuncFormatter, MaxNLocator
+        ax.yaxis.set_major_locator(MaxNLocator(nbins=max_labels, integer=True))
+        ax.yaxis.set_major_formatter(FuncFormatter(
+            lambda row, _: f"Issue {issue_ids[int(row)]}" if 0 <= row < len(issue_ids) else ""))
     
     ax.xaxis.set_major_formatter(mdates.DateFormatter("%Y-%m-%d"))
     plt.xticks(rotation=45, ha='right')
 
-    ax.set_xlim(min(all_dates), max(all_dates))
+    ax.set_xlim(mdates.date2num(date_min), mdates.date2num(date_max))
 
-    ax.set_ylim(0, len(gantt_data) - 1) 
+    ax.set_ylim(-0.5, len(gantt_data) - 0.5)
     
     plt.xlabel("Date", fontsize=12)
     plt.ylabel("Issues", fontsize=12)
-    plt.title("Gantt Chart of Issue Lifecycles", fontsize=14, fontweight="bold")
+    plt.title(title, fontsize=14, fontweight="bold")
 
     plt.tight_layout(pad=3)  
 
     plt.legend()
-    plt.show()
 
-def plot_reopening_trend(reopened_issues_list: list):
+@profiling.profiled('plot_reopening_trend')
+def plot_reopening_trend(reopening_counts: pd.Series):
     """
     Plots a bar chart showing the number of times issues were reopened over time.
-    :param reopened_issues_list: List of issues that have been reopened
+    :param reopening_counts: Number of reopen events per month (a Series indexed by
+        period), e.g. sliced from the trend cube (see TrendCube.trend)
     """
-    reopenings = []
-
-    # Collecting all reopening dates from the reopened issues
-    for issue in reopened_issues_list:
-        for event in issue.events:
-            if event.event_type == 'reopened':
-                reopenings.append(event.event_date)
-
-    # Creating a DataFrame
-    reopenings_df = pd.DataFrame(reopenings, columns=["reopened_date"])
-
-    # Grouping by month/year 
-    reopenings_df['month_year'] = reopenings_df['reopened_date'].dt.to_period('M')
-    
-    # Counting the occurrences of reopenings in each period
-    reopening_counts = reopenings_df['month_year'].value_counts().sort_index()
-
+    # Nothing to plot if no issue was ever reopened
+    if reopening_counts.empty:
+        return
+    plt = pyplot()
     # Creating a DataFrame for plotting
     reopening_data = pd.DataFrame({
         'Month/Year': reopening_counts.index.astype(str), 
@@ -198,61 +304,26 @@ def plot_reopening_trend(reopened_issues_list: list):
     ax.set_yticks(range(0, int(reopening_data['Number of Reopenings'].max()) + 1, 1))
 
     plt.tight_layout()
-    plt.show()
+    show("reopening_trend")
 
-def categorize_reopened_time(issue):
-    """
-    Categorize the reopened issue based on the time difference between closing and reopening.
-    :param issue: Issue object with events.
-    :return: Category name as a string.
-    """
-    for event in issue.events:
-        closed_date: datetime.datetime
-        if event.event_type == "closed":
-            closed_date = event.event_date
-        if event.event_type == "reopened":
-            time_difference = event.event_date - closed_date
-            days = time_difference.days
-
-            if days <= 1:
-                return "within a day"
-            elif 1 < days < 7:
-                return "within a week"
-            elif 7 < days < 14:
-                return "7-14 days"
-            elif 14< days < 30:
-                return "14 days to a month"
-            elif 30< days < 182:
-                return "1-6 months"
-            elif 182< days < 365:
-                return "6-12 months"
-            else:
-                return "after one year"
-    return None
-
-def plot_reopened_issue_timing(issues_list):
+@profiling.profiled('plot_reopened_issue_timing')
+def plot_reopened_issue_timing(reopen_counts: pd.Series):
     """
     Plot reopened issue timing as a Pie Chart with a legend showing percentages and counts.
-    :param issues_list: List of Issue objects.
+    :param reopen_counts: Number of reopened issues per reopen latency bucket, e.g. the
+        value_counts() of the reopen_latency_bucket lifecycle metric
     """
-    # Categorize each reopened issue
-    reopen_categories = [
-        categorize_reopened_time(issue) 
-        for issue in issues_list 
-        if any(event.event_type == 'reopened' for event in issue.events)
-    ]
-
-    # Filter out None values and count occurrences
-    reopen_counts = pd.Series(filter(None, reopen_categories)).value_counts()
+    # Buckets without reopened issues are left out of the chart
+    reopen_counts = reopen_counts[reopen_counts > 0]
+    if reopen_counts.empty:
+        return
+    plt = pyplot()
 
     # Calculate percentages
     total_reopened_issues = reopen_counts.sum()
     reopen_percentages = (reopen_counts / total_reopened_issues) * 100
     
-    category_order = [
-        "within a day", "within a week", "7-14 days", 
-        "14 days to a month", "1-6 months", "6-12 months", "after one year"
-    ]
+    category_order = [category for category in REOPEN_LATENCY_BUCKETS if category in reopen_counts.index]
     reopen_counts = reopen_counts[category_order]
     reopen_percentages = reopen_percentages[category_order]
 
@@ -281,4 +352,4 @@ def plot_reopened_issue_timing(issues_list):
 
     plt.title("Time to Reopen Issues after being Closed\nTotal Reopened Issues: " + str(total_reopened_issues))
     plt.tight_layout()
-    plt.show()
\ No newline at end of file
+    show("reopened_issue_timing")
\ No newline at end of file
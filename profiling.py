@@ -0,0 +1,201 @@
+"""
+Opt-in instrumentation of the stages of a run (loading, deriving the
+DataFrames and indexes, the analyses and every chart). Each stage records
+its wall-clock time, the peak memory allocated by Python while it ran
+(tracemalloc) and the resident set size of the process when it ended.
+Stages nest, so e.g. the load triggered by the first analysis is reported
+under that analysis.
+
+Instrumentation is enabled by calling enable() (run.py --profile);
+otherwise stage() and profiled() are no-ops costing a single check.
+"""
+
+import cProfile
+import functools
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List
+
+_ENABLED:bool = False
+# Aggregated measurements by stage path, in the order the stages first ran
+_STAGES:Dict[str, dict] = {}
+# Stages currently running: [path, start time, allocated bytes at start, peak of nested stages]
+_STACK:List[list] = []
+_PROFILER:cProfile.Profile = None
+
+
+def enable(trace_memory:bool=True, cprofile:bool=False):
+    """
+    Starts recording stages.
+
+    Parameters:
+    - trace_memory: Whether to trace Python allocations with tracemalloc
+      (slows the run down noticeably, but reports the peak of every stage).
+    - cprofile: Whether to also collect a cProfile profile (see dump_cprofile).
+    """
+    global _ENABLED, _PROFILER
+    _ENABLED = True
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    if cprofile:
+        _PROFILER = cProfile.Profile()
+        _PROFILER.enable()
+
+
+def is_enabled() -> bool:
+    return _ENABLED
+
+
+@contextmanager
+def stage(name:str):
+    """
+    Measures the enclosed block as a stage with the given name.
+    """
+    if not _ENABLED:
+        yield
+        return
+    path = f'{_STACK[-1][0]}/{name}' if _STACK else name
+    tracing = tracemalloc.is_tracing()
+    allocated = tracemalloc.get_traced_memory()[0] if tracing else 0
+    if tracing and hasattr(tracemalloc, 'reset_peak'):
+        tracemalloc.reset_peak()
+    _entry(path) # keeps the stages in the order they started
+    frame = [path, time.perf_counter(), allocated, 0]
+    _STACK.append(frame)
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - frame[1]
+        _STACK.pop()
+        # reset_peak() in nested stages hides their peaks from this one, so
+        # they are passed up explicitly
+        peak = max(tracemalloc.get_traced_memory()[1], frame[3]) if tracing else 0
+        if _STACK:
+            _STACK[-1][3] = max(_STACK[-1][3], peak)
+        _record(path, duration, peak - allocated if tracing else None)
+
+
+def profiled(name:str):
+    """
+    Decorator measuring every call of a function as a stage.
+    """
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _ENABLED:
+                return function(*args, **kwargs)
+            with stage(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def timed_iter(name:str, iterable:Iterable[any]) -> Iterator[any]:
+    """
+    Yields the items of the iterable, recording the time spent producing
+    them as a stage (e.g. decoding while the caller builds objects). Only
+    the time is recorded since the items are produced in small steps.
+    """
+    if not _ENABLED:
+        return iter(iterable)
+    path = f'{_STACK[-1][0]}/{name}' if _STACK else name
+    _entry(path)
+    return _timed_iter(path, iter(iterable))
+
+
+def _timed_iter(path:str, iterator:Iterator[any]) -> Iterator[any]:
+    total:float = 0
+    try:
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                total += time.perf_counter() - start
+            yield item
+    finally:
+        _record(path, total, None)
+
+
+def report() -> dict:
+    """
+    Returns the measurements of all stages.
+    """
+    return {
+        'stages': [{'stage': path, **values} for path, values in _STAGES.items()],
+        'peak_rss_mb': _peak_rss_mb(),
+    }
+
+
+def print_report():
+    """
+    Prints the measurements as a table, nested stages indented under their parents.
+    """
+    print(f'\n{"Stage":<48} {"Calls":>6} {"Total s":>9} {"Max s":>8} {"Peak alloc MB":>14} {"RSS MB":>8}')
+    for path, values in _STAGES.items():
+        depth = path.count('/')
+        name = '  ' * depth + path.rsplit('/', 1)[-1]
+        peak = '' if values['peak_alloc_mb'] is None else f'{values["peak_alloc_mb"]:.1f}'
+        rss = '' if values['rss_mb'] is None else f'{values["rss_mb"]:.1f}'
+        print(f'{name:<48} {values["calls"]:>6} {values["total_s"]:>9.3f} {values["max_s"]:>8.3f} {peak:>14} {rss:>8}')
+    if _peak_rss_mb() is not None:
+        print(f'Peak RSS: {_peak_rss_mb():.1f} MB')
+
+
+def write_report(path:str):
+    """
+    Writes the measurements to a JSON file.
+    """
+    with open(path, 'w') as fout:
+        json.dump(report(), fout, indent=2)
+    print(f'Wrote profile report to {path}')
+
+
+def dump_cprofile(path:str):
+    """
+    Writes the cProfile statistics (readable with pstats or snakeviz) if
+    they were collected.
+    """
+    if _PROFILER is not None:
+        _PROFILER.disable()
+        _PROFILER.dump_stats(path)
+        print(f'Wrote cProfile statistics to {path}')
+
+
+def _entry(path:str) -> dict:
+    return _STAGES.setdefault(path, {'calls': 0, 'total_s': 0.0, 'max_s': 0.0, 'peak_alloc_mb': None, 'rss_mb': None})
+
+
+def _record(path:str, duration:float, peak:int):
+    values = _entry(path)
+    values['calls'] += 1
+    values['total_s'] += duration
+    values['max_s'] = max(values['max_s'], duration)
+    if peak is not None:
+        values['peak_alloc_mb'] = max(values['peak_alloc_mb'] or 0, peak / 2**20)
+    values['rss_mb'] = _rss_mb()
+
+
+def _rss_mb() -> float:
+    # Current resident set size, only available where /proc exists (Linux)
+    try:
+        with open('/proc/self/statm', 'r') as fin:
+            return int(fin.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _peak_rss_mb() -> float:
+    try:
+        import resource
+    except ImportError:
+        # Not available on Windows
+        return None
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss / 2**20 if os.uname().sysname == 'Darwin' else maxrss / 2**10
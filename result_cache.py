@@ -0,0 +1,182 @@
+"""
+Caches the results of analysis computations on disk across runs, so a
+scheduled run that repeats an analysis with the same parameters on an
+unchanged dataset skips both loading the data and computing the result.
+
+Results are keyed on the analysis, its parameters and the fingerprint
+of the dataset (see DataLoader.get_fingerprint), and stored as pickle
+files in a directory. When the directory grows beyond its size limit,
+the least recently used results are evicted.
+"""
+
+import logging
+logger = logging.getLogger(__name__)
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from typing import Dict, Optional, Tuple
+
+import config
+from data_loader import DataLoader
+
+# Bump whenever the stored format changes so old results are ignored
+CACHE_VERSION:int = 1
+
+_SUFFIX:str = '.pkl'
+
+
+class ResultCache:
+    """
+    A directory of pickled results with least-recently-used eviction.
+    """
+
+    def __init__(self, cache_dir:str, max_bytes:int):
+        """
+        Constructor
+
+        Parameters:
+        - cache_dir: Directory the results are stored in.
+        - max_bytes: Total size of the stored results above which the
+          least recently used ones are removed.
+        """
+        self.cache_dir:str = cache_dir
+        self.max_bytes:int = max_bytes
+
+    def key(self, analysis:str, params:Dict[str, any], fingerprint:str, version:int=1) -> str:
+        """
+        Returns the key of a result. Parameters must be JSON-serializable.
+        """
+        document = json.dumps({
+            'cache_version': CACHE_VERSION,
+            'analysis': analysis,
+            'version': version,
+            'params': params,
+            'dataset': fingerprint,
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(document.encode('utf-8')).hexdigest()
+
+    def get(self, key:str) -> Tuple[bool, any]:
+        """
+        Returns (True, result) if a result is stored under the key and
+        (False, None) otherwise. A hit marks the result as recently used.
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as fin:
+                value = pickle.load(fin)
+        except FileNotFoundError:
+            return False, None
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+            # A corrupt or incompatible entry is treated as a miss
+            logger.warning(f'Ignoring unreadable cached result {path}: {e}')
+            return False, None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return True, value
+
+    def put(self, key:str, value:any):
+        """
+        Stores a result under the key and evicts old results if the cache
+        is over its size limit.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Write to a temporary file first so readers never see a partial result
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as fout:
+                pickle.dump(value, fout, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.evict()
+
+    def evict(self):
+        """
+        Removes the least recently used results until the total size is
+        within the limit.
+        """
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(_SUFFIX):
+                try:
+                    stat = os.stat(os.path.join(self.cache_dir, name))
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        """
+        Removes all stored results.
+        """
+        if os.path.isdir(self.cache_dir):
+            for name in os.listdir(self.cache_dir):
+                if name.endswith(_SUFFIX):
+                    os.remove(os.path.join(self.cache_dir, name))
+
+    def _path(self, key:str) -> str:
+        return os.path.join(self.cache_dir, key + _SUFFIX)
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    """
+    Returns the result cache configured by ENPM611_PROJECT_RESULT_CACHE
+    (enabled by default), ENPM611_PROJECT_RESULT_CACHE_DIR and
+    ENPM611_PROJECT_RESULT_CACHE_MB, or None if it is disabled.
+    """
+    if not config.get_parameter('ENPM611_PROJECT_RESULT_CACHE', default=True):
+        return None
+    cache_dir = config.get_parameter('ENPM611_PROJECT_RESULT_CACHE_DIR') \
+        or os.path.join(DataLoader().cache_dir, 'results')
+    max_mb = float(config.get_parameter('ENPM611_PROJECT_RESULT_CACHE_MB', default=100))
+    return ResultCache(cache_dir, int(max_mb * 2**20))
+
+
+def lookup(analysis:str, params:Dict[str, any], version:int=1) -> Tuple[bool, any]:
+    """
+    Returns (True, result) if a result of the analysis for the given
+    parameters on the current dataset is cached and (False, None) otherwise.
+    Only the fingerprint of the dataset is computed, the data is not loaded.
+
+    Parameters:
+    - analysis: Name of the computation, e.g. 'LabelAnalysis'.
+    - params: The parameters the result depends on (JSON-serializable).
+    - version: Bump when the computation changes so stored results are ignored.
+    """
+    cache = get_result_cache()
+    if cache is None:
+        return False, None
+    hit, value = cache.get(cache.key(analysis, params, DataLoader().get_fingerprint(), version))
+    if hit:
+        logger.info(f'Using cached result of {analysis} for {params}')
+    return hit, value
+
+
+def store(analysis:str, params:Dict[str, any], value:any, version:int=1):
+    """
+    Caches a result of the analysis for the given parameters on the current
+    dataset (see lookup). The result must be picklable.
+    """
+    cache = get_result_cache()
+    if cache is None:
+        return
+    try:
+        cache.put(cache.key(analysis, params, DataLoader().get_fingerprint(), version), value)
+    except (OSError, pickle.PicklingError) as e:
+        # The cache is an optimization only, so failing to write it is not fatal
+        logger.warning(f'Could not write result cache to {cache.cache_dir}: {e}')
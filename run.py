@@ -6,12 +6,41 @@ the command line to run the analyses.
 """
 
 import argparse
+import importlib
+from typing import Dict, List, Tuple
 
 import config
-from example_analysis import ExampleAnalysis
-from issue_lifecycle_analysis import IssueLifecycleAnalysis
-from issue_state_analysis import IssueStateAnalysis
-from label_analysis import LabelAnalysis
+import profiling
+
+# Analyses that can be selected with the --feature flag, as (module, class).
+# A module is only imported when its feature runs, so that e.g. --help or a
+# mistyped feature does not wait for pandas and matplotlib to be imported.
+FEATURES:Dict[int, Tuple[str, str]] = {
+    0: ('example_analysis', 'ExampleAnalysis'),
+    1: ('issue_state_analysis', 'IssueStateAnalysis'),
+    2: ('label_analysis', 'LabelAnalysis'),
+    3: ('issue_lifecycle_analysis', 'IssueLifecycleAnalysis'),
+    4: ('search_analysis', 'SearchAnalysis'),
+    5: ('contributor_analysis', 'ContributorAnalysis'),
+}
+
+
+def load_feature(feature:int) -> type:
+    """
+    Imports the module of a feature and returns its analysis class.
+    """
+    module_name, class_name = FEATURES[feature]
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def parse_features(value:str) -> List[int]:
+    """
+    Parses a comma-separated list of feature numbers, e.g. "0,2,3".
+    """
+    try:
+        return [int(feature) for feature in value.split(',') if feature.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'invalid feature list: {value!r}')
 
 
 def parse_args():
@@ -26,9 +55,12 @@ def parse_args():
     """
     ap = argparse.ArgumentParser("run.py")
     
-    # Required parameter specifying what analysis to run
-    ap.add_argument('--feature', '-f', type=int, required=True,
-                    help='Which of the three features to run')
+    # Required parameter specifying what analyses to run
+    features = ap.add_mutually_exclusive_group(required=True)
+    features.add_argument('--feature', '-f', type=parse_features,
+                          help='Which of the features to run (comma-separated to run several, e.g. 0,1,2,3)')
+    features.add_argument('--all', '-a', action='store_true',
+                          help='Run all features')
     
     # Optional parameter for analyses focusing on a specific user (i.e., contributor)
     ap.add_argument('--user', '-u', type=str, required=False,
@@ -38,23 +70,90 @@ def parse_args():
     ap.add_argument('--label', '-l', type=str, required=False,
                     help='Optional parameter for analyses focusing on a specific label')
     
+    # Optional parameter with the keywords and "quoted phrases" to search for (feature 4)
+    ap.add_argument('--query', '-q', type=str, required=False,
+                    help='Optional search query for the full-text search feature')
+    
+    # Optional parameter to build the issue model in several processes
+    ap.add_argument('--workers', '-w', type=int, required=False,
+                    help='Optional number of processes used to load the data file')
+    
+    # Optional parameters to write the charts to files instead of showing them
+    ap.add_argument('--output-dir', '-o', type=str, required=False,
+                    help='Optional directory to save the charts to instead of displaying them')
+    ap.add_argument('--format', type=str, required=False, choices=['png', 'svg', 'pdf'],
+                    help='Optional file format of the saved charts (png by default)')
+    
+    # Optional delta files with new or updated issues merged into the loaded data
+    ap.add_argument('--delta', '-d', type=str, action='append', required=False,
+                    help='Optional file with new or updated issues to merge into the data (can be repeated)')
+    
+    # Optional parameter to run several features concurrently
+    ap.add_argument('--jobs', '-j', type=int, required=False, default=1,
+                    help='Optional number of features to run concurrently')
+    
+    # Optional instrumentation reporting the time and memory of each stage
+    ap.add_argument('--profile', '-p', type=str, nargs='?', const='profile_report.json', required=False,
+                    help='Optional flag to report the time and memory of each stage (JSON report path, profile_report.json by default)')
+    ap.add_argument('--cprofile', type=str, required=False,
+                    help='Optional file to write cProfile statistics to (requires --profile)')
+    
     return ap.parse_args()
 
 
+def run_feature(feature:int):
+    """
+    Runs a single analysis.
+    """
+    with profiling.stage(f'feature {feature} ({FEATURES[feature][1]})'):
+        load_feature(feature)().run()
+
+
+def run_features(features:List[int], jobs:int=1):
+    """
+    Runs the given analyses in order over the same loaded dataset (see
+    pipeline.run_analyses). The inputs they share, e.g. the DataFrames or
+    the lifecycles, are derived once. With jobs > 1 their results are
+    computed concurrently in separate processes; the charts are drawn in
+    order once all results are ready.
+    """
+    import pipeline
+    pipeline.run_analyses([load_feature(feature)() for feature in features], jobs)
+
 
-# Parse feature to call from command line arguments
-args = parse_args()
-# Add arguments to config so that they can be accessed in other parts of the application
-config.overwrite_from_args(args)
+def main():
+    # Parse feature to call from command line arguments
+    args = parse_args()
+    # Add arguments to config so that they can be accessed in other parts of the application
+    config.overwrite_from_args(args)
     
-# Run the feature specified in the --feature flag
-if args.feature == 0:
-    ExampleAnalysis().run()
-elif args.feature == 1:
-    IssueStateAnalysis().run()
-elif args.feature == 2:
-    LabelAnalysis().run()
-elif args.feature == 3:
-    IssueLifecycleAnalysis().run()
-else:
-    print('Need to specify which feature to run with --feature flag.')
+    # Run the features specified in the --feature (or --all) flag
+    features = sorted(FEATURES) if args.all else args.feature
+    unknown = [feature for feature in features if feature not in FEATURES]
+    if unknown or not features:
+        print('Need to specify which feature to run with --feature flag.')
+        return
+    
+    jobs = args.jobs
+    if args.profile is not None:
+        profiling.enable(cprofile=args.cprofile is not None)
+        if jobs > 1:
+            # Stages measured in worker processes would not be reported
+            print('Running the features one at a time while profiling.')
+            jobs = 1
+    try:
+        if args.delta:
+            from data_loader import DataLoader
+            for delta_path in args.delta:
+                DataLoader().apply_delta(delta_path)
+        run_features(features, jobs)
+    finally:
+        if args.profile is not None:
+            profiling.print_report()
+            profiling.write_report(args.profile)
+            if args.cprofile is not None:
+                profiling.dump_cprofile(args.cprofile)
+
+
+if __name__ == '__main__':
+    main()
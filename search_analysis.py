@@ -0,0 +1,110 @@
+from typing import List, Set
+import pandas as pd
+
+from pipeline import Analysis, Inputs
+from search_index import SearchIndex
+import config
+import plotting
+import profiling
+
+# Number of matching issues listed
+TOP_NUM:int = 20
+
+class SearchAnalysis(Analysis):
+    """
+    Finds the issues whose title, text or comments match a keyword or
+    phrase query (--query), optionally restricted to the issues of a
+    user (--user) and/or with a label (--label). Prints the number of
+    matching issues and the most recent ones, and plots the number of
+    matching issues created per month.
+    """
+    
+    INPUTS = ['search_index', 'issues_df', 'selected_issue_ids']
+
+    def __init__(self):
+        """
+        Constructor
+        """
+        # Parameter is passed in via command line (--query)
+        self.QUERY:str = config.get_parameter('query')
+        # Parameter is passed in via command line (--user)
+        self.USER:str = config.get_parameter('user')
+        # Parameter is passed in via command line (--label)
+        self.LABEL:str = config.get_parameter('label')
+        if not self.QUERY:
+            # Nothing to search for
+            self.INPUTS = []
+
+    def params(self):
+        return {'query': self.QUERY, 'user': self.USER, 'label': self.LABEL}
+
+    def compute(self, inputs:Inputs):
+        """
+        Searches the issues.
+
+        Returns:
+        - A DataFrame with the number, title and creation date of the
+          matching issues, most recently created first, or None if there
+          is no query.
+        """
+        if not self.QUERY:
+            return None
+        issue_ids = self.search(inputs['search_index'], self.QUERY, inputs['selected_issue_ids'])
+        matches = inputs['issues_df'].iloc[sorted(issue_ids)]
+        return matches[['number', 'title', 'created_date']].sort_values('created_date', ascending=False)
+
+    def render(self, matches):
+        """
+        Outputs the search results.
+        """
+        if matches is None:
+            print('Need to specify what to search for with the --query flag.')
+            return
+
+        output:str = f'\nFound {len(matches)} issues matching {self.QUERY!r}'
+        if self.USER is not None:
+            output += f' created by {self.USER}'
+        if self.LABEL is not None:
+            output += f' with label {self.LABEL}'
+        print(output + '.\n')
+        if matches.empty:
+            return
+
+        # List the most recently created matches
+        for issue in matches.head(TOP_NUM).itertuples():
+            created = issue.created_date.strftime('%Y-%m-%d') if pd.notna(issue.created_date) else 'unknown date'
+            print(f'  #{issue.number} ({created}) {issue.title}')
+        if len(matches) > TOP_NUM:
+            print(f'  ... and {len(matches) - TOP_NUM} more')
+        print()
+
+        # Plot the number of matching issues created per month
+        created = matches['created_date'].dropna()
+        trend = created.dt.tz_convert('UTC').dt.tz_localize(None).dt.to_period('M').value_counts().sort_index().to_frame(self.QUERY)
+        title:str  = f"Issues Mentioning {self.QUERY}"
+        xlabel:str = "Month"
+        ylabel:str = "# of Issues"
+        plotting.plotLabelOverTime(trend, title, xlabel, ylabel)
+
+    @profiling.profiled('search')
+    def search(self, index:SearchIndex, query:str, selected_issue_ids:List[int]=None) -> Set[int]:
+        """
+        Finds the issues matching a query.
+
+        Parameters:
+        - index: Search index over the issues (see DataLoader.get_search_index).
+        - query: Terms and quoted phrases that must all occur in the title,
+          text or comments of an issue.
+        - selected_issue_ids: Optional ids of the issues to search, e.g.
+          those of a user and/or with a label.
+
+        Returns:
+        - The set of ids (positions in DataLoader.get_issues()) of the matching issues.
+        """
+        issue_ids = index.search(query)
+        if selected_issue_ids is not None:
+            issue_ids = issue_ids.intersection(selected_issue_ids)
+        return issue_ids
+
+if __name__ == '__main__':
+    SearchAnalysis().run()
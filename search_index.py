@@ -0,0 +1,219 @@
+"""
+Inverted index over the titles, texts and event comments of the issues,
+answering keyword and phrase queries without scanning the issues.
+
+Text is split into lowercase word tokens. For every token the index keeps
+a postings list: the ids of the issues containing it (their position in
+DataLoader.get_issues(), as in issue_index.py) and the token positions
+within each issue, which are needed to match phrases. The fields of an
+issue are indexed one after another with a gap in between, so a phrase
+never matches across the end of one field and the start of the next.
+
+Query syntax: whitespace-separated terms, all of which must match, and
+phrases in double quotes, e.g. ``lock "dependency resolver"``.
+"""
+
+import logging
+logger = logging.getLogger(__name__)
+
+import os
+import pickle
+import re
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+
+from model import Issue
+
+# Bump whenever the tokenization or the stored format changes
+INDEX_VERSION:int = 1
+
+_INDEX_FILE:str = 'search_index.pkl'
+_TOKEN = re.compile(r'\w+')
+_QUERY = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def tokenize(text:Optional[str]) -> List[str]:
+    """
+    Splits text into lowercase word tokens.
+    """
+    return _TOKEN.findall(text.lower()) if text else []
+
+
+def parse_query(query:str) -> List[List[str]]:
+    """
+    Splits a query into its clauses, each a list of tokens that must occur
+    consecutively. A term containing punctuation (e.g. poetry.lock) is
+    matched as a phrase of its tokens.
+    """
+    clauses = [tokenize(phrase if phrase else term) for phrase, term in _QUERY.findall(query)]
+    return [clause for clause in clauses if clause]
+
+
+class _Postings:
+    """
+    The issues containing a token and the positions of the token in them.
+    The positions of the n-th issue are positions[offsets[n]:offsets[n+1]].
+    """
+
+    __slots__ = ['issue_ids', 'offsets', 'positions']
+
+    def __init__(self):
+        self.issue_ids:array = array('i')
+        self.offsets:array = array('i', [0])
+        self.positions:array = array('i')
+
+    def add(self, issue_id:int, positions:List[int]):
+        self.issue_ids.append(issue_id)
+        self.positions.extend(positions)
+        self.offsets.append(len(self.positions))
+
+    def positions_of(self, issue_id:int) -> Set[int]:
+        n = bisect_left(self.issue_ids, issue_id)
+        return set(self.positions[self.offsets[n]:self.offsets[n+1]])
+
+
+class SearchIndex:
+    """
+    Inverted index with positional postings over the issues.
+    """
+
+    def __init__(self, num_issues:int=0, postings:Dict[str, _Postings]=None):
+        """
+        Constructor
+        """
+        self.num_issues:int = num_issues
+        self.postings:Dict[str, _Postings] = postings if postings is not None else {}
+
+    @classmethod
+    def build(cls, issues:List[Issue]) -> 'SearchIndex':
+        """
+        Indexes the title, text and event comments of every issue.
+        """
+        index = cls()
+        for issue_id, issue in enumerate(issues):
+            index._add(issue_id, issue)
+        return index
+
+    def search(self, query:str) -> Set[int]:
+        """
+        Returns the ids of the issues matching all clauses of the query.
+        """
+        clauses = parse_query(query)
+        if not clauses:
+            return set()
+        # Start with the rarest clause so the candidate set stays small
+        clauses.sort(key=lambda clause: min(self._frequency(token) for token in clause))
+        result:Set[int] = None
+        for clause in clauses:
+            result = self._match(clause, result)
+            if not result:
+                return set()
+        return result
+
+    def document_frequency(self, token:str) -> int:
+        """
+        Returns the number of issues containing the token.
+        """
+        return self._frequency(token.lower())
+
+    def save(self, path:str, fingerprint:str):
+        """
+        Writes the index to a file, tagged with the fingerprint of the dataset
+        it was built from (see DataLoader.get_fingerprint).
+        """
+        postings = {
+            token: (p.issue_ids.tobytes(), p.offsets.tobytes(), p.positions.tobytes())
+            for token, p in self.postings.items()
+        }
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as fout:
+            pickle.dump({
+                'version': INDEX_VERSION,
+                'fingerprint': fingerprint,
+                'num_issues': self.num_issues,
+                'postings': postings,
+            }, fout, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path:str, fingerprint:str) -> Optional['SearchIndex']:
+        """
+        Reads an index written by save, or returns None if it is missing or
+        was built from a different dataset.
+        """
+        try:
+            with open(path, 'rb') as fin:
+                stored = pickle.load(fin)
+        except FileNotFoundError:
+            return None
+        except (OSError, pickle.UnpicklingError, EOFError) as e:
+            logger.warning(f'Ignoring unreadable search index {path}: {e}')
+            return None
+        if stored.get('version') != INDEX_VERSION or stored.get('fingerprint') != fingerprint:
+            return None
+        postings:Dict[str, _Postings] = {}
+        for token, (issue_ids, offsets, positions) in stored['postings'].items():
+            p = _Postings.__new__(_Postings)
+            p.issue_ids, p.offsets, p.positions = array('i'), array('i'), array('i')
+            p.issue_ids.frombytes(issue_ids)
+            p.offsets.frombytes(offsets)
+            p.positions.frombytes(positions)
+            postings[token] = p
+        return cls(stored['num_issues'], postings)
+
+    def _add(self, issue_id:int, issue:Issue):
+        positions:Dict[str, List[int]] = defaultdict(list)
+        position = 0
+        for field in self._fields(issue):
+            for token in tokenize(field):
+                positions[token].append(position)
+                position += 1
+            # Leave a gap so phrases do not span fields
+            position += 1
+        for token, token_positions in positions.items():
+            if token not in self.postings:
+                self.postings[token] = _Postings()
+            self.postings[token].add(issue_id, token_positions)
+        self.num_issues = max(self.num_issues, issue_id + 1)
+
+    def _fields(self, issue:Issue) -> Iterable[str]:
+        yield issue.title
+        yield issue.text
+        for event in issue.events:
+            yield event.comment
+
+    def _frequency(self, token:str) -> int:
+        postings = self.postings.get(token)
+        return len(postings.issue_ids) if postings is not None else 0
+
+    def _match(self, tokens:List[str], candidates:Set[int]=None) -> Set[int]:
+        postings = [self.postings.get(token) for token in tokens]
+        if any(p is None for p in postings):
+            return set()
+        # Issues containing all tokens of the clause
+        issue_ids = candidates
+        for p in sorted(postings, key=lambda p: len(p.issue_ids)):
+            issue_ids = set(p.issue_ids) if issue_ids is None else issue_ids.intersection(p.issue_ids)
+            if not issue_ids:
+                return set()
+        if len(tokens) == 1:
+            return issue_ids
+        # ...of which those where the tokens occur consecutively
+        return {issue_id for issue_id in issue_ids if self._has_phrase(issue_id, postings)}
+
+    def _has_phrase(self, issue_id:int, postings:List[_Postings]) -> bool:
+        starts = postings[0].positions_of(issue_id)
+        for offset, p in enumerate(postings[1:], start=1):
+            starts &= {position - offset for position in p.positions_of(issue_id)}
+            if not starts:
+                return False
+        return True
+
+
+def index_path(cache_dir:str) -> str:
+    """
+    Returns the file the search index of a dataset is stored in.
+    """
+    return os.path.join(cache_dir, _INDEX_FILE)
@@ -0,0 +1,347 @@
+"""
+Serves the analyses as JSON over HTTP from a dataset that is loaded once
+and kept in memory, so that e.g. a dashboard gets answers in milliseconds
+instead of starting a run.py process per query. The data file is polled
+for changes and reloaded in the background; requests keep being answered
+from the previous dataset until the new one is ready.
+
+Usage:
+
+    python server.py --port 8612
+
+Endpoints (all GET; user and label restrict the issues by creator and label):
+
+    /status                                      dataset size and load time
+    /state-counts?user=&label=                   issues per state
+    /labels/top?n=20&user=&label=                most used labels
+    /labels/unlabeling?user=&label=              issues per number of unlabeled events
+    /labels/trend?label=a&label=b&event_type=    monthly events per label (new issues by default)
+    /lifecycle/metrics?user=&label=&number=      lifecycle metrics summary, or those of one issue
+    /search?q=&user=&label=&limit=50             full-text search
+"""
+
+import logging
+logger = logging.getLogger(__name__)
+
+import argparse
+import json
+import math
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Set
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+import data_loader
+from data_loader import DataLoader
+from issue_index import IssueIndex
+from issue_state_analysis import IssueStateAnalysis
+from label_analysis import LabelAnalysis
+from lifecycle import REOPEN_LATENCY_BUCKETS
+from search_index import SearchIndex
+from trend_cube import CREATED, TrendCube
+
+
+class BadRequest(Exception):
+    """
+    Raised by an endpoint for invalid query parameters.
+    """
+
+
+class NotFound(Exception):
+    """
+    Raised by an endpoint when the requested issue does not exist.
+    """
+
+
+class Dataset:
+    """
+    The loaded issues and every structure derived from them. All of them
+    are built up front, so requests only read them and a reload can
+    replace the whole dataset at once.
+    """
+
+    def __init__(self):
+        """
+        Constructor. Loads the data file (or its cache) through DataLoader.
+        """
+        # Drop the structures of the previous dataset so they are rebuilt
+        data_loader.reset()
+        loader = DataLoader()
+        self.data_path:str = loader.data_path
+        self.source:os.stat_result = os.stat(loader.data_path)
+        self.issues_df, self.events_df = loader.get_dataframes()
+        self.index:IssueIndex = loader.get_index()
+        self.index.build_event_indexes()
+        self.cube:TrendCube = loader.get_trend_cube()
+        self.metrics:pd.DataFrame = loader.get_lifecycle_metrics()
+        self.search_index:SearchIndex = loader.get_search_index()
+        self.fingerprint:str = loader.get_fingerprint()
+        self.loaded_at:datetime = datetime.now(timezone.utc)
+
+    def issue_ids(self, user:str=None, label:str=None) -> List[int]:
+        """
+        Returns the sorted ids of the issues of the user and/or with the label.
+        """
+        return sorted(self.index.issue_ids(creator=user, label=label))
+
+
+class AnalysisServer(ThreadingHTTPServer):
+    """
+    Answers analysis queries from a resident dataset.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host:str='localhost', port:int=8612, poll_interval:float=2):
+        """
+        Constructor. Loads the dataset before returning.
+
+        Parameters:
+        - host: Interface to listen on.
+        - port: Port to listen on (0 picks a free port).
+        - poll_interval: Seconds between checks of the data file for changes
+          (0 disables reloading).
+        """
+        super().__init__((host, port), _Handler)
+        self.poll_interval:float = poll_interval
+        self.dataset:Dataset = Dataset()
+        self._stopped = threading.Event()
+
+    @property
+    def url(self) -> str:
+        return f'http://{self.server_address[0]}:{self.server_address[1]}'
+
+    def serve_forever(self, poll_interval:float=0.5):
+        if self.poll_interval > 0:
+            threading.Thread(target=self._watch, daemon=True).start()
+        try:
+            super().serve_forever(poll_interval)
+        finally:
+            self._stopped.set()
+
+    def reload(self) -> bool:
+        """
+        Loads the data file again and swaps in the new dataset. The previous
+        dataset is kept if loading fails, e.g. because the file is invalid.
+
+        Returns:
+        - Whether the new dataset was loaded.
+        """
+        start = time.perf_counter()
+        try:
+            dataset = Dataset()
+        except Exception as e:
+            logger.warning(f'Could not reload {self.dataset.data_path}, keeping the loaded data: {e}')
+            return False
+        self.dataset = dataset
+        print(f'Reloaded {len(dataset.issues_df)} issues from {dataset.data_path} in {time.perf_counter() - start:.1f}s.')
+        return True
+
+    def _watch(self):
+        # Reloads once the size and modification time of the data file have
+        # changed and then stayed the same for one interval, so a file that
+        # is still being written is not read half-way. A version of the file
+        # that failed to load is not retried until it changes again.
+        pending = None
+        failed = None
+        while not self._stopped.wait(self.poll_interval):
+            try:
+                stat = os.stat(self.dataset.data_path)
+            except OSError:
+                continue
+            current = (stat.st_size, stat.st_mtime_ns)
+            if current in ((self.dataset.source.st_size, self.dataset.source.st_mtime_ns), failed):
+                pending = None
+            elif current == pending:
+                if not self.reload():
+                    failed = current
+                pending = None
+            else:
+                pending = current
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        endpoint = ENDPOINTS.get(parts.path.rstrip('/') or '/status')
+        if endpoint is None:
+            self._send(404, {'error': f'Unknown endpoint {parts.path}'})
+            return
+        # Requests read the dataset that is current when they start
+        dataset = self.server.dataset
+        try:
+            self._send(200, endpoint(dataset, parse_qs(parts.query)))
+        except BadRequest as e:
+            self._send(400, {'error': str(e)})
+        except NotFound as e:
+            self._send(404, {'error': str(e)})
+        except Exception as e:
+            logger.exception(f'Failed to answer {self.path}')
+            self._send(500, {'error': str(e)})
+
+    def log_message(self, format, *args):
+        logger.info(format % args)
+
+    def _send(self, status:int, document:dict):
+        body = json.dumps(_json_safe(document), default=_to_json).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+### ENDPOINTS
+
+def status(dataset:Dataset, params:Dict[str, List[str]]) -> dict:
+    return {
+        'data_path': dataset.data_path,
+        'num_issues': len(dataset.issues_df),
+        'num_events': len(dataset.events_df),
+        'fingerprint': dataset.fingerprint,
+        'loaded_at': dataset.loaded_at.isoformat(),
+    }
+
+
+def state_counts(dataset:Dataset, params:Dict[str, List[str]]) -> dict:
+    issues = dataset.issues_df.iloc[dataset.issue_ids(_param(params, 'user'), _param(params, 'label'))]
+    return IssueStateAnalysis().count_issue_states(issues)
+
+
+def top_labels(dataset:Dataset, params:Dict[str, List[str]]) -> dict:
+    top_num = _int_param(params, 'n', 20)
+    labels = dataset.issues_df['labels'].iloc[dataset.issue_ids(_param(params, 'user'), _param(params, 'label'))]
+    counts = labels.explode().dropna().value_counts().nlargest(top_num)
+    return {label: int(count) for label, count in counts.items()}
+
+
+def unlabeling(dataset:Dataset, params:Dict[str, List[str]]) -> dict:
+    issues = dataset.issues_df.iloc[dataset.issue_ids(_param(params, 'user'), _param(params, 'label'))]
+    unlabeling_counts, num_unlabel_events = LabelAnalysis().simpleUnlabelingAnalysis(issues, dataset.events_df)
+    distribution = pd.Series(unlabeling_counts, dtype='int64').value_counts().sort_index()
+    return {
+        'num_issues': len(issues),
+        'num_unlabel_events': int(num_unlabel_events),
+        'issues_by_unlabel_events': {int(k): int(count) for k, count in distribution.items()},
+    }
+
+
+def label_trend(dataset:Dataset, params:Dict[str, List[str]]) -> dict:
+    labels = params.get('label') or None
+    trend = dataset.cube.trend(_param(params, 'event_type') or CREATED, labels=labels, states=params.get('state'))
+    return {
+        label: {str(month): int(count) for month, count in trend[label].items() if count}
+        for label in trend.columns
+    }
+
+
+def lifecycle_metrics(dataset:Dataset, params:Dict[str, List[str]]) -> dict:
+    number = _int_param(params, 'number', None)
+    if number is not None:
+        if number not in dataset.index.by_number:
+            raise NotFound(f'No issue with number {number}')
+        return dataset.metrics.iloc[dataset.index.by_number[number]].to_dict()
+
+    metrics = dataset.metrics.iloc[dataset.issue_ids(_param(params, 'user'), _param(params, 'label'))]
+    buckets = metrics['reopen_latency_bucket'].value_counts()
+    return {
+        'num_issues': len(metrics),
+        'num_closed': int(metrics['first_closed_date'].notna().sum()),
+        'num_open': int(metrics['currently_open'].sum()),
+        'num_reopened': int((metrics['reopen_count'] > 0).sum()),
+        'num_reopen_events': int(metrics['reopen_count'].sum()),
+        'median_time_to_first_close_days': metrics['time_to_first_close_days'].median(),
+        'mean_time_to_first_close_days': metrics['time_to_first_close_days'].mean(),
+        'median_total_open_days': metrics['total_open_days'].median(),
+        'reopen_latency': {bucket: int(buckets.get(bucket, 0)) for bucket in REOPEN_LATENCY_BUCKETS},
+    }
+
+
+def search(dataset:Dataset, params:Dict[str, List[str]]) -> dict:
+    query = _param(params, 'q')
+    if not query:
+        raise BadRequest('Missing query parameter q')
+    limit = _int_param(params, 'limit', 50)
+    issue_ids:Set[int] = dataset.search_index.search(query)
+    user, label = _param(params, 'user'), _param(params, 'label')
+    if user is not None or label is not None:
+        issue_ids = issue_ids & dataset.index.issue_ids(creator=user, label=label)
+    matches = dataset.issues_df.iloc[sorted(issue_ids)].sort_values('created_date', ascending=False)
+    return {
+        'count': len(matches),
+        'issues': matches[['number', 'title', 'created_date', 'state']].head(limit).to_dict('records'),
+    }
+
+
+ENDPOINTS:Dict[str, Callable[[Dataset, Dict[str, List[str]]], dict]] = {
+    '/status': status,
+    '/state-counts': state_counts,
+    '/labels/top': top_labels,
+    '/labels/unlabeling': unlabeling,
+    '/labels/trend': label_trend,
+    '/lifecycle/metrics': lifecycle_metrics,
+    '/search': search,
+}
+
+
+def _param(params:Dict[str, List[str]], name:str) -> str:
+    values = params.get(name)
+    return values[0] if values else None
+
+
+def _int_param(params:Dict[str, List[str]], name:str, default:int) -> int:
+    value = _param(params, name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise BadRequest(f'Parameter {name} must be an integer, got {value!r}')
+
+
+def _json_safe(value):
+    # NaN (e.g. the median of no values) is not valid JSON
+    if isinstance(value, dict):
+        return {key: _json_safe(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_json_safe(item) for item in value]
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def _to_json(value):
+    # Converts the NumPy and pandas values in the results
+    if isinstance(value, (pd.Timestamp, datetime)):
+        return value.isoformat() if not pd.isna(value) else None
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return None if math.isnan(value) else float(value)
+    if isinstance(value, np.bool_):
+        return bool(value)
+    if value is pd.NaT or value is None:
+        return None
+    return str(value)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.WARNING)
+    ap = argparse.ArgumentParser("server.py")
+    ap.add_argument('--host', type=str, default='localhost', help='Interface to listen on')
+    ap.add_argument('--port', '-p', type=int, default=8612, help='Port to listen on')
+    ap.add_argument('--poll', type=float, default=2,
+                    help='Seconds between checks of the data file for changes (0 disables reloading)')
+    args = ap.parse_args()
+    server = AnalysisServer(args.host, args.port, args.poll)
+    print(f'Serving analyses on {server.url}')
+    server.serve_forever()
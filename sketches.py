@@ -0,0 +1,264 @@
+"""
+Streaming summaries that answer counting questions over a stream of
+items in bounded memory, at the cost of approximate answers:
+
+- SpaceSaving: the most frequent items (heavy hitters) with their counts.
+- CountMinSketch: the count of any item.
+- HyperLogLog: the number of distinct items.
+
+Each summary is exact while the stream is small (few distinct items) and
+only switches to its approximate representation once it would otherwise
+exceed its memory bound, so small datasets get exact answers. Passing
+None as the bound keeps a summary exact regardless of its size.
+
+Items are strings. They are hashed with BLAKE2b rather than hash() so
+that estimates are the same in every process and run.
+"""
+
+import hashlib
+import math
+from array import array
+from typing import Dict, List, Optional, Set, Tuple
+
+
+def hash64(item:str) -> int:
+    """
+    Returns a 64-bit hash of an item that is stable across processes.
+    """
+    return int.from_bytes(hashlib.blake2b(item.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+class SpaceSaving:
+    """
+    Keeps the counts of at most `capacity` items. When a new item arrives
+    and all counters are taken, the item with the smallest count is
+    replaced and the new item inherits its count, recorded as the error
+    of the new item's count. Every item occurring more than n/capacity
+    times in a stream of n items is guaranteed to be kept.
+
+    Counts are exact as long as no more than `capacity` distinct items
+    have been added.
+    """
+
+    def __init__(self, capacity:Optional[int]=1000):
+        """
+        Constructor
+
+        Parameters:
+        - capacity: Maximum number of counters (None for unlimited).
+        """
+        self.capacity:Optional[int] = capacity
+        self.counts:Dict[str, int] = {}
+        self.errors:Dict[str, int] = {}
+        # Items by count, to find an item with the smallest count in constant time
+        self._buckets:Dict[int, Set[str]] = {}
+        self._min_count:int = 0
+        self.total:int = 0
+
+    @property
+    def exact(self) -> bool:
+        """
+        Whether all counts are exact, i.e. no item was ever replaced.
+        """
+        return not any(self.errors.values())
+
+    def add(self, item:str, count:int=1):
+        """
+        Counts `count` more occurrences of the item.
+        """
+        self.total += count
+        current = self.counts.get(item)
+        if current is not None:
+            self._move(item, current, current + count)
+            return
+        if self.capacity is None or len(self.counts) < self.capacity:
+            self.counts[item] = count
+            self.errors[item] = 0
+            self._buckets.setdefault(count, set()).add(item)
+            if len(self.counts) == 1 or count < self._min_count:
+                self._min_count = count
+            return
+        # Replace an item with the smallest count (set.pop is constant time
+        # even after many removals, unlike iterating over the set)
+        floor = self._min_count
+        bucket = self._buckets[floor]
+        evicted = bucket.pop()
+        del self.counts[evicted]
+        del self.errors[evicted]
+        self.counts[item] = floor + count
+        self.errors[item] = floor
+        self._buckets.setdefault(floor + count, set()).add(item)
+        if not bucket:
+            del self._buckets[floor]
+            self._min_count = floor + 1 if count == 1 else min(self._buckets)
+
+    def top(self, k:int) -> List[Tuple[str, int, int]]:
+        """
+        Returns the k items with the largest counts as (item, count, error)
+        tuples. The true count of an item lies in [count - error, count].
+        """
+        ranked = sorted(self.counts.items(), key=lambda entry: (-entry[1], entry[0]))
+        return [(item, count, self.errors[item]) for item, count in ranked[:k]]
+
+    def _move(self, item:str, old_count:int, new_count:int):
+        self.counts[item] = new_count
+        bucket = self._buckets[old_count]
+        bucket.discard(item)
+        self._buckets.setdefault(new_count, set()).add(item)
+        if not bucket:
+            del self._buckets[old_count]
+            if old_count == self._min_count:
+                # Unit increments move the smallest count up by one
+                self._min_count = new_count if new_count - old_count == 1 else min(self._buckets)
+
+
+class CountMinSketch:
+    """
+    Estimates the count of any item from a table of `depth` rows of
+    `width` counters. Each item increments one counter per row and its
+    estimate is the smallest of those counters, which never undercounts
+    and overcounts by at most e/width times the total count with
+    probability 1 - exp(-depth).
+
+    Items are counted exactly in a dictionary until there are more than
+    `exact_limit` distinct items.
+    """
+
+    def __init__(self, width:int=1 << 14, depth:int=4, exact_limit:Optional[int]=10000):
+        """
+        Constructor
+
+        Parameters:
+        - width: Number of counters per row.
+        - depth: Number of rows.
+        - exact_limit: Number of distinct items counted exactly before
+          switching to the table (None to always count exactly).
+        """
+        self.width:int = width
+        self.depth:int = depth
+        self.exact_limit:Optional[int] = exact_limit
+        self.total:int = 0
+        self._exact:Optional[Dict[str, int]] = {}
+        self._table:Optional[List[array]] = None
+
+    @property
+    def exact(self) -> bool:
+        """
+        Whether estimates are exact counts.
+        """
+        return self._exact is not None
+
+    def add(self, item:str, count:int=1):
+        """
+        Counts `count` more occurrences of the item.
+        """
+        self.total += count
+        if self._exact is not None:
+            self._exact[item] = self._exact.get(item, 0) + count
+            if self.exact_limit is not None and len(self._exact) > self.exact_limit:
+                self._to_table()
+            return
+        for row, column in enumerate(self._columns(item)):
+            self._table[row][column] += count
+
+    def estimate(self, item:str) -> int:
+        """
+        Returns the estimated count of the item (an upper bound of its count).
+        """
+        if self._exact is not None:
+            return self._exact.get(item, 0)
+        return min(self._table[row][column] for row, column in enumerate(self._columns(item)))
+
+    def _columns(self, item:str) -> List[int]:
+        # Derives the column of every row from two halves of one hash
+        h = hash64(item)
+        h1, h2 = h & 0xffffffff, h >> 32
+        return [(h1 + row * h2) % self.width for row in range(self.depth)]
+
+    def _to_table(self):
+        self._table = [array('q', bytes(8 * self.width)) for _ in range(self.depth)]
+        exact, self._exact = self._exact, None
+        for item, count in exact.items():
+            for row, column in enumerate(self._columns(item)):
+                self._table[row][column] += count
+
+
+class HyperLogLog:
+    """
+    Estimates the number of distinct items from 2^precision registers,
+    each holding the longest run of leading zeros among the hashes of the
+    items mapped to it. The relative standard error is 1.04/sqrt(2^precision),
+    e.g. 1.6% for precision 12 (4 KiB of registers).
+
+    Items are collected exactly in a set of their hashes until there are
+    more than `exact_limit` of them.
+    """
+
+    def __init__(self, precision:int=12, exact_limit:Optional[int]=1000):
+        """
+        Constructor
+
+        Parameters:
+        - precision: Number of bits of the hash selecting a register (4 to 16).
+        - exact_limit: Number of distinct items collected exactly before
+          switching to the registers (None to always count exactly).
+        """
+        if not 4 <= precision <= 16:
+            raise ValueError(f'precision must be between 4 and 16, got {precision}')
+        self.precision:int = precision
+        self.exact_limit:Optional[int] = exact_limit
+        self._exact:Optional[Set[int]] = set()
+        self._registers:Optional[bytearray] = None
+
+    @property
+    def exact(self) -> bool:
+        """
+        Whether count() is the exact number of distinct items.
+        """
+        return self._exact is not None
+
+    def add(self, item:str):
+        """
+        Adds an item.
+        """
+        self.add_hash(hash64(item))
+
+    def add_hash(self, h:int):
+        """
+        Adds an item by its hash (see hash64), e.g. to hash an item added
+        to several HyperLogLogs once.
+        """
+        if self._exact is not None:
+            self._exact.add(h)
+            if self.exact_limit is not None and len(self._exact) > self.exact_limit:
+                self._to_registers()
+            return
+        self._add_hash(h)
+
+    def count(self) -> int:
+        """
+        Returns the (estimated) number of distinct items added.
+        """
+        if self._exact is not None:
+            return len(self._exact)
+        m = len(self._registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -register for register in self._registers)
+        zeros = self._registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Linear counting is more accurate for small cardinalities
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    def _add_hash(self, h:int):
+        bits = 64 - self.precision
+        register = h >> bits
+        rank = bits - (h & ((1 << bits) - 1)).bit_length() + 1
+        if rank > self._registers[register]:
+            self._registers[register] = rank
+
+    def _to_registers(self):
+        self._registers = bytearray(1 << self.precision)
+        exact, self._exact = self._exact, None
+        for h in exact:
+            self._add_hash(h)
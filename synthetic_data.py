@@ -0,0 +1,119 @@
+"""
+Generates synthetic issue data in the format of poetry_issues.json so
+that the loader, analyses and charts can be measured at any scale
+(see benchmark.py).
+
+Usage:
+
+    python synthetic_data.py --issues 100000 --events 8 --labels 40 --output synthetic_issues.json
+"""
+
+import argparse
+import json
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, List
+
+_EVENT_TYPES = ['commented', 'labeled', 'unlabeled', 'mentioned', 'subscribed', 'assigned', 'referenced']
+_WORDS = ['poetry', 'install', 'lock', 'dependency', 'resolver', 'version', 'python', 'error',
+          'update', 'package', 'environment', 'build', 'plugin', 'cache', 'solver', 'wheel']
+_DATE_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+
+def generate_issues(num_issues:int, events_per_issue:int=8, num_labels:int=30, comment_size:int=200,
+                    num_users:int=500, seed:int=0) -> Iterator[dict]:
+    """
+    Yields synthetic issues one at a time.
+
+    Parameters:
+    - num_issues: Number of issues to generate.
+    - events_per_issue: Average number of events per issue.
+    - num_labels: Number of distinct labels.
+    - comment_size: Average length of the comments and issue texts in characters.
+    - num_users: Number of distinct users.
+    - seed: Seed of the random generator, so runs are reproducible.
+    """
+    rng = random.Random(seed)
+    labels = [f'label-{i}' for i in range(num_labels)]
+    users = [f'user{i}' for i in range(num_users)]
+    start = datetime(2018, 1, 1, tzinfo=timezone.utc)
+
+    for number in range(1, num_issues + 1):
+        created = start + timedelta(seconds=rng.randrange(6 * 365 * 86400))
+        date = created
+        state = 'open'
+        events:List[dict] = []
+        for _ in range(rng.randint(0, 2 * events_per_issue)):
+            date += timedelta(seconds=rng.randrange(1, 30 * 86400))
+            # Issues alternate between being closed and reopened
+            if rng.random() < 0.15:
+                event_type = 'closed' if state == 'open' else 'reopened'
+                state = 'closed' if event_type == 'closed' else 'open'
+            else:
+                event_type = rng.choice(_EVENT_TYPES)
+            event = {
+                'event_type': event_type,
+                'author': rng.choice(users),
+                'event_date': date.strftime(_DATE_FORMAT),
+            }
+            if event_type in ('labeled', 'unlabeled'):
+                event['label'] = rng.choice(labels)
+            if event_type == 'commented':
+                event['comment'] = _text(rng, comment_size)
+            events.append(event)
+
+        yield {
+            'url': f'https://github.com/python-poetry/poetry/issues/{number}',
+            'creator': rng.choice(users),
+            'labels': rng.sample(labels, min(len(labels), rng.randint(0, 3))),
+            'state': state,
+            'assignees': rng.sample(users, rng.randint(0, 1)),
+            'title': _text(rng, 60),
+            'text': _text(rng, comment_size),
+            'number': number,
+            'created_date': created.strftime(_DATE_FORMAT),
+            'updated_date': date.strftime(_DATE_FORMAT),
+            'timeline_url': f'https://api.github.com/repos/python-poetry/poetry/issues/{number}/timeline',
+            'events': events,
+        }
+
+
+def write_issues(path:str, issues:Iterator[dict]):
+    """
+    Writes the issues to a JSON file one at a time, so arbitrarily large
+    files can be generated in constant memory.
+    """
+    with open(path, 'w') as fout:
+        fout.write('[')
+        for i, issue in enumerate(issues):
+            if i > 0:
+                fout.write(',')
+            fout.write('\n')
+            json.dump(issue, fout)
+        fout.write('\n]')
+
+
+def _text(rng:random.Random, size:int) -> str:
+    words:List[str] = []
+    length = 0
+    target = rng.randint(size // 2, size * 3 // 2)
+    while length < target:
+        word = rng.choice(_WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return ' '.join(words)
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser("synthetic_data.py")
+    ap.add_argument('--issues', '-n', type=int, default=10000, help='Number of issues')
+    ap.add_argument('--events', '-e', type=int, default=8, help='Average number of events per issue')
+    ap.add_argument('--labels', '-l', type=int, default=30, help='Number of distinct labels')
+    ap.add_argument('--comment-size', '-c', type=int, default=200, help='Average comment length in characters')
+    ap.add_argument('--users', '-u', type=int, default=500, help='Number of distinct users')
+    ap.add_argument('--seed', '-s', type=int, default=0, help='Random seed')
+    ap.add_argument('--output', '-o', type=str, default='synthetic_issues.json', help='File to write')
+    args = ap.parse_args()
+    write_issues(args.output, generate_issues(args.issues, args.events, args.labels,
+                                              args.comment_size, args.users, args.seed))
+    print(f'Wrote {args.issues} issues to {args.output}.')
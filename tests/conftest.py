@@ -0,0 +1,74 @@
+import json
+import os
+import sys
+
+import pytest
+
+# The modules live in the root directory of the repository
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import data_loader
+
+
+def make_issue(number:int, updated:str='2024-01-02T00:00:00Z', **fields) -> dict:
+    """
+    Returns the JSON object of an issue as it appears in the data file.
+    """
+    issue = {
+        'url': f'https://github.com/python-poetry/poetry/issues/{number}',
+        'creator': 'alice',
+        'labels': ['kind/bug'],
+        'state': 'open',
+        'assignees': [],
+        'title': f'Issue {number}',
+        'text': 'poetry install fails',
+        'number': number,
+        'created_date': '2024-01-01T00:00:00Z',
+        'updated_date': updated,
+        'timeline_url': f'https://api.github.com/repos/python-poetry/poetry/issues/{number}/timeline',
+        'events': [
+            {'event_type': 'commented', 'author': 'bob', 'event_date': '2024-01-01T12:00:00Z', 'comment': 'same here'},
+        ],
+    }
+    issue.update(fields)
+    return issue
+
+
+def event(event_type:str, date:str, author:str='bob', **fields) -> dict:
+    """
+    Returns the JSON object of an event as it appears in the data file.
+    """
+    return {'event_type': event_type, 'author': author, 'event_date': date, **fields}
+
+
+def write_issues(path, issues:list) -> str:
+    with open(path, 'w') as fout:
+        json.dump(issues, fout, indent=1)
+    return str(path)
+
+
+def snapshot(issues) -> list:
+    """
+    Returns the attributes of the issues and their events for comparisons.
+    """
+    return [
+        (issue.number, issue.url, issue.creator, issue.state, issue.title, issue.text, issue.created_date,
+         issue.updated_date, issue.labels, issue.assignees, issue.timeline_url,
+         [(e.event_type, e.author, e.label, e.comment, e.event_date) for e in issue.events])
+        for issue in issues
+    ]
+
+
+@pytest.fixture
+def data_file(tmp_path, monkeypatch):
+    """
+    Returns a function writing issues to the configured data file, with
+    the cache directories and the loaded dataset reset for every test.
+    """
+    path = tmp_path / 'issues.json'
+    monkeypatch.setenv('ENPM611_PROJECT_DATA_PATH', str(path))
+    monkeypatch.setenv('ENPM611_PROJECT_CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.setenv('ENPM611_PROJECT_RESULT_CACHE_DIR', str(tmp_path / 'results'))
+    data_loader.reset()
+    yield lambda issues: write_issues(path, issues)
+    data_loader.reset()
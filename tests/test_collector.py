@@ -0,0 +1,137 @@
+import asyncio
+
+import pytest
+
+import collector
+from collector import GitHubCollector, _ConnectionPool, _Response
+from conftest import event, make_issue
+from github_stub_server import StubGitHubServer
+
+ISSUES = [
+    make_issue(n, labels=['bug'] if n % 2 else [], assignees=['carol'] if n % 3 == 0 else [],
+               events=[event('labeled', '2024-01-02T00:00:00Z', label='bug'), event('closed', '2024-01-03T00:00:00Z')]
+               if n % 2 else [])
+    for n in range(1, 131)
+]
+
+
+@pytest.fixture
+def stub():
+    server = StubGitHubServer(ISSUES)
+    server.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def statuses(monkeypatch):
+    """
+    Records the status of every response the collector receives.
+    """
+    statuses = []
+    send = _ConnectionPool._send
+
+    def recording_send(self, connection, path, headers):
+        response = send(self, connection, path, headers)
+        statuses.append(response.status)
+        return response
+
+    monkeypatch.setattr(_ConnectionPool, '_send', recording_send)
+    return statuses
+
+
+def expected(issue:dict, base_url:str) -> dict:
+    # The collected issue: the timeline URL points to the server, and
+    # events have all fields
+    return {
+        **issue,
+        'timeline_url': f'{base_url}/repos/python-poetry/poetry/issues/{issue["number"]}/timeline',
+        'events': [{'label': None, 'comment': None, **e} for e in issue['events']],
+    }
+
+
+def test_collect(stub, statuses):
+    issues = GitHubCollector('python-poetry/poetry', api_url=stub.url, concurrency=4).collect()
+    assert issues == [expected(issue, stub.url) for issue in ISSUES]
+    # Two pages of issues and one timeline per issue
+    assert statuses == [200] * (2 + len(ISSUES))
+
+
+def test_refresh_uses_etags(stub, statuses, tmp_path):
+    etags = str(tmp_path / 'etags.json')
+    first = GitHubCollector('python-poetry/poetry', api_url=stub.url, etag_cache_path=etags).collect()
+    statuses.clear()
+    second = GitHubCollector('python-poetry/poetry', api_url=stub.url, etag_cache_path=etags).collect()
+    assert second == first
+    assert statuses == [304] * (2 + len(ISSUES))
+
+
+def test_waits_for_rate_limit(statuses):
+    server = StubGitHubServer(ISSUES[:3], quota=2)
+    server.start()
+    try:
+        issues = GitHubCollector('python-poetry/poetry', api_url=server.url, concurrency=4).collect()
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert [issue['number'] for issue in issues] == [1, 2, 3]
+    assert 403 in statuses
+    assert statuses.count(200) == 1 + 3
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """
+    Records the backoff delays instead of waiting.
+    """
+    delays = []
+    sleep = asyncio.sleep
+
+    async def recording_sleep(delay):
+        delays.append(delay)
+        await sleep(0)
+
+    monkeypatch.setattr(collector.asyncio, 'sleep', recording_sleep)
+    return delays
+
+
+def failing(monkeypatch, failures:int, response:_Response=_Response(503, {}, b'unavailable')):
+    # The first requests of timelines fail with the given response (a server error by default)
+    request = _ConnectionPool.request
+    remaining = [failures]
+
+    def flaky_request(self, path, headers):
+        if path.startswith('/repos/python-poetry/poetry/issues/1/') and remaining[0] > 0:
+            remaining[0] -= 1
+            return response
+        return request(self, path, headers)
+
+    monkeypatch.setattr(_ConnectionPool, 'request', flaky_request)
+
+
+def test_retries_server_errors_with_backoff(stub, monkeypatch, sleeps):
+    failing(monkeypatch, 2)
+    issues = GitHubCollector('python-poetry/poetry', api_url=stub.url).collect()
+    assert len(issues) == len(ISSUES)
+    assert sleeps == [1, 2]
+
+
+def test_gives_up_after_max_retries(stub, monkeypatch, sleeps):
+    failing(monkeypatch, 10)
+    with pytest.raises(RuntimeError, match='status 503'):
+        GitHubCollector('python-poetry/poetry', api_url=stub.url, max_retries=3).collect()
+    assert sleeps == [1, 2, 4]
+
+
+def test_rate_limit_waits_do_not_use_up_retries(stub, monkeypatch, sleeps):
+    failing(monkeypatch, 4, _Response(429, {'retry-after': '10'}, b'slow down'))
+    issues = GitHubCollector('python-poetry/poetry', api_url=stub.url, max_retries=1).collect()
+    assert len(issues) == len(ISSUES)
+    assert len(sleeps) >= 4
+
+
+def test_gives_up_after_max_rate_limit_wait(stub, monkeypatch, sleeps):
+    failing(monkeypatch, 10, _Response(429, {'retry-after': '10'}, b'slow down'))
+    with pytest.raises(RuntimeError, match='rate limited'):
+        GitHubCollector('python-poetry/poetry', api_url=stub.url, max_rate_limit_wait=35).collect()
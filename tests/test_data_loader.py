@@ -0,0 +1,59 @@
+import gzip
+import io
+import json
+import lzma
+
+import pytest
+
+from conftest import make_issue
+from data_loader import DataLoader, _iter_json_records
+
+RECORDS = [
+    {'number': 1, 'title': 'brackets ] and braces } in a string', 'events': []},
+    {'number': 2, 'title': 'escaped \\" quote, and a comma', 'events': [{'event_type': 'closed'}]},
+    {'number': 3, 'title': 'unicode é中', 'nested': {'list': [1, [2, {}]]}},
+]
+
+
+def records(text:str, chunk_size:int=4096) -> list:
+    return list(_iter_json_records(io.StringIO(text), chunk_size))
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 7, 64, 4096])
+def test_array_across_chunk_boundaries(chunk_size):
+    assert records(json.dumps(RECORDS, indent=2), chunk_size) == RECORDS
+    assert records(json.dumps(RECORDS, separators=(',', ':')), chunk_size) == RECORDS
+
+
+@pytest.mark.parametrize('chunk_size', [1, 5, 4096])
+def test_newline_delimited(chunk_size):
+    text = '\n'.join(json.dumps(record) for record in RECORDS) + '\n'
+    assert records(text, chunk_size) == RECORDS
+    # Blank lines and a missing final newline are accepted
+    assert records('\n\n' + text.replace('\n', '\n\n').rstrip(), chunk_size) == RECORDS
+
+
+@pytest.mark.parametrize('text', ['', '  \n', '[]', ' [ \n ] '])
+def test_empty_input(text):
+    assert records(text) == []
+
+
+@pytest.mark.parametrize('text', ['"not a list"', '[{"a": 1} {"b": 2}]', '[{"a": 1},', '{"a": 1}\n{"b": '])
+def test_malformed_input(text):
+    with pytest.raises(ValueError):
+        records(text, chunk_size=3)
+
+
+@pytest.mark.parametrize('suffix, open_file', [('.gz', gzip.open), ('.xz', lzma.open)])
+@pytest.mark.parametrize('delimited', [False, True])
+def test_compressed_data_files(tmp_path, monkeypatch, suffix, open_file, delimited):
+    issues = [make_issue(n) for n in range(1, 4)]
+    path = tmp_path / f'issues.json{suffix}'
+    with open_file(path, 'wt', encoding='utf-8') as fout:
+        if delimited:
+            fout.write(''.join(json.dumps(issue) + '\n' for issue in issues))
+        else:
+            json.dump(issues, fout)
+    monkeypatch.setenv('ENPM611_PROJECT_DATA_PATH', str(path))
+    monkeypatch.setenv('ENPM611_PROJECT_CACHE', 'false')
+    assert [issue.number for issue in DataLoader().iter_issues()] == [1, 2, 3]
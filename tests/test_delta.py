@@ -0,0 +1,76 @@
+import pandas as pd
+
+from conftest import event, make_issue, write_issues
+from data_loader import DataLoader
+from lifecycle import compute_lifecycle_metrics
+from trend_cube import build_trend_cube
+
+DELTA = [
+    make_issue(2, updated='2024-02-01T00:00:00Z', state='closed', creator='carol',
+               events=[event('closed', '2024-01-05T00:00:00Z'), event('reopened', '2024-01-06T00:00:00Z')]),
+    make_issue(3, updated='2024-02-15T00:00:00Z', labels=['kind/feature']),
+]
+
+
+def test_apply_delta_inserts_and_updates(data_file, tmp_path):
+    data_file([make_issue(1), make_issue(2)])
+    loader = DataLoader()
+    issues_df, _ = loader.get_dataframes()
+    assert len(issues_df) == 2
+
+    assert loader.apply_delta(write_issues(tmp_path / 'delta.json', DELTA)) == 2
+
+    issues = loader.get_issues()
+    assert [issue.number for issue in issues] == [1, 2, 3]
+    assert issues[1].state.value == 'closed'
+    index = loader.get_index()
+    assert index.issue_ids(creator='carol') == {1}
+    assert index.issue_ids(creator='alice') == {0, 2}
+    issues_df, events_df = loader.get_dataframes()
+    assert issues_df.set_index('number')['state'].to_dict() == {1: 'open', 2: 'closed', 3: 'open'}
+    assert sorted(events_df['issue_number']) == [1, 2, 2, 3]
+
+
+def test_apply_delta_skips_older_copies(data_file, tmp_path):
+    data_file([make_issue(1, updated='2024-03-01T00:00:00Z', title='current')])
+    loader = DataLoader()
+    delta = write_issues(tmp_path / 'delta.json', [make_issue(1, updated='2024-02-01T00:00:00Z', title='stale')])
+    assert loader.apply_delta(delta) == 0
+    assert loader.get_issues()[0].title == 'current'
+
+
+def test_apply_delta_updates_metrics(data_file, tmp_path):
+    data_file([make_issue(1, events=[]), make_issue(2)])
+    loader = DataLoader()
+    loader.get_lifecycle_metrics()
+    loader.apply_delta(write_issues(tmp_path / 'delta.json', DELTA))
+    # Updated incrementally, including the open time of the unchanged open issue
+    expected = compute_lifecycle_metrics(*loader.get_dataframes())
+    pd.testing.assert_frame_equal(loader.get_lifecycle_metrics(), expected)
+
+
+def test_apply_delta_changes_fingerprint(data_file, tmp_path):
+    data_file([make_issue(1)])
+    loader = DataLoader()
+    loader.get_issues()
+    before = loader.get_fingerprint()
+    loader.apply_delta(write_issues(tmp_path / 'delta.json', [make_issue(2)]))
+    assert loader.get_fingerprint() != before
+
+
+def test_apply_delta_updates_trend_cube(data_file, tmp_path):
+    data_file([make_issue(1), make_issue(2)])
+    loader = DataLoader()
+    loader.get_trend_cube()
+    loader.apply_delta(write_issues(tmp_path / 'delta.json', DELTA))
+    # Updated additively for the changed issues only
+    expected = build_trend_cube(*loader.get_dataframes())
+    pd.testing.assert_series_equal(loader.get_trend_cube().counts, expected.counts)
+
+
+def test_apply_delta_rebuilds_search_index(data_file, tmp_path):
+    data_file([make_issue(1)])
+    loader = DataLoader()
+    assert loader.get_search_index().search('"issue 2"') == set()
+    loader.apply_delta(write_issues(tmp_path / 'delta.json', [make_issue(2)]))
+    assert loader.get_search_index().search('"issue 2"') == {1}
@@ -0,0 +1,115 @@
+import os
+
+import pytest
+
+import data_loader
+import issue_cache
+from conftest import event, make_issue, snapshot, write_issues
+from data_loader import DataLoader
+
+ISSUES = [
+    make_issue(1),
+    make_issue(2, creator=None, text=None, labels=[], assignees=['carol', 'dave'], events=[]),
+    make_issue(3, title='Unicode: café 中文 🚀', state='closed', updated_date=None,
+               events=[event('labeled', '2024-01-03T00:00:00Z', label='kind/feature'),
+                       event('closed', '2024-01-04T05:06:07Z', author=None)]),
+]
+
+
+def parsed(path:str) -> list:
+    loader = DataLoader()
+    loader.use_cache = False
+    return snapshot(loader.iter_issues())
+
+
+def test_round_trip(data_file):
+    path = data_file(ISSUES)
+    loader = DataLoader()
+    assert not issue_cache.is_valid(path, loader.cache_dir)
+    issues = snapshot(loader.get_issues())
+    assert issue_cache.is_valid(path, loader.cache_dir)
+    assert snapshot(issue_cache.load(path, loader.cache_dir)) == issues == parsed(path)
+
+
+def test_invalid_after_edit(data_file):
+    path = data_file(ISSUES)
+    loader = DataLoader()
+    loader.get_issues()
+    stat = os.stat(path)
+    # Same size, different content, written a second later
+    with open(path, 'r+') as fout:
+        text = fout.read()
+        fout.seek(0)
+        fout.write(text.replace('Issue 1', 'Issue 9'))
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert os.stat(path).st_size == stat.st_size
+    assert not issue_cache.is_valid(path, loader.cache_dir)
+    assert issue_cache.load(path, loader.cache_dir) is None
+
+
+def test_invalid_after_replace(data_file, tmp_path):
+    path = data_file(ISSUES)
+    loader = DataLoader()
+    loader.get_issues()
+    replacement = write_issues(tmp_path / 'new.json', [make_issue(5), make_issue(6)])
+    os.replace(replacement, path)
+    assert not issue_cache.is_valid(path, loader.cache_dir)
+
+    # The next load parses the new file and rebuilds the cache
+    data_loader.reset()
+    assert [issue.number for issue in DataLoader().get_issues()] == [5, 6]
+    assert issue_cache.is_valid(path, loader.cache_dir)
+    assert [issue.number for issue in issue_cache.load(path, loader.cache_dir)] == [5, 6]
+
+
+def test_rebuild_keeps_loaded_issues(data_file):
+    path = data_file(ISSUES)
+    expected = parsed(path)
+    loader = DataLoader()
+    loader.get_issues()
+    # Loaded from the cache; their events are only decoded on first access
+    earlier = issue_cache.load(path, loader.cache_dir)
+    write_issues(path, [make_issue(n, events=[event('closed', f'2024-02-0{n}T00:00:00Z', author=f'user{n}')]) for n in range(1, 5)])
+    data_loader.reset()
+    DataLoader().get_issues()
+    assert snapshot(earlier) == expected
+
+
+def test_iter_issues_streams_from_valid_cache(data_file, monkeypatch):
+    path = data_file([make_issue(n, text=None if n % 3 else 'café') for n in range(1, 8)])
+    expected = parsed(path)
+    loader = DataLoader()
+    loader.get_issues()
+    assert issue_cache.is_valid(path, loader.cache_dir)
+    # Small batches so that issues, list items and events are sliced
+    monkeypatch.setattr(issue_cache, '_STREAM_BATCH', 3)
+    monkeypatch.setattr(DataLoader, '_iter_issues_parsed', lambda self: pytest.fail('data file parsed'))
+    assert snapshot(loader.iter_issues()) == expected
+    assert [issue.events for issue in issue_cache.iter_issues(path, loader.cache_dir, load_events=False)] == [[]] * 7
+
+
+def test_warm_load_does_not_hash_the_data_file(data_file, monkeypatch):
+    path = data_file(ISSUES)
+    loader = DataLoader()
+    loader.get_issues()
+    fingerprint = loader.get_fingerprint()
+    # A new process knows no fingerprints and must not read the data file again
+    data_loader.reset()
+    monkeypatch.setattr(issue_cache, '_FINGERPRINTS', {})
+    monkeypatch.setattr(issue_cache, 'source_fingerprint', lambda data_path: pytest.fail('data file hashed'))
+    loader = DataLoader()
+    assert loader.get_fingerprint() == fingerprint
+    assert snapshot(loader.get_issues()) == parsed(path)
+
+
+def test_valid_after_touch(data_file, monkeypatch):
+    path = data_file(ISSUES)
+    loader = DataLoader()
+    loader.get_issues()
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    # The content is unchanged, so the cache stays valid and records the new time
+    assert issue_cache.is_valid(path, loader.cache_dir)
+    monkeypatch.setattr(issue_cache, '_FINGERPRINTS', {})
+    monkeypatch.setattr(issue_cache, 'source_fingerprint', lambda data_path: pytest.fail('data file hashed'))
+    assert issue_cache.is_valid(path, loader.cache_dir)
@@ -0,0 +1,82 @@
+import math
+
+import pandas as pd
+import pytest
+
+import data_loader
+from conftest import event, make_issue
+from data_loader import DataLoader
+from lifecycle import REOPEN_LATENCY_BUCKETS, latency_bucket
+
+END = '2024-03-01T00:00:00Z'
+ISSUES = [
+    # Closed after 10 days, reopened 1.5 days later and closed again
+    make_issue(1, updated=END, events=[
+        event('closed', '2024-01-11T00:00:00Z'),
+        event('commented', '2024-01-11T06:00:00Z'),
+        event('reopened', '2024-01-12T12:00:00Z'),
+        event('closed', '2024-01-20T00:00:00Z'),
+    ]),
+    # Never closed
+    make_issue(2, updated=END, events=[]),
+    # Reopened twice and still open
+    make_issue(3, updated=END, events=[
+        event('closed', '2024-01-02T00:00:00Z'),
+        event('reopened', '2024-01-31T00:00:00Z'),
+        event('closed', '2024-02-01T00:00:00Z'),
+        event('reopened', '2024-02-10T00:00:00Z'),
+    ]),
+]
+
+
+@pytest.fixture
+def metrics(data_file) -> pd.DataFrame:
+    data_file(ISSUES)
+    return DataLoader().get_lifecycle_metrics().set_index('issue_id')
+
+
+def test_metric_values(metrics):
+    assert metrics['reopen_count'].to_dict() == {1: 1, 2: 0, 3: 2}
+    assert metrics.loc[1, 'time_to_first_close_days'] == 10
+    assert math.isnan(metrics.loc[2, 'time_to_first_close_days'])
+    assert metrics.loc[3, 'time_to_first_close_days'] == 1
+    # Issues that are still open count until the latest date in the dataset
+    assert metrics['total_open_days'].to_dict() == {1: 10 + 7.5, 2: 60, 3: 1 + 1 + 20}
+    assert metrics['currently_open'].to_dict() == {1: False, 2: True, 3: True}
+    assert metrics.loc[1, 'first_reopen_latency_days'] == 1.5
+    assert metrics.loc[3, 'first_reopen_latency_days'] == 29
+    assert metrics.loc[1, 'first_closed_date'] == pd.Timestamp('2024-01-11', tz='UTC')
+    assert pd.isna(metrics.loc[2, 'first_closed_date'])
+
+
+def test_latency_buckets(metrics):
+    buckets = metrics['reopen_latency_bucket']
+    assert list(buckets.cat.categories) == REOPEN_LATENCY_BUCKETS
+    assert buckets[1] == 'within a day'
+    assert pd.isna(buckets[2])
+    assert buckets[3] == '14 days to a month'
+
+
+@pytest.mark.parametrize('days, bucket', [
+    (0, 'within a day'), (1, 'within a day'), (2, 'within a week'), (7, '7-14 days'),
+    (14, '14 days to a month'), (30, '1-6 months'), (182, '6-12 months'), (365, 'after one year'),
+])
+def test_latency_bucket(days, bucket):
+    assert latency_bucket(days) == bucket
+
+
+def test_metrics_are_stored_with_the_cache(metrics):
+    data_loader.reset()
+    stored = DataLoader().get_lifecycle_metrics().set_index('issue_id')
+    pd.testing.assert_frame_equal(stored, metrics, check_index_type=False)
+
+
+def test_analysis_counts_reopen_timing_from_metrics(metrics):
+    from issue_lifecycle_analysis import IssueLifecycleAnalysis
+    from pipeline import Inputs
+    results = IssueLifecycleAnalysis().compute(Inputs())
+    assert [lifecycle['issue_id'] for lifecycle in results['lifecycles']] == [1, 3]
+    counts = results['reopen_latency_counts']
+    assert counts['within a day'] == 1
+    assert counts['14 days to a month'] == 1
+    assert counts.sum() == 2
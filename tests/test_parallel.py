@@ -0,0 +1,90 @@
+import json
+
+import pytest
+
+import data_loader
+from conftest import event, make_issue, snapshot
+from data_loader import DataLoader
+from model import Issue
+
+ISSUES = [
+    make_issue(n, title=f'Issue {n}, with {{braces}} and [brackets]', text='é' * (n % 4) or None,
+               events=[event('commented', f'2024-01-{n % 28 + 1:02d}T00:00:00Z', comment='{"nested": [1, 2]},\n{')]
+               + [event('labeled', '2024-02-01T00:00:00Z', label=f'label-{i}') for i in range(n % 3)])
+    for n in range(1, 60)
+]
+
+
+def write_array(path, issues:list):
+    # One issue per line, as written by synthetic_data.py
+    with open(path, 'w') as fout:
+        fout.write('[\n' + ',\n'.join(json.dumps(issue) for issue in issues) + '\n]\n')
+
+
+def write_pretty(path, issues:list):
+    # Pretty-printed, as written by collector.py
+    with open(path, 'w') as fout:
+        json.dump(issues, fout, indent=2)
+
+
+def write_delimited(path, issues:list):
+    with open(path, 'w') as fout:
+        fout.write(''.join(json.dumps(issue) + '\n' for issue in issues))
+
+
+def write_single_line(path, issues:list):
+    with open(path, 'w') as fout:
+        json.dump(issues, fout)
+
+
+def write_inconsistent(path, issues:list):
+    # The first record is indented differently from the others
+    lines = [json.dumps(issue) for issue in issues]
+    with open(path, 'w') as fout:
+        fout.write('[\n  ' + lines[0] + ',\n' + ',\n'.join(lines[1:]) + '\n]')
+
+
+@pytest.fixture
+def small_ranges(monkeypatch):
+    # Splits even small files into many ranges
+    monkeypatch.setattr(data_loader, '_CHUNK_SIZE', 512)
+
+
+@pytest.mark.parametrize('write, splittable', [
+    (write_array, True),
+    (write_pretty, True),
+    (write_delimited, True),
+    (write_single_line, False),
+    (write_inconsistent, False),
+])
+def test_parallel_matches_serial(data_file, monkeypatch, small_ranges, write, splittable):
+    path = data_file([])
+    write(path, ISSUES)
+    monkeypatch.setenv('ENPM611_PROJECT_CACHE', 'false')
+    serial = snapshot(DataLoader().iter_issues())
+    assert len(serial) == len(ISSUES)
+
+    monkeypatch.setenv('ENPM611_PROJECT_LOAD_WORKERS', '2')
+    ranges = data_loader._split_records(path, 2)
+    assert (ranges is not None and len(ranges) > 2) == splittable
+    assert snapshot(DataLoader().iter_issues()) == serial
+
+
+def test_parallel_without_events(data_file, monkeypatch, small_ranges):
+    data_file(ISSUES)
+    monkeypatch.setenv('ENPM611_PROJECT_CACHE', 'false')
+    monkeypatch.setenv('ENPM611_PROJECT_LOAD_EVENTS', 'false')
+    monkeypatch.setenv('ENPM611_PROJECT_LOAD_WORKERS', '2')
+    issues = list(DataLoader().iter_issues())
+    assert [issue.number for issue in issues] == list(range(1, 60))
+    assert all(issue.events == [] for issue in issues)
+
+
+@pytest.mark.parametrize('write', [write_array, write_delimited])
+def test_empty_and_single_issue(data_file, monkeypatch, small_ranges, write):
+    path = data_file([])
+    monkeypatch.setenv('ENPM611_PROJECT_CACHE', 'false')
+    monkeypatch.setenv('ENPM611_PROJECT_LOAD_WORKERS', '2')
+    for issues in ([], ISSUES[:1]):
+        write(path, issues)
+        assert snapshot(DataLoader().iter_issues()) == snapshot(Issue(issue) for issue in issues)
@@ -0,0 +1,116 @@
+import os
+
+import pytest
+
+import pipeline
+import run
+from conftest import event, make_issue
+from data_loader import DataLoader
+from pipeline import Analysis, Inputs, required_inputs, run_analyses
+
+
+@pytest.fixture
+def counted_inputs(monkeypatch):
+    """
+    Registers the inputs a <- b <- c, a <- c and d, counting how often
+    each is derived.
+    """
+    calls = []
+
+    def provider(name, *requires):
+        def derive(inputs):
+            calls.append(name)
+            return name + ''.join(inputs[dependency] for dependency in requires)
+        monkeypatch.setitem(pipeline.INPUTS, name, (list(requires), derive))
+
+    provider('test_c')
+    provider('test_b', 'test_c')
+    provider('test_a', 'test_b', 'test_c')
+    provider('test_d')
+    return calls
+
+
+class Concat(Analysis):
+    """
+    Joins its inputs and records what it rendered.
+    """
+
+    def __init__(self, *names:str, version:int=1):
+        self.INPUTS = list(names)
+        self.VERSION = version
+        self.rendered = []
+
+    def params(self):
+        return {'inputs': self.INPUTS}
+
+    def compute(self, inputs:Inputs):
+        return '+'.join(inputs[name] for name in self.INPUTS) + f'@{os.getpid()}'
+
+    def render(self, results):
+        self.rendered.append(results.split('@')[0])
+
+
+def test_required_inputs_are_ordered_by_dependency(counted_inputs):
+    assert required_inputs([Concat('test_a'), Concat('test_d', 'test_b')]) == ['test_c', 'test_b', 'test_a', 'test_d']
+    with pytest.raises(KeyError):
+        required_inputs([Concat('no_such_input')])
+
+
+def test_inputs_are_derived_once(counted_inputs):
+    inputs = Inputs()
+    inputs.build(['test_a', 'test_b'])
+    assert inputs['test_a'] == 'test_atest_btest_ctest_c'
+    assert counted_inputs == ['test_c', 'test_b', 'test_a']
+    with pytest.raises(KeyError):
+        inputs['no_such_input']
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_run_analyses(data_file, counted_inputs, jobs):
+    data_file([make_issue(1)])
+    analyses = [Concat('test_a'), Concat('test_d'), Concat('test_b', 'test_d')]
+    run_analyses(analyses, jobs)
+    assert [analysis.rendered for analysis in analyses] == [['test_atest_btest_ctest_c'], ['test_d'], ['test_btest_c+test_d']]
+    # Shared inputs are derived once, before the analyses are computed
+    assert sorted(counted_inputs) == ['test_a', 'test_b', 'test_c', 'test_d']
+
+
+def test_run_analyses_reuses_cached_results(data_file, counted_inputs):
+    data_file([make_issue(1)])
+    run_analyses([Concat('test_a'), Concat('test_d')], jobs=2)
+    counted_inputs.clear()
+    analyses = [Concat('test_a'), Concat('test_d'), Concat('test_d', version=2)]
+    run_analyses(analyses, jobs=2)
+    assert [analysis.rendered for analysis in analyses] == [['test_atest_btest_ctest_c'], ['test_d'], ['test_d']]
+    # Only the analysis whose version changed was computed again
+    assert counted_inputs == ['test_d']
+    assert not DataLoader().is_loaded()
+
+
+def test_selected_issues(data_file, monkeypatch):
+    data_file([make_issue(1, labels=['bug']), make_issue(2, creator='carol', labels=['bug']), make_issue(3, labels=[])])
+    assert Inputs()['selected_issue_ids'] is None
+    assert len(Inputs()['selected_issues_df']) == 3
+    monkeypatch.setenv('user', 'alice')
+    monkeypatch.setenv('label', 'bug')
+    assert list(Inputs()['selected_issues_df']['number']) == [1]
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_run_features(data_file, tmp_path, monkeypatch, jobs):
+    data_file([make_issue(1, labels=['bug']), make_issue(2, events=[
+        event('closed', '2024-01-03T00:00:00Z'), event('reopened', '2024-01-05T00:00:00Z')])])
+    plot_dir = tmp_path / f'charts-{jobs}'
+    monkeypatch.setenv('ENPM611_PROJECT_PLOT_DIR', str(plot_dir))
+    monkeypatch.setenv('ENPM611_PROJECT_RESULT_CACHE', 'false')
+    run.run_features([1, 2, 3], jobs)
+    assert len(os.listdir(plot_dir)) >= 3
+
+
+def test_lifecycle_analysis_without_reopened_issues(data_file, tmp_path, monkeypatch):
+    data_file([make_issue(1), make_issue(2, events=[event('closed', '2024-01-03T00:00:00Z')])])
+    monkeypatch.setenv('ENPM611_PROJECT_PLOT_DIR', str(tmp_path / 'charts'))
+    monkeypatch.setenv('ENPM611_PROJECT_RESULT_CACHE', 'false')
+    run.run_features([3])
+    charts = os.listdir(tmp_path / 'charts') if os.path.isdir(tmp_path / 'charts') else []
+    assert not [name for name in charts if name.startswith(('reopening_trend', 'reopened_issue_timing'))]
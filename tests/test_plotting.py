@@ -0,0 +1,60 @@
+import os
+from datetime import datetime, timedelta, timezone
+
+import matplotlib
+import pytest
+
+import plotting
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+LIFECYCLES = [
+    {
+        'issue_id': n,
+        'created_date': START + timedelta(days=n),
+        'closed_dates': [START + timedelta(days=n + 3)],
+        'reopened_dates': [START + timedelta(days=n + 5)],
+    }
+    for n in range(1, 121)
+]
+
+
+@pytest.fixture
+def windows(monkeypatch):
+    """
+    Draws charts interactively, recording the y-axis labels of every
+    window instead of showing it.
+    """
+    # The --output-dir parameter takes precedence over ENPM611_PROJECT_PLOT_DIR
+    monkeypatch.delenv('output_dir', raising=False)
+    monkeypatch.delenv('ENPM611_PROJECT_PLOT_DIR', raising=False)
+    matplotlib.use('agg')
+    plt = plotting.pyplot()
+    windows = []
+
+    def record(name):
+        figure = plt.gcf()
+        figure.canvas.draw()
+        windows.append([label.get_text() for label in figure.axes[0].get_yticklabels() if label.get_text()])
+        plt.close(figure)
+
+    monkeypatch.setattr(plotting, 'show', record)
+    return windows
+
+
+def test_gantt_chart_is_paginated_when_headless(tmp_path, monkeypatch):
+    monkeypatch.delenv('output_dir', raising=False)
+    monkeypatch.setenv('ENPM611_PROJECT_PLOT_DIR', str(tmp_path))
+    plotting.plot_gantt_chart(LIFECYCLES, rows_per_page=50)
+    assert len([name for name in os.listdir(tmp_path) if name.startswith('gantt_chart')]) == 3
+
+
+def test_gantt_chart_opens_one_window_when_interactive(windows):
+    plotting.plot_gantt_chart(LIFECYCLES, rows_per_page=50)
+    assert len(windows) == 1
+    assert 0 < len(windows[0]) <= 50
+    assert set(windows[0]) <= {f'Issue {n}' for n in range(1, 121)}
+
+
+def test_small_gantt_chart_labels_every_issue(windows):
+    plotting.plot_gantt_chart(LIFECYCLES[:5], rows_per_page=50)
+    assert windows == [[f'Issue {n}' for n in range(1, 6)]]
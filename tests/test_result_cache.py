@@ -0,0 +1,72 @@
+import os
+import time
+
+import data_loader
+import result_cache
+from conftest import make_issue, write_issues
+from data_loader import DataLoader
+from result_cache import ResultCache
+
+
+def test_hit_and_miss(tmp_path):
+    cache = ResultCache(str(tmp_path), max_bytes=1 << 20)
+    key = cache.key('LabelAnalysis', {'label': 'bug'}, 'data-1')
+    assert cache.get(key) == (False, None)
+    cache.put(key, {'count': 3})
+    assert cache.get(key) == (True, {'count': 3})
+
+
+def test_key_depends_on_params_fingerprint_and_version(tmp_path):
+    cache = ResultCache(str(tmp_path), max_bytes=1 << 20)
+    key = cache.key('LabelAnalysis', {'label': 'bug', 'user': None}, 'data-1')
+    assert key == cache.key('LabelAnalysis', {'user': None, 'label': 'bug'}, 'data-1')
+    assert key != cache.key('LabelAnalysis', {'label': 'docs', 'user': None}, 'data-1')
+    assert key != cache.key('LabelAnalysis', {'label': 'bug', 'user': None}, 'data-2')
+    assert key != cache.key('LabelAnalysis', {'label': 'bug', 'user': None}, 'data-1', version=2)
+    assert key != cache.key('IssueStateAnalysis', {'label': 'bug', 'user': None}, 'data-1')
+
+
+def test_corrupt_entry_is_a_miss(tmp_path):
+    cache = ResultCache(str(tmp_path), max_bytes=1 << 20)
+    key = cache.key('LabelAnalysis', {}, 'data-1')
+    cache.put(key, [1, 2, 3])
+    with open(os.path.join(str(tmp_path), key + '.pkl'), 'wb') as fout:
+        fout.write(b'not a pickle')
+    assert cache.get(key) == (False, None)
+
+
+def test_least_recently_used_results_are_evicted(tmp_path):
+    cache = ResultCache(str(tmp_path), max_bytes=2500)
+    keys = [cache.key('Analysis', {'n': n}, 'data-1') for n in range(3)]
+    for n, key in enumerate(keys):
+        cache.put(key, bytes(1000))
+        # Distinct modification times order the results by use
+        os.utime(os.path.join(str(tmp_path), key + '.pkl'), (time.time() - 100 + n, time.time() - 100 + n))
+        cache.evict()
+    assert [cache.get(key)[0] for key in keys] == [False, True, True]
+
+
+def test_lookup_follows_the_dataset(data_file, tmp_path):
+    path = data_file([make_issue(1)])
+    assert result_cache.lookup('LabelAnalysis', {'label': None}) == (False, None)
+    result_cache.store('LabelAnalysis', {'label': None}, 'result')
+    assert result_cache.lookup('LabelAnalysis', {'label': None}) == (True, 'result')
+    assert result_cache.lookup('LabelAnalysis', {'label': 'bug'}) == (False, None)
+    assert result_cache.lookup('LabelAnalysis', {'label': None}, version=2) == (False, None)
+    # Only the fingerprint of the data file is computed, the data is not loaded
+    assert not DataLoader().is_loaded()
+
+    # A changed data file or an applied delta file is a different dataset
+    write_issues(path, [make_issue(1), make_issue(2)])
+    data_loader.reset()
+    assert result_cache.lookup('LabelAnalysis', {'label': None}) == (False, None)
+    result_cache.store('LabelAnalysis', {'label': None}, 'result 2')
+    DataLoader().apply_delta(write_issues(tmp_path / 'delta.json', [make_issue(3)]))
+    assert result_cache.lookup('LabelAnalysis', {'label': None}) == (False, None)
+
+
+def test_disabled(data_file, monkeypatch):
+    data_file([make_issue(1)])
+    monkeypatch.setenv('ENPM611_PROJECT_RESULT_CACHE', 'false')
+    result_cache.store('LabelAnalysis', {}, 'result')
+    assert result_cache.lookup('LabelAnalysis', {}) == (False, None)
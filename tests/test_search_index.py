@@ -0,0 +1,43 @@
+from conftest import make_issue
+from model import Issue
+from search_index import SearchIndex, index_path, parse_query
+
+ISSUES = [
+    Issue(make_issue(1, title='Dependency resolver is slow', text='resolving takes minutes')),
+    Issue(make_issue(2, title='Lock file', text='poetry.lock is not updated by the resolver',
+                     events=[{'event_type': 'commented', 'comment': 'The dependency graph changed'}])),
+    Issue(make_issue(3, title='Install fails', text=None, events=[])),
+]
+
+
+def test_parse_query():
+    assert parse_query('Lock "dependency  Resolver" poetry.lock ""') == [['lock'], ['dependency', 'resolver'], ['poetry', 'lock']]
+
+
+def test_terms_must_all_match():
+    index = SearchIndex.build(ISSUES)
+    assert index.search('resolver') == {0, 1}
+    assert index.search('RESOLVER dependency') == {0, 1}
+    assert index.search('resolver install') == set()
+    assert index.search('unknown') == set()
+    assert index.search('') == set()
+
+
+def test_phrases_match_consecutive_tokens():
+    index = SearchIndex.build(ISSUES)
+    assert index.search('"dependency resolver"') == {0}
+    assert index.search('"resolver dependency"') == set()
+    assert index.search('poetry.lock') == {1}
+    # Comments are indexed, but phrases do not span fields
+    assert index.search('"dependency graph"') == {1}
+    assert index.search('"slow resolving"') == set()
+
+
+def test_save_and_load(tmp_path):
+    index = SearchIndex.build(ISSUES)
+    path = index_path(str(tmp_path))
+    index.save(path, 'abc')
+    assert SearchIndex.load(path, 'other') is None
+    loaded = SearchIndex.load(path, 'abc')
+    assert loaded.search('"dependency resolver"') == {0}
+    assert loaded.document_frequency('Resolver') == 2
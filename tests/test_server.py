@@ -0,0 +1,109 @@
+import json
+import threading
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import pytest
+
+from conftest import event, make_issue, write_issues
+from issue_index import IssueIndex
+from server import AnalysisServer
+
+ISSUES = [
+    make_issue(1, labels=['bug'], events=[event('closed', '2024-01-03T00:00:00Z'), event('reopened', '2024-01-04T00:00:00Z')]),
+    make_issue(2, creator='carol', labels=['bug', 'docs'], state='closed', title='Lock file is stale',
+               events=[event('unlabeled', '2024-01-05T00:00:00Z', label='docs'), event('closed', '2024-01-06T00:00:00Z')]),
+    make_issue(3, labels=[], title='Lock file is missing', created_date='2024-02-01T00:00:00Z', events=[]),
+]
+
+
+@pytest.fixture
+def server(data_file):
+    data_file(ISSUES)
+    server = AnalysisServer(port=0, poll_interval=0)
+    thread = threading.Thread(target=server.serve_forever, args=(0.01,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def get(server:AnalysisServer, path:str):
+    """
+    Returns the status and JSON document of a request.
+    """
+    try:
+        with urlopen(server.url + path) as response:
+            return response.status, json.load(response)
+    except HTTPError as e:
+        return e.code, json.load(e)
+
+
+def test_status(server):
+    status, document = get(server, '/status')
+    assert status == 200
+    assert (document['num_issues'], document['num_events']) == (3, 4)
+    assert get(server, '/')[1] == document
+
+
+def test_event_indexes_are_built_up_front(server, monkeypatch):
+    monkeypatch.setattr(IssueIndex, '_add_events', lambda self, issue_id: pytest.fail('event indexes built on first use'))
+    assert len(server.dataset.index.events_by_type('closed')) == 2
+
+
+def test_state_counts(server):
+    assert get(server, '/state-counts') == (200, {'open': 2, 'closed': 1})
+    assert get(server, '/state-counts?user=carol') == (200, {'closed': 1})
+    assert get(server, '/state-counts?label=bug&user=alice') == (200, {'open': 1})
+
+
+def test_labels(server):
+    assert get(server, '/labels/top?n=1') == (200, {'bug': 2})
+    status, document = get(server, '/labels/unlabeling?label=bug')
+    assert document == {'num_issues': 2, 'num_unlabel_events': 1, 'issues_by_unlabel_events': {'0': 1, '1': 1}}
+    assert get(server, '/labels/trend?label=bug&label=docs') == (200, {'bug': {'2024-01': 2}, 'docs': {'2024-01': 1}})
+    assert get(server, '/labels/trend?event_type=closed') == (200, {'*': {'2024-01': 2}})
+
+
+def test_lifecycle_metrics(server):
+    status, summary = get(server, '/lifecycle/metrics')
+    assert status == 200
+    assert (summary['num_issues'], summary['num_closed'], summary['num_reopened']) == (3, 2, 1)
+    assert summary['reopen_latency']['within a day'] == 1
+    status, issue = get(server, '/lifecycle/metrics?number=1')
+    assert (issue['issue_id'], issue['reopen_count'], issue['first_reopen_latency_days']) == (1, 1, 1)
+    assert get(server, '/lifecycle/metrics?user=nobody')[1]['median_total_open_days'] is None
+
+
+def test_search(server):
+    status, document = get(server, '/search?q=lock+file')
+    assert (status, document['count']) == (200, 2)
+    # Most recent first
+    assert [issue['number'] for issue in document['issues']] == [3, 2]
+    assert get(server, '/search?q=%22file+is+stale%22&limit=1')[1]['count'] == 1
+    assert get(server, '/search?q=lock&user=alice')[1]['count'] == 1
+
+
+@pytest.mark.parametrize('path, status', [
+    ('/no-such-endpoint', 404),
+    ('/lifecycle/metrics?number=99', 404),
+    ('/lifecycle/metrics?number=one', 400),
+    ('/labels/top?n=many', 400),
+    ('/search', 400),
+    ('/search?q=', 400),
+])
+def test_errors(server, path, status):
+    code, document = get(server, path)
+    assert code == status
+    assert 'error' in document
+
+
+def test_reload(server):
+    write_issues(server.dataset.data_path, ISSUES + [make_issue(4)])
+    assert server.reload()
+    assert get(server, '/status')[1]['num_issues'] == 4
+    # An invalid file keeps the loaded data
+    with open(server.dataset.data_path, 'w') as fout:
+        fout.write('[{"number": ')
+    assert not server.reload()
+    assert get(server, '/status')[1]['num_issues'] == 4
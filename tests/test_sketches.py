@@ -0,0 +1,86 @@
+import random
+from collections import Counter
+
+import pytest
+
+from sketches import CountMinSketch, HyperLogLog, SpaceSaving
+
+
+def zipf_stream(num_items:int, length:int, seed:int=611) -> list:
+    rng = random.Random(seed)
+    weights = [1 / rank for rank in range(1, num_items + 1)]
+    return [f'user{i}' for i in rng.choices(range(num_items), weights, k=length)]
+
+
+STREAM = zipf_stream(2000, 20000)
+COUNTS = Counter(STREAM)
+
+
+def test_space_saving_is_exact_within_capacity():
+    ranking = SpaceSaving(capacity=len(COUNTS))
+    for item in STREAM:
+        ranking.add(item)
+    assert ranking.exact
+    expected = sorted(COUNTS.items(), key=lambda entry: (-entry[1], entry[0]))[:10]
+    assert ranking.top(10) == [(item, count, 0) for item, count in expected]
+
+
+def test_space_saving_bounds():
+    capacity = 100
+    ranking = SpaceSaving(capacity)
+    for item in STREAM:
+        ranking.add(item)
+    assert not ranking.exact
+    assert len(ranking.counts) == capacity
+    assert ranking.total == len(STREAM)
+    for item, count, error in ranking.top(capacity):
+        assert count - error <= COUNTS[item] <= count
+    # Every item occurring more than n/capacity times is kept
+    frequent = {item for item, count in COUNTS.items() if count > len(STREAM) / capacity}
+    assert frequent <= set(ranking.counts)
+
+
+def test_count_min_is_exact_below_limit():
+    sketch = CountMinSketch(exact_limit=None)
+    for item in STREAM:
+        sketch.add(item)
+    assert sketch.exact
+    assert all(sketch.estimate(item) == count for item, count in COUNTS.items())
+    assert sketch.estimate('nobody') == 0
+
+
+def test_count_min_never_undercounts():
+    width = 256
+    sketch = CountMinSketch(width=width, depth=4, exact_limit=100)
+    for item in STREAM:
+        sketch.add(item)
+    assert not sketch.exact
+    errors = [sketch.estimate(item) - count for item, count in COUNTS.items()]
+    assert min(errors) >= 0
+    # Overcounts stay within e/width of the total for almost all items
+    bound = 2.72 / width * len(STREAM)
+    assert sum(error > bound for error in errors) <= 0.05 * len(errors)
+
+
+def test_hyperloglog_is_exact_below_limit():
+    distinct = HyperLogLog(exact_limit=len(COUNTS))
+    for item in STREAM:
+        distinct.add(item)
+    assert distinct.exact
+    assert distinct.count() == len(COUNTS)
+
+
+@pytest.mark.parametrize('num_items', [500, 20000])
+def test_hyperloglog_estimate(num_items):
+    distinct = HyperLogLog(precision=12, exact_limit=10)
+    for i in range(num_items):
+        distinct.add(f'user{i}')
+        distinct.add(f'user{i}')
+    assert not distinct.exact
+    # The standard error is 1.6% at precision 12
+    assert abs(distinct.count() - num_items) <= 0.05 * num_items
+
+
+def test_hyperloglog_precision():
+    with pytest.raises(ValueError):
+        HyperLogLog(precision=3)
@@ -0,0 +1,65 @@
+import pandas as pd
+import pytest
+
+from conftest import event, make_issue
+from data_loader import DataLoader
+from trend_cube import ALL_LABELS, CREATED
+
+ISSUES = [
+    make_issue(1, labels=['bug', 'docs'], created_date='2024-01-31T23:30:00-02:00',
+               events=[event('closed', '2024-02-03T00:00:00Z'), event('reopened', '2024-03-01T00:00:00Z')]),
+    make_issue(2, labels=['bug'], state='closed', created_date='2024-02-10T00:00:00Z',
+               events=[event('reopened', '2024-03-15T00:00:00Z'), event('commented', None)]),
+    make_issue(3, labels=[], created_date='2024-03-05T00:00:00Z', events=[event('reopened', '2024-03-20T00:00:00Z')]),
+    make_issue(4, labels=['docs'], created_date='2024-03-06T00:00:00Z', events=[]),
+]
+
+
+@pytest.fixture
+def frames(data_file):
+    data_file(ISSUES)
+    return DataLoader().get_dataframes()
+
+
+def months(dates:pd.Series) -> pd.Series:
+    return dates.dt.tz_convert('UTC').dt.tz_localize(None).dt.to_period('M')
+
+
+def created_per_label(issues:pd.DataFrame, label:str) -> pd.Series:
+    # The per-label counting the cube replaces
+    dates = issues.loc[issues['labels'].map(lambda labels: label in labels), 'created_date']
+    return months(dates).value_counts().sort_index()
+
+
+def test_created_trend_matches_per_label_counts(frames):
+    issues, _ = frames
+    trend = DataLoader().get_trend_cube().trend(CREATED, labels=['bug', 'docs', 'unknown-label'])
+    assert list(trend.columns) == ['bug', 'docs']
+    for label in ['bug', 'docs']:
+        counts = trend[label][trend[label] > 0]
+        pd.testing.assert_series_equal(counts, created_per_label(issues, label), check_names=False, check_index_type=False)
+    # Months are in UTC: issue 1 was created on February 1st UTC
+    assert trend.loc[pd.Period('2024-02', 'M'), 'bug'] == 2
+
+
+def test_event_trend_of_all_issues(frames):
+    _, events = frames
+    trend = DataLoader().get_trend_cube().trend('reopened')
+    assert list(trend.columns) == [ALL_LABELS]
+    expected = months(events.loc[events['event_type'] == 'reopened', 'event_date']).value_counts().sort_index()
+    pd.testing.assert_series_equal(trend[ALL_LABELS], expected, check_names=False, check_index_type=False)
+
+
+def test_trend_by_state(frames):
+    cube = DataLoader().get_trend_cube()
+    closed = cube.trend(CREATED, labels=['bug'], states=['closed'])
+    assert closed['bug'].to_dict() == {pd.Period('2024-02', 'M'): 1}
+    assert cube.trend('reopened', labels=['bug'], states=['open'])['bug'].sum() == 1
+
+
+def test_labels_and_event_types(frames):
+    cube = DataLoader().get_trend_cube()
+    assert cube.labels() == ['bug', 'docs']
+    # Events without a date are not counted
+    assert cube.event_types() == ['closed', CREATED, 'reopened']
+    assert cube.trend('no-such-event').empty
@@ -0,0 +1,110 @@
+"""
+Pre-aggregates the issues and events into counts per (month, label,
+state, event type) so that trend charts slice the counts instead of
+regrouping the raw issues for every label or event type they show.
+
+Every event is counted once per label of its issue and once under the
+ALL_LABELS margin. The creation of an issue is counted as an event of
+type CREATED dated at its creation date. Labels and state are those of
+the issue (not of the event), and months are in UTC.
+"""
+
+from typing import List
+
+import pandas as pd
+
+# Label under which the events of all issues are counted, with or without labels
+ALL_LABELS:str = '*'
+# Event type of the creation of an issue
+CREATED:str = 'created'
+# Placeholder for a missing state or event type
+UNKNOWN:str = 'unknown'
+
+_KEYS = ['month', 'label', 'state', 'event_type']
+
+
+class TrendCube:
+    """
+    Counts of events per (month, label, state, event type).
+    """
+
+    def __init__(self, counts:pd.Series):
+        """
+        Constructor
+
+        Parameters:
+        - counts: Counts indexed by month (Period), label, state and event type.
+        """
+        self.counts:pd.Series = counts
+
+    def labels(self) -> List[str]:
+        """
+        Returns the labels in the cube (without the ALL_LABELS margin).
+        """
+        return sorted(label for label in self.counts.index.unique('label') if label != ALL_LABELS)
+
+    def event_types(self) -> List[str]:
+        """
+        Returns the event types in the cube, including CREATED.
+        """
+        return sorted(self.counts.index.unique('event_type'))
+
+    def trend(self, event_type:str=CREATED, labels:List[str]=None, states:List[str]=None) -> pd.DataFrame:
+        """
+        Returns the monthly counts of an event type for several labels at once.
+
+        Parameters:
+        - event_type: Event type to count (CREATED counts new issues).
+        - labels: Labels to count the events of issues with; None counts
+          the events of all issues (a single ALL_LABELS column).
+        - states: Optional issue states to restrict the counts to.
+
+        Returns:
+        - A DataFrame with one row per month in which any of the labels had
+          events and one column per label found.
+        """
+        index = self.counts.index
+        mask = index.get_level_values('event_type') == event_type
+        mask &= index.get_level_values('label').isin([ALL_LABELS] if labels is None else labels)
+        if states is not None:
+            mask &= index.get_level_values('state').isin(states)
+        selected = self.counts[mask]
+        trend = selected.groupby(level=['month', 'label']).sum().unstack('label', fill_value=0)
+        trend.columns.name = 'label'
+        return trend
+
+    def update(self, removed:'TrendCube', added:'TrendCube') -> 'TrendCube':
+        """
+        Returns a cube with the counts of removed subtracted and those of
+        added added, e.g. to replace the contribution of updated issues.
+        """
+        counts = self.counts.sub(removed.counts, fill_value=0).add(added.counts, fill_value=0)
+        return TrendCube(counts[counts != 0].astype('int64').sort_index())
+
+
+def build_trend_cube(issues:pd.DataFrame, events:pd.DataFrame) -> TrendCube:
+    """
+    Builds the cube from the DataFrames returned by DataLoader.get_dataframes().
+    """
+    rows = pd.concat([
+        pd.DataFrame({'issue_number': issues['number'], 'event_type': CREATED, 'event_date': issues['created_date']}),
+        events[['issue_number', 'event_type', 'event_date']],
+    ], ignore_index=True)
+    rows = rows[rows['event_date'].notna()]
+    rows = pd.DataFrame({
+        'issue_number': rows['issue_number'].to_numpy(),
+        'month': rows['event_date'].dt.tz_convert('UTC').dt.tz_localize(None).dt.to_period('M').array,
+        'state': rows['issue_number'].map(issues.set_index('number')['state']).fillna(UNKNOWN).to_numpy(),
+        'event_type': rows['event_type'].fillna(UNKNOWN).to_numpy(),
+    })
+
+    # One row per event and label of its issue
+    issue_labels = issues[['number', 'labels']].explode('labels').dropna(subset=['labels'])
+    issue_labels.columns = ['issue_number', 'label']
+    labeled = rows.merge(issue_labels, on='issue_number')
+
+    counts = pd.concat([
+        rows.assign(label=ALL_LABELS).groupby(_KEYS).size(),
+        labeled.groupby(_KEYS).size(),
+    ])
+    return TrendCube(counts.astype('int64').sort_index())